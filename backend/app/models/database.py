@@ -2,7 +2,7 @@
 Database models for ExpenseFlow
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
@@ -48,11 +48,42 @@ class Transaction(Base):
     predicted_confidence = Column(Float)
     actual_category = Column(String(50), nullable=True)
     is_corrected = Column(Boolean, default=False)
+    # Statement date of an imported transaction, or its import time when the statement has none
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Batch job and input row a transaction was imported from, so a resumed job does not insert it twice
+    import_job_id = Column(String(32), nullable=True)
+    import_row = Column(Integer, nullable=True)
 
     user = relationship("User", back_populates="transactions")
     corrections = relationship("Correction", back_populates="transaction")
 
+    # Composite indexes for the dashboard listings; each ends with
+    # (created_at, id) so keyset pages are read straight off the index
+    __table_args__ = (
+        Index("ix_transactions_user_created", "user_id", "created_at", "id"),
+        Index("ix_transactions_user_predicted", "user_id", "predicted_category", "created_at", "id"),
+        Index("ix_transactions_user_actual", "user_id", "actual_category", "created_at", "id"),
+        Index("ix_transactions_user_review", "user_id", "is_corrected", "created_at", "id"),
+        Index("ux_transactions_import_row", "import_job_id", "import_row", unique=True),
+    )
+
+
+class MonthlyCategoryTotal(Base):
+    """
+    Materialized spending per user, month and category
+
+    Maintained incrementally as transactions are inserted and corrected,
+    using the corrected category when there is one. Transactions without a
+    user are counted under user 0.
+    """
+    __tablename__ = "monthly_category_totals"
+
+    user_id = Column(Integer, primary_key=True)
+    month = Column(String(7), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
 
 class Correction(Base):
     """Feedback/correction model for retraining"""
@@ -61,6 +92,8 @@ class Correction(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
     transaction_id = Column(Integer, ForeignKey("transactions.id"), index=True)
+    # Kept on the correction so corrections without a stored transaction keep their text
+    description = Column(String, nullable=True)
     predicted_category = Column(String(50))
     correct_category = Column(String(50))
     created_at = Column(DateTime, default=datetime.utcnow)
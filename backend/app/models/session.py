@@ -0,0 +1,111 @@
+"""
+Async database engine, connection pool and session management
+"""
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.database import Base
+
+
+DEFAULT_DATABASE_URL = "sqlite+aiosqlite:///./expenseflow.db"
+
+_ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgres://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+
+def async_database_url(url: str = None) -> str:
+    """Return ``url`` (default DATABASE_URL) with an async driver selected"""
+    if url is None:
+        url = os.getenv("DATABASE_URL") or DEFAULT_DATABASE_URL
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+def _tune_sqlite(dbapi_connection, connection_record):
+    # WAL lets readers run during bulk imports; NORMAL sync is safe with WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _create_missing_indexes(connection):
+    # create_all skips tables that exist, so indexes added later need their own pass
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _add_missing_columns(connection):
+    # Likewise for nullable columns added to tables that already exist
+    inspector = inspect(connection)
+    quote = connection.dialect.identifier_preparer.quote
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                connection.execute(text(
+                    f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+                    f"{column.type.compile(dialect=connection.dialect)}"
+                ))
+
+
+class Database:
+    """
+    Async SQLAlchemy engine with a configurable connection pool
+
+    Pool size and overflow come from DB_POOL_SIZE and DB_MAX_OVERFLOW.
+    Works with PostgreSQL (asyncpg) and SQLite (aiosqlite) URLs.
+    """
+
+    def __init__(self, url: str = None, pool_size: int = None, max_overflow: int = None, echo: bool = False):
+        self.url = async_database_url(url)
+        if pool_size is None:
+            pool_size = int(os.getenv("DB_POOL_SIZE", 10))
+        if max_overflow is None:
+            max_overflow = int(os.getenv("DB_MAX_OVERFLOW", 20))
+
+        options = {"echo": echo}
+        self.is_sqlite = self.url.startswith("sqlite")
+        if not (self.is_sqlite and ":memory:" in self.url):
+            # In-memory SQLite uses a single static connection; everything else is pooled
+            options.update(pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+
+        self.engine = create_async_engine(self.url, **options)
+        if self.is_sqlite:
+            event.listen(self.engine.sync_engine, "connect", _tune_sqlite)
+
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def create_tables(self):
+        """Create missing tables, and nullable columns and indexes added to tables that already exist"""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_add_missing_columns)
+            await conn.run_sync(_create_missing_indexes)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Session that commits on success and rolls back on error"""
+        async with self.sessionmaker() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def dispose(self):
+        await self.engine.dispose()
@@ -0,0 +1,146 @@
+"""
+Versioned, memory-mappable model artifact format
+
+An artifact directory holds everything CompiledLinearModel needs as raw
+arrays, so worker processes can ``np.load(..., mmap_mode="r")`` the large
+ones and share the same physical pages through the OS page cache:
+
+    artifacts/
+        LATEST                  name of the current version directory
+        <version>/
+            manifest.json       format, version, classes, analyzer config
+            coef.npy            float64 (n_features, n_coef_rows)
+            intercept.npy       float64 (n_coef_rows,)
+            idf.npy             float64 (n_features,)
+            vocabulary.txt      one term per line, line number = feature index
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+
+from app.services.compiled import CompiledLinearModel
+
+
+ARTIFACT_FORMAT = "expenseflow-linear"
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+
+
+def _vocabulary_lines(vocabulary: Dict[str, int]) -> bytes:
+    terms = [None] * len(vocabulary)
+    for term, index in vocabulary.items():
+        if "\n" in term:
+            raise ValueError(f"Vocabulary term contains a newline: {term!r}")
+        terms[index] = term
+    return ("\n".join(terms) + "\n").encode("utf-8")
+
+
+def export_artifacts(compiled: CompiledLinearModel, output_dir: Union[str, Path]) -> Path:
+    """
+    Write a compiled model as a new version under ``output_dir``
+
+    The version is a content hash of the arrays and vocabulary, so exporting
+    the same model twice yields the same directory. ``LATEST`` is updated
+    atomically to point at it.
+
+    Args:
+        compiled: Model to export
+        output_dir: Artifact root directory (e.g. models/artifacts)
+
+    Returns:
+        Path to the version directory
+    """
+    output_dir = Path(output_dir)
+    vocabulary = _vocabulary_lines(compiled.vocabulary)
+    arrays = {
+        "coef": np.ascontiguousarray(compiled.coef_t, dtype=np.float64),
+        "intercept": np.ascontiguousarray(compiled.intercept, dtype=np.float64),
+        "idf": np.ascontiguousarray(compiled.idf, dtype=np.float64),
+    }
+    classes = [str(label) for label in compiled.classes_]
+    config = dict(compiled.config, ngram_range=list(compiled.config["ngram_range"]))
+
+    digest = hashlib.sha256(vocabulary)
+    for name in sorted(arrays):
+        digest.update(arrays[name].tobytes())
+    digest.update(json.dumps({"classes": classes, "config": config}, sort_keys=True).encode())
+    version = digest.hexdigest()[:12]
+
+    version_dir = output_dir / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(version_dir / f"{name}.npy", array)
+    (version_dir / "vocabulary.txt").write_bytes(vocabulary)
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model_version": version,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "n_features": int(arrays["idf"].shape[0]),
+        "classes": classes,
+        "config": config,
+    }
+    (version_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+    latest_tmp = output_dir / f".{LATEST_FILE}.tmp"
+    latest_tmp.write_text(version)
+    os.replace(latest_tmp, output_dir / LATEST_FILE)
+    return version_dir
+
+
+def resolve_artifact_dir(path: Union[str, Path]) -> Path:
+    """Return the version directory for ``path``, following ``LATEST`` if needed"""
+    path = Path(path)
+    if (path / MANIFEST_FILE).exists():
+        return path
+    latest = path / LATEST_FILE
+    if latest.exists():
+        return path / latest.read_text().strip()
+    raise FileNotFoundError(f"No model artifact found at {path}")
+
+
+def read_manifest(path: Union[str, Path]) -> Dict:
+    manifest = json.loads((resolve_artifact_dir(path) / MANIFEST_FILE).read_text())
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Unknown artifact format: {manifest.get('format')!r}")
+    if manifest.get("format_version", 0) > ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version: {manifest['format_version']}")
+    return manifest
+
+
+def load_artifacts(path: Union[str, Path], mmap: bool = True):
+    """
+    Load a CompiledLinearModel from an artifact directory
+
+    Args:
+        path: Version directory, or artifact root containing ``LATEST``
+        mmap: Memory-map the coefficient and idf arrays read-only
+
+    Returns:
+        Tuple of (CompiledLinearModel, manifest dict)
+    """
+    version_dir = resolve_artifact_dir(path)
+    manifest = read_manifest(version_dir)
+    mmap_mode = "r" if mmap else None
+
+    coef_t = np.load(version_dir / "coef.npy", mmap_mode=mmap_mode)
+    idf = np.load(version_dir / "idf.npy", mmap_mode=mmap_mode)
+    intercept = np.load(version_dir / "intercept.npy")
+
+    with open(version_dir / "vocabulary.txt", encoding="utf-8") as f:
+        vocabulary = {line.rstrip("\n"): index for index, line in enumerate(f)}
+    if len(vocabulary) != manifest["n_features"]:
+        raise ValueError("Vocabulary size does not match the manifest")
+
+    config = dict(manifest["config"], ngram_range=tuple(manifest["config"]["ngram_range"]))
+    compiled = CompiledLinearModel(
+        vocabulary, idf, coef_t, intercept, np.asarray(manifest["classes"], dtype=object), config
+    )
+    return compiled, manifest
@@ -0,0 +1,138 @@
+"""
+Micro-batching coalescer for single-description categorization requests
+"""
+import asyncio
+import os
+import time
+from typing import Dict, List, Tuple
+
+from app.services.executor import ExecutorSaturated, InferenceExecutor
+from app.services.metrics import BATCH_SIZE, STAGE_SECONDS
+
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent ``predict`` calls into vectorized batches
+
+    Requests are collected until ``max_batch_size`` items are pending or the
+    oldest one has waited ``max_wait_ms``, then scored with a single
+    ``batch_predict`` call on the inference executor. Each caller receives
+    its own result. Batches are dispatched without waiting for the previous
+    one to finish, so the executor's capacity bounds the concurrency.
+    """
+
+    def __init__(self, executor: InferenceExecutor, max_batch_size: int = None,
+                 max_wait_ms: float = None, max_pending: int = None):
+        if max_batch_size is None:
+            max_batch_size = int(os.getenv("MICROBATCH_MAX_SIZE", 64))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv("MICROBATCH_MAX_WAIT_MS", 2))
+        if max_pending is None:
+            max_pending = int(os.getenv("MICROBATCH_MAX_PENDING", 4096))
+
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_pending = max(self.max_batch_size, max_pending)
+
+        self._pending = []
+        self._batch_ready = None
+        self._collector = None
+        self._dispatches = set()
+
+        self.batches = 0
+        self.items = 0
+        self.batch_size_counts = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.batch_size_counts["+Inf"] = 0
+        self.queue_delay_total = 0.0
+        self.queue_delay_max = 0.0
+        self._batch_size_metric = BATCH_SIZE.labels(source="microbatch")
+        self._queue_delay_metric = STAGE_SECONDS.labels(stage="microbatch_queue")
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def predict(self, description: str) -> Tuple[str, float]:
+        """Queue a description for the next batch and wait for its result"""
+        if len(self._pending) >= self.max_pending:
+            raise ExecutorSaturated("Micro-batch queue is full")
+
+        if self._batch_ready is None:
+            self._batch_ready = asyncio.Event()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((description, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_ready.set()
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.ensure_future(self._collect())
+
+        return await future
+
+    async def _collect(self):
+        """Cut batches from the pending queue until it is empty"""
+        while self._pending:
+            deadline = self._pending[0][2] + self.max_wait
+            timeout = deadline - time.perf_counter()
+            if len(self._pending) < self.max_batch_size and timeout > 0:
+                self._batch_ready.clear()
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[tuple]):
+        now = time.perf_counter()
+        self._record(len(batch), [now - queued_at for _, _, queued_at in batch])
+
+        try:
+            predictions = await self.executor.batch_predict(
+                [description for description, _, _ in batch], wait=True
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+    def _record(self, size: int, delays: List[float]):
+        self.batches += 1
+        self.items += size
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.batch_size_counts[bucket] += 1
+                break
+        else:
+            self.batch_size_counts["+Inf"] += 1
+        self.queue_delay_total += sum(delays)
+        self.queue_delay_max = max(self.queue_delay_max, max(delays))
+        self._batch_size_metric.observe(size)
+        for delay in delays:
+            self._queue_delay_metric.observe(delay)
+
+    def stats(self) -> Dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": self.pending,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "batch_size_counts": {str(bucket): count for bucket, count in self.batch_size_counts.items()},
+            "mean_queue_delay_ms": round(self.queue_delay_total / self.items * 1000, 3) if self.items else 0.0,
+            "max_queue_delay_ms": round(self.queue_delay_max * 1000, 3),
+        }
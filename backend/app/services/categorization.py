@@ -1,18 +1,279 @@
 """
 Categorization service using ML model
 """
+import hashlib
 import joblib
+import logging
 import os
+import time
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Hashable, List, Optional, Tuple
 import numpy as np
 
+from app.services.artifacts import load_artifacts
+from app.services.cache import PredictionCache
+from app.services.compiled import CompiledLinearModel
+from app.services.merchants import MerchantIndex
+from app.services.preprocessing import preprocess, preprocess_many
+from app.services.metrics import (
+    BATCH_SIZE,
+    DEDUP_SECONDS,
+    MODEL_LOAD_SECONDS,
+    PREDICT_PROBA_SECONDS,
+    PREDICTION_ERRORS,
+    VECTORIZE_SECONDS,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BATCH_SIZE = BATCH_SIZE.labels(source="chunk")
+PREDICT_ERRORS = PREDICTION_ERRORS.labels(stage="predict")
+CHUNK_ERRORS = PREDICTION_ERRORS.labels(stage="chunk")
+ROW_ERRORS = PREDICTION_ERRORS.labels(stage="row")
+
+
+DEFAULT_BATCH_CHUNK_SIZE = 1024
+DEFAULT_REVIEW_THRESHOLD = 0.5
+INFERENCE_MODES = ("sklearn", "compiled")
+
+
+def artifact_version(*paths) -> str:
+    """Short content hash identifying a set of model artifacts"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def top_k(classes: np.ndarray, probabilities: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+    """
+    The ``k`` most probable (category, probability) pairs of each row, best first
+
+    Uses ``argpartition`` so only the k winners of each row are sorted.
+    """
+    n_classes = probabilities.shape[1]
+    k = max(1, min(k, n_classes))
+    if k < n_classes:
+        candidates = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n_classes), probabilities.shape)
+    order = np.argsort(-np.take_along_axis(probabilities, candidates, axis=1), axis=1, kind="stable")
+    best = np.take_along_axis(candidates, order, axis=1)
+    labels = classes[best].tolist()
+    scores = np.take_along_axis(probabilities, best, axis=1).tolist()
+    return [list(zip(row_labels, row_scores)) for row_labels, row_scores in zip(labels, scores)]
+
+
+def calibrate_review_threshold(confidences: np.ndarray, correct: np.ndarray,
+                               target_precision: float = 0.95) -> float:
+    """
+    Lowest confidence threshold at which auto-accepted predictions reach ``target_precision``
+
+    Predictions are sorted by confidence; the threshold is the smallest
+    confidence such that the rows at or above it are correct at least
+    ``target_precision`` of the time. Rows below it go to "needs review".
+    Returns 1.0 if no threshold reaches the target.
+
+    Args:
+        confidences: Top-1 probability of each held-out prediction
+        correct: Whether each prediction matched the true label
+        target_precision: Required precision of the auto-accepted rows
+    """
+    order = np.argsort(-np.asarray(confidences, dtype=float), kind="stable")
+    confidences = np.asarray(confidences, dtype=float)[order]
+    correct = np.asarray(correct, dtype=bool)[order]
+    precision = np.cumsum(correct) / np.arange(1, len(correct) + 1)
+    reaching = np.flatnonzero(precision >= target_precision)
+    if len(reaching) == 0:
+        return 1.0
+    return float(confidences[reaching[-1]])
+
+
+class LoadedModel:
+    """
+    One model version: a classifier/vectorizer pair or a compiled artifact
+
+    Instances are never mutated after construction, so a request that took
+    a reference keeps scoring with the same pair even if the service swaps
+    in a newer version meanwhile.
+    """
+
+    def __init__(self, version: str, model=None, vectorizer=None,
+                 compiled: CompiledLinearModel = None, source: str = None,
+                 load_seconds: float = 0.0):
+        self.version = version
+        self.model = model
+        self.vectorizer = vectorizer
+        self.compiled = compiled
+        self.source = source
+        self.load_seconds = load_seconds
+        self._analyzer = None
+
+    @classmethod
+    def from_pickles(cls, model_path: str, vectorizer_path: str, compile: bool = False) -> "LoadedModel":
+        """
+        Unpickle a classifier and vectorizer pair
+
+        With ``compile=True`` the pair is also compiled into a
+        CompiledLinearModel; if that is not possible the sklearn path is used.
+
+        Raises:
+            FileNotFoundError: If either file is missing
+            ValueError: If the classifier and vectorizer do not match
+        """
+        started = time.perf_counter()
+        model = joblib.load(model_path)
+        vectorizer = joblib.load(vectorizer_path)
+
+        n_features = getattr(model, "n_features_in_", None)
+        if hasattr(vectorizer, "vocabulary_"):
+            vectorizer_features = len(vectorizer.vocabulary_)
+        else:
+            vectorizer_features = getattr(vectorizer, "n_features", None)
+        if None not in (n_features, vectorizer_features) and n_features != vectorizer_features:
+            raise ValueError(
+                f"Model expects {n_features} features but the vectorizer has {vectorizer_features}"
+            )
+
+        compiled = None
+        if compile:
+            try:
+                compiled = CompiledLinearModel.from_sklearn(vectorizer, model)
+            except ValueError as e:
+                logger.warning("Falling back to sklearn inference: %s", e)
+
+        load_seconds = time.perf_counter() - started
+        MODEL_LOAD_SECONDS.observe(load_seconds)
+        return cls(
+            artifact_version(model_path, vectorizer_path),
+            model=model,
+            vectorizer=vectorizer,
+            compiled=compiled,
+            source=str(model_path),
+            load_seconds=load_seconds,
+        )
+
+    @classmethod
+    def from_artifact(cls, artifact_dir: str, mmap: bool = True) -> "LoadedModel":
+        """
+        Load a compiled model from an exported artifact directory
+
+        Raises:
+            FileNotFoundError: If no artifact exists at ``artifact_dir``
+        """
+        started = time.perf_counter()
+        compiled, manifest = load_artifacts(artifact_dir, mmap=mmap)
+        load_seconds = time.perf_counter() - started
+        MODEL_LOAD_SECONDS.observe(load_seconds)
+        return cls(
+            manifest["model_version"],
+            compiled=compiled,
+            source=str(artifact_dir),
+            load_seconds=load_seconds,
+        )
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.compiled.classes_ if self.compiled is not None else self.model.classes_
+
+    def feature_signatures(self, descriptions: List[str]) -> List[Hashable]:
+        """
+        A key per description that is equal only for descriptions the model scores identically
+
+        The key is the sorted multiset of terms the vectorizer counts, so
+        word order (beyond n-grams), stop words and out-of-vocabulary
+        tokens such as reference codes do not split descriptions apart.
+        Vectorizers that cannot be analyzed fall back to the text itself.
+        """
+        if self.compiled is not None:
+            return [self.compiled.signature(description) for description in descriptions]
+
+        if self._analyzer is None:
+            build_analyzer = getattr(self.vectorizer, "build_analyzer", None)
+            # Benign race: concurrent callers build the same analyzer
+            self._analyzer = build_analyzer() if build_analyzer is not None else False
+        if self._analyzer is False:
+            return list(descriptions)
+
+        analyzer = self._analyzer
+        vocabulary = getattr(self.vectorizer, "vocabulary_", None)
+        if vocabulary is None:
+            # Hashing vectorizers have no vocabulary; every term counts
+            return [tuple(sorted(analyzer(description))) for description in descriptions]
+        return [
+            tuple(sorted(vocabulary[term] for term in analyzer(description) if term in vocabulary))
+            for description in descriptions
+        ]
+
+    def predict_proba(self, descriptions: List[str]) -> np.ndarray:
+        """Class probabilities for a list of descriptions in one model pass"""
+        started = time.perf_counter()
+        if self.compiled is not None:
+            X = self.compiled.transform(descriptions)
+        else:
+            X = self.vectorizer.transform(descriptions)
+        vectorized = time.perf_counter()
+        VECTORIZE_SECONDS.observe(vectorized - started)
+
+        if self.compiled is not None:
+            probabilities = self.compiled.score(X)
+        else:
+            probabilities = self.model.predict_proba(X)
+        PREDICT_PROBA_SECONDS.observe(time.perf_counter() - vectorized)
+        return probabilities
+
+    def predict_proba_one(self, description: str) -> np.ndarray:
+        """Class probabilities for one description in one model pass"""
+        started = time.perf_counter()
+        if self.compiled is not None:
+            indices, values = self.compiled.transform_row(description)
+            vectorized = time.perf_counter()
+            VECTORIZE_SECONDS.observe(vectorized - started)
+
+            probabilities = self.compiled.score_row_proba(indices, values)
+            PREDICT_PROBA_SECONDS.observe(time.perf_counter() - vectorized)
+            return probabilities
+
+        # Transform text to TF-IDF features
+        X = self.vectorizer.transform([description])
+        vectorized = time.perf_counter()
+        VECTORIZE_SECONDS.observe(vectorized - started)
+
+        # The label is the argmax of the probabilities; no separate predict call
+        probabilities = self.model.predict_proba(X)[0]
+        PREDICT_PROBA_SECONDS.observe(time.perf_counter() - vectorized)
+        return probabilities
+
+    def predict_one(self, description: str) -> Tuple[str, float]:
+        probabilities = self.predict_proba_one(description)
+        best = int(probabilities.argmax())
+        return self.classes_[best], float(probabilities[best])
+
+    def predict_top_k(self, description: str, k: int) -> List[Tuple[str, float]]:
+        return top_k(self.classes_, self.predict_proba_one(description)[np.newaxis, :], k)[0]
+
 
 class CategorizationService:
     """Service for transaction categorization"""
 
-    def __init__(self, model_path: str = None, vectorizer_path: str = None):
-        """Initialize the categorization service with pre-trained model"""
+    def __init__(self, model_path: str = None, vectorizer_path: str = None,
+                 batch_chunk_size: int = None, cache: PredictionCache = None,
+                 inference_mode: str = None, artifact_dir: str = None,
+                 merchant_index: MerchantIndex = None, review_threshold: float = None):
+        """
+        Initialize the categorization service with pre-trained model
+
+        If ``artifact_dir`` (or MODEL_ARTIFACT_DIR) is set, the model is
+        memory-mapped from an exported artifact directory instead of
+        unpickled, and inference always uses the compiled engine. If a
+        ``merchant_index`` is given, descriptions it knows are answered
+        from it before the cache and the model are consulted. Predictions
+        below ``review_threshold`` (REVIEW_CONFIDENCE_THRESHOLD) are flagged
+        as needing review.
+        """
         if model_path is None:
             model_path = os.getenv(
                 "MODEL_PATH",
@@ -24,50 +285,601 @@ class CategorizationService:
                 Path(__file__).parent.parent.parent / "models" / "tfidf_vectorizer.pkl"
             )
 
+        if batch_chunk_size is None:
+            batch_chunk_size = int(os.getenv("BATCH_CHUNK_SIZE", DEFAULT_BATCH_CHUNK_SIZE))
+        self.batch_chunk_size = max(1, batch_chunk_size)
+
+        if cache is None:
+            cache = PredictionCache(
+                max_size=int(os.getenv("PREDICTION_CACHE_SIZE", 10000)),
+                ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL", 0))
+            )
+        self.cache = cache
+
+        if inference_mode is None:
+            inference_mode = os.getenv("INFERENCE_MODE", "sklearn")
+        if inference_mode not in INFERENCE_MODES:
+            raise ValueError(f"Inference mode must be one of {INFERENCE_MODES}")
+        self.inference_mode = inference_mode
+        self.merchant_index = merchant_index
+
+        if review_threshold is None:
+            review_threshold = float(os.getenv("REVIEW_CONFIDENCE_THRESHOLD", DEFAULT_REVIEW_THRESHOLD))
+        self.review_threshold = review_threshold
+
+        if artifact_dir is None:
+            artifact_dir = os.getenv("MODEL_ARTIFACT_DIR") or None
+        self.model_path = str(model_path)
+        self.vectorizer_path = str(vectorizer_path)
+        self.artifact_dir = artifact_dir
+
+        self.active: Optional[LoadedModel] = None
+        if artifact_dir is not None:
+            self.load_artifact(artifact_dir)
+        else:
+            self.load(model_path, vectorizer_path)
+
+    @property
+    def model_loaded(self) -> bool:
+        return self.active is not None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        active = self.active
+        return active.version if active is not None else None
+
+    @property
+    def model(self):
+        return self.active.model if self.active is not None else None
+
+    @property
+    def vectorizer(self):
+        return self.active.vectorizer if self.active is not None else None
+
+    @property
+    def compiled(self) -> Optional[CompiledLinearModel]:
+        return self.active.compiled if self.active is not None else None
+
+    @property
+    def load_seconds(self) -> float:
+        return self.active.load_seconds if self.active is not None else 0.0
+
+    def activate(self, loaded: LoadedModel):
+        """
+        Make ``loaded`` the model used for new predictions
+
+        The swap is a single reference assignment; calls already running keep
+        the version they started with. Cached predictions are keyed on the
+        model version, and the old entries are dropped here.
+        """
+        self.active = loaded
+        self.cache.clear()
+
+    def load(self, model_path: str, vectorizer_path: str) -> bool:
+        """
+        Load a model and vectorizer pair from disk
+
+        In "compiled" inference mode the pair is also compiled into a
+        CompiledLinearModel; if that is not possible the service falls back
+        to the sklearn path.
+
+        Args:
+            model_path: Path to the pickled classifier
+            vectorizer_path: Path to the pickled TF-IDF vectorizer
+
+        Returns:
+            True if the artifacts were loaded
+        """
+        self.model_path = str(model_path)
+        self.vectorizer_path = str(vectorizer_path)
+        self.artifact_dir = None
+
+        try:
+            loaded = LoadedModel.from_pickles(
+                model_path, vectorizer_path, compile=self.inference_mode == "compiled"
+            )
+        except FileNotFoundError:
+            self.active = None
+            return False
+
+        self.activate(loaded)
+        return True
+
+    def load_artifact(self, artifact_dir: str, mmap: bool = True) -> bool:
+        """
+        Load a compiled model from an exported artifact directory
+
+        Args:
+            artifact_dir: Version directory, or artifact root with a LATEST file
+            mmap: Memory-map the large arrays so worker processes share them
+
+        Returns:
+            True if the artifact was loaded
+        """
+        self.artifact_dir = str(artifact_dir)
+
         try:
-            self.model = joblib.load(model_path)
-            self.vectorizer = joblib.load(vectorizer_path)
-            self.model_loaded = True
+            loaded = LoadedModel.from_artifact(artifact_dir, mmap=mmap)
         except FileNotFoundError:
-            self.model = None
-            self.vectorizer = None
-            self.model_loaded = False
+            self.active = None
+            return False
+
+        self.activate(loaded)
+        return True
+
+    def cache_key(self, description: str, version: str = None) -> Hashable:
+        """
+        Cache key for a description under the given (default: active) model
+
+        Keys use the normalized description, so the same merchant with a
+        different store number, date or card suffix is a cache hit.
+        """
+        if version is None:
+            version = self.model_version
+        return version, preprocess(description)
 
     def predict(self, description: str) -> Tuple[str, float]:
         """
         Predict category for a transaction description
 
+        The description is normalized (see ``Processor``) before it is
+        vectorized, exactly as the training data was.
+
         Args:
             description: Transaction description text
 
         Returns:
             Tuple of (category, confidence_score)
         """
-        if not self.model_loaded:
+        active = self.active
+        if active is None:
             return "Other", 0.0
 
         try:
-            # Transform text to TF-IDF features
-            X = self.vectorizer.transform([description])
+            normalized = preprocess(description)
+            if self.merchant_index is not None:
+                known = self.merchant_index.lookup(normalized)
+                if known is not None:
+                    return known
+
+            key = (active.version, normalized)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
 
-            # Get prediction and probability
-            prediction = self.model.predict(X)[0]
-            probabilities = self.model.predict_proba(X)[0]
-            confidence = float(np.max(probabilities))
+            prediction, confidence = active.predict_one(normalized)
 
+            self.cache.put(key, (prediction, confidence))
             return prediction, confidence
-        except Exception as e:
-            print(f"Prediction error: {str(e)}")
+        except Exception:
+            PREDICT_ERRORS.inc()
+            logger.exception("Prediction failed")
             return "Other", 0.0
 
-    def batch_predict(self, descriptions: list) -> list:
+    def batch_predict(self, descriptions: List[str], chunk_size: int = None) -> List[Tuple[str, float]]:
         """
         Predict categories for multiple descriptions
 
+        Descriptions are normalized in one ``preprocess_many`` pass. Known
+        merchants and cached descriptions are answered directly. The rest are vectorized
+        chunk by chunk into a single sparse matrix and scored with one
+        ``predict_proba`` call per chunk; the label is the argmax of the
+        probabilities. If a chunk fails, its rows are retried one by one so a
+        single bad description only affects its own result. The whole call
+        uses one model version, even if a reload happens meanwhile.
+
         Args:
             descriptions: List of transaction descriptions
+            chunk_size: Rows per vectorized chunk (defaults to BATCH_CHUNK_SIZE)
+
+        Returns:
+            List of (category, confidence) tuples, in input order
+        """
+        active = self.active
+        if active is None:
+            return [("Other", 0.0)] * len(descriptions)
+
+        results = [("Other", 0.0)] * len(descriptions)
+        rows = [i for i, description in enumerate(descriptions) if isinstance(description, str)]
+        normalized = dict(zip(rows, preprocess_many([descriptions[i] for i in rows])))
+
+        merchant_index = self.merchant_index
+        misses = []
+        for i in rows:
+            if merchant_index is not None:
+                known = merchant_index.lookup(normalized[i])
+                if known is not None:
+                    results[i] = known
+                    continue
+            cached = self.cache.get((active.version, normalized[i]))
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses.append(i)
+
+        predictions, _ = self._predict_unique(active, [normalized[i] for i in misses], None, chunk_size)
+        for i, prediction in zip(misses, predictions):
+            results[i] = prediction
+        return results
+
+    def needs_review(self, confidence: float, threshold: float = None) -> bool:
+        """Whether a prediction is too uncertain to accept without a user looking at it"""
+        return confidence < (self.review_threshold if threshold is None else threshold)
+
+    def knows_category(self, category: str) -> bool:
+        """Whether the active global model has ``category`` as a class (custom user labels do not)"""
+        active = self.active
+        return active is not None and category in set(active.classes_.tolist())
+
+    def predict_top_k(self, description: str, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        The ``k`` most likely categories for one description, best first
+
+        Scored with a single ``predict_proba`` pass. A description answered
+        by the merchant index has only its known category.
+
+        Returns:
+            List of (category, probability) tuples; [("Other", 0.0)] on failure
+        """
+        active = self.active
+        if active is None:
+            return [("Other", 0.0)]
+
+        try:
+            normalized = preprocess(description)
+            if self.merchant_index is not None:
+                known = self.merchant_index.lookup(normalized)
+                if known is not None:
+                    return [known]
+
+            ranked = active.predict_top_k(normalized, k)
+            self.cache.put((active.version, normalized), ranked[0])
+            return ranked
+        except Exception:
+            PREDICT_ERRORS.inc()
+            logger.exception("Prediction failed")
+            return [("Other", 0.0)]
+
+    def batch_predict_top_k(self, descriptions: List[str], k: int = 3,
+                            chunk_size: int = None) -> List[List[Tuple[str, float]]]:
+        """
+        The ``k`` most likely categories for each description, best first
+
+        Like ``batch_predict``, but the cache (which holds only the top
+        category) is bypassed for rows the merchant index does not know;
+        each chunk is still scored with one ``predict_proba`` call.
+
+        Returns:
+            One list of (category, probability) tuples per description, in input order
+        """
+        return self.batch_predict_report(descriptions, k, chunk_size)[0]
+
+    def batch_predict_report(self, descriptions: List[str], k: int = 1,
+                             chunk_size: int = None) -> Tuple[List[List[Tuple[str, float]]], Dict]:
+        """
+        Top ``k`` categories per description, plus a report of how much model work was needed
+
+        With ``k`` == 1 cached descriptions are answered from the cache;
+        otherwise only the merchant index is consulted before the model.
+
+        Returns:
+            (results, report): one ranked list per description in input
+            order, and the dedup counters described in ``_predict_unique``
+            together with ``rows`` and ``answered`` (merchant index or cache
+            hits)
+        """
+        report = {"rows": len(descriptions), "answered": 0}
+        active = self.active
+        if active is None:
+            return [[("Other", 0.0)] for _ in descriptions], dict(report, **self._dedup_report(0, 0, 0.0))
+
+        results = [[("Other", 0.0)] for _ in descriptions]
+        rows = [i for i, description in enumerate(descriptions) if isinstance(description, str)]
+        normalized = dict(zip(rows, preprocess_many([descriptions[i] for i in rows])))
+
+        merchant_index = self.merchant_index
+        misses = []
+        for i in rows:
+            known = merchant_index.lookup(normalized[i]) if merchant_index is not None else None
+            if known is None and k == 1:
+                known = self.cache.get((active.version, normalized[i]))
+            if known is not None:
+                results[i] = [known]
+            else:
+                misses.append(i)
+        report["answered"] = len(rows) - len(misses)
+
+        ranked, dedup = self._predict_unique(active, [normalized[i] for i in misses], k, chunk_size)
+        for i, prediction in zip(misses, ranked):
+            results[i] = prediction
+        report.update(dedup)
+        return results, report
+
+    def batch_predict_overlay(self, descriptions: List[str], overlay, k: int = 1,
+                              chunk_size: int = None) -> List[List[Tuple[str, float]]]:
+        """
+        Top ``k`` categories per description with a user's overlay applied
+
+        Rows the user has corrected exactly get their corrected category.
+        Rows sharing a word with the user's corrections are scored by the
+        global model, one ``predict_proba`` call per chunk, and re-ranked
+        by ``overlay.rank``, even if the merchant index knows them; their
+        results are not cached, since the cache is shared by all users.
+        The remaining rows take the normal global path (merchant index,
+        cache, model).
+
+        Args:
+            descriptions: List of transaction descriptions
+            overlay: The user's ``UserOverlay``
+            k: Number of categories to return per description
+            chunk_size: Rows per vectorized chunk (defaults to BATCH_CHUNK_SIZE)
+
+        Returns:
+            One list of (category, probability) tuples per description, in input order
+        """
+        active = self.active
+        if active is None:
+            return [[("Other", 0.0)] for _ in descriptions]
+
+        results = [[("Other", 0.0)] for _ in descriptions]
+        rows = [i for i, description in enumerate(descriptions) if isinstance(description, str)]
+        normalized = dict(zip(rows, preprocess_many([descriptions[i] for i in rows])))
+
+        merchant_index = self.merchant_index
+        biased, unbiased = [], []
+        for i in rows:
+            category = overlay.override(normalized[i])
+            if category is not None:
+                results[i] = [(category, 1.0)]
+                continue
+            if overlay.touches(normalized[i]):
+                biased.append(i)
+                continue
+            known = merchant_index.lookup(normalized[i]) if merchant_index is not None else None
+            if known is not None:
+                results[i] = [known]
+            else:
+                unbiased.append(i)
+
+        ranked, _ = self._predict_unique(active, [normalized[i] for i in unbiased], k, chunk_size)
+        for i, prediction in zip(unbiased, ranked):
+            results[i] = prediction
+
+        chunk_size = max(1, chunk_size or self.batch_chunk_size)
+        for start in range(0, len(biased), chunk_size):
+            chunk = biased[start:start + chunk_size]
+            texts = [normalized[i] for i in chunk]
+            CHUNK_BATCH_SIZE.observe(len(texts))
+            try:
+                ranked = overlay.rank(texts, active.classes_, active.predict_proba(texts), k)
+            except Exception:
+                CHUNK_ERRORS.inc()
+                logger.warning("Overlay prediction failed; retrying %d rows one by one", len(texts), exc_info=True)
+                ranked = [self._rank_overlay_row(active, overlay, text, k) for text in texts]
+            for i, candidates in zip(chunk, ranked):
+                results[i] = candidates
+        return results
+
+    @staticmethod
+    def _rank_overlay_row(active: LoadedModel, overlay, description: str, k: int) -> List[Tuple[str, float]]:
+        try:
+            return overlay.rank([description], active.classes_, active.predict_proba([description]), k)[0]
+        except Exception:
+            ROW_ERRORS.inc()
+            logger.exception("Overlay prediction failed")
+            return [("Other", 0.0)]
+
+    @staticmethod
+    def _dedup_report(scored: int, groups: int, model_seconds: float) -> Dict:
+        # Time saved assumes each duplicate would have cost as much as an average representative
+        per_row = model_seconds / groups if groups else 0.0
+        return {
+            "scored": scored,
+            "groups": groups,
+            "dedup_ratio": round(scored / groups, 3) if groups else 1.0,
+            "model_ms": round(model_seconds * 1000, 3),
+            "saved_ms": round((scored - groups) * per_row * 1000, 3),
+        }
+
+    @staticmethod
+    def _group_inputs(active: LoadedModel, descriptions: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Group normalized descriptions that the model would score identically
 
         Returns:
-            List of (category, confidence) tuples
+            (representatives, group_of): one text per group, and the group
+            index of every distinct input text
         """
-        return [self.predict(desc) for desc in descriptions]
+        started = time.perf_counter()
+        unique = list(dict.fromkeys(descriptions))
+        try:
+            signatures = active.feature_signatures(unique)
+        except Exception:
+            logger.warning("Feature signatures failed; grouping by normalized text only", exc_info=True)
+            signatures = unique
+
+        groups = {}
+        representatives = []
+        group_of = {}
+        for text, signature in zip(unique, signatures):
+            group = groups.get(signature)
+            if group is None:
+                group = groups[signature] = len(representatives)
+                representatives.append(text)
+            group_of[text] = group
+        DEDUP_SECONDS.observe(time.perf_counter() - started)
+        return representatives, group_of
+
+    def batch_predict_arrays(self, descriptions: List[Optional[str]],
+                             chunk_size: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[str]]:
+        """
+        Columnar predictions for bulk exports
+
+        Results come back as arrays rather than one tuple per row: a label
+        table, an index into it per description and a confidence per
+        description, ready to become dictionary-encoded columns. Rows are
+        deduplicated like ``batch_predict`` and known merchants answered
+        from the merchant index, but the prediction cache is neither read nor
+        written, so backfilling years of history does not evict the
+        entries live traffic relies on. Missing descriptions get
+        ("Other", 0.0).
+
+        Returns:
+            (labels, indices, confidences, model_version): ``labels`` is an
+            object array of category names, ``indices`` an int32 array and
+            ``confidences`` a float64 array, both one entry per description
+        """
+        n_rows = len(descriptions)
+        active = self.active
+        if active is None:
+            return np.array(["Other"], dtype=object), np.zeros(n_rows, np.int32), np.zeros(n_rows), None
+
+        labels = active.classes_.tolist()
+        label_index = {label: i for i, label in enumerate(labels)}
+
+        def index_of(label):
+            # The merchant index or the fallback may name a category the model lacks
+            index = label_index.get(label)
+            if index is None:
+                index = label_index[label] = len(labels)
+                labels.append(label)
+            return index
+
+        indices = np.full(n_rows, index_of("Other"), dtype=np.int32)
+        confidences = np.zeros(n_rows)
+        rows = [i for i, description in enumerate(descriptions) if isinstance(description, str)]
+        if not rows:
+            return np.array(labels, dtype=object), indices, confidences, active.version
+
+        normalized = preprocess_many([descriptions[i] for i in rows])
+        position = {}
+        codes = np.fromiter((position.setdefault(text, len(position)) for text in normalized),
+                            dtype=np.int64, count=len(normalized))
+        unique = list(position)
+        unique_indices = np.empty(len(unique), dtype=np.int32)
+        unique_confidences = np.empty(len(unique))
+
+        merchant_index = self.merchant_index
+        unknown = []
+        for u, text in enumerate(unique):
+            known = merchant_index.lookup(text) if merchant_index is not None else None
+            if known is None:
+                unknown.append(u)
+            else:
+                unique_indices[u], unique_confidences[u] = index_of(known[0]), known[1]
+
+        representatives, group_of = self._group_inputs(active, [unique[u] for u in unknown])
+        group_indices = np.empty(len(representatives), dtype=np.int32)
+        group_confidences = np.empty(len(representatives))
+        chunk_size = max(1, chunk_size or self.batch_chunk_size)
+        for start in range(0, len(representatives), chunk_size):
+            chunk = representatives[start:start + chunk_size]
+            stop = start + len(chunk)
+            CHUNK_BATCH_SIZE.observe(len(chunk))
+            try:
+                probabilities = active.predict_proba(chunk)
+            except Exception:
+                CHUNK_ERRORS.inc()
+                logger.warning("Bulk prediction failed; retrying %d rows one by one", len(chunk), exc_info=True)
+                for offset, text in enumerate(chunk):
+                    label, confidence = self._predict_row(active, text)
+                    group_indices[start + offset], group_confidences[start + offset] = index_of(label), confidence
+                continue
+            # Model classes come first in ``labels``, so argmax columns are label indices
+            group_indices[start:stop] = probabilities.argmax(axis=1)
+            group_confidences[start:stop] = probabilities.max(axis=1)
+
+        if unknown:
+            groups = np.fromiter((group_of[unique[u]] for u in unknown), dtype=np.int64, count=len(unknown))
+            unique_indices[unknown] = group_indices[groups]
+            unique_confidences[unknown] = group_confidences[groups]
+
+        rows = np.asarray(rows, dtype=np.int64)
+        indices[rows] = unique_indices[codes]
+        confidences[rows] = unique_confidences[codes]
+        return np.array(labels, dtype=object), indices, confidences, active.version
+
+    def _predict_unique(self, active: LoadedModel, descriptions: List[str], k: int = None,
+                        chunk_size: int = None) -> Tuple[List, Dict]:
+        """
+        Score normalized descriptions once per group of identical model inputs
+
+        Descriptions are grouped first by normalized text and then by
+        ``LoadedModel.feature_signatures``, so statement rows that differ
+        only in reference codes, store ids or other terms the vectorizer
+        ignores share one representative. Representatives are scored chunk
+        by chunk with ``_predict_chunk`` and each result is fanned out to
+        every member of its group (and cached under the member's text).
+        Grouping never changes a prediction: members of a group are
+        vectorized to the same row.
+
+        Returns:
+            (results, report): results in input order, and a report with
+            ``scored`` (descriptions needing the model), ``groups``
+            (representatives actually scored), ``dedup_ratio``, ``model_ms``
+            and an estimate of the model time saved, ``saved_ms``
+        """
+        if not descriptions:
+            return [], self._dedup_report(0, 0, 0.0)
+
+        representatives, group_of = self._group_inputs(active, descriptions)
+        scoring = time.perf_counter()
+
+        chunk_size = max(1, chunk_size or self.batch_chunk_size)
+        scored = []
+        for start in range(0, len(representatives), chunk_size):
+            scored.extend(self._predict_chunk(active, representatives[start:start + chunk_size], k))
+        model_seconds = time.perf_counter() - scoring
+
+        version = active.version
+        for text, group in group_of.items():
+            best = scored[group][0] if k is not None else scored[group]
+            # Rows that failed fall back to ("Other", 0.0), which is never cached
+            if text != representatives[group] and best[1] > 0.0:
+                self.cache.put((version, text), best)
+
+        results = [scored[group_of[text]] for text in descriptions]
+        return results, self._dedup_report(len(descriptions), len(representatives), model_seconds)
+
+    def _predict_chunk(self, active: LoadedModel, descriptions: List[str], k: int = None) -> List:
+        """
+        Score one chunk of normalized descriptions with a single vectorizer and model pass
+
+        Returns (category, confidence) per row, or the top ``k`` of them per
+        row if ``k`` is given.
+        """
+        CHUNK_BATCH_SIZE.observe(len(descriptions))
+        try:
+            probabilities = active.predict_proba(descriptions)
+        except Exception:
+            CHUNK_ERRORS.inc()
+            logger.warning("Batch prediction failed; retrying %d rows one by one", len(descriptions), exc_info=True)
+            # Isolate the offending row(s) instead of failing the whole chunk
+            return [self._predict_row(active, description, k) for description in descriptions]
+
+        if k is not None:
+            ranked = top_k(active.classes_, probabilities, k)
+            for description, row in zip(descriptions, ranked):
+                self.cache.put((active.version, description), row[0])
+            return ranked
+
+        best = probabilities.argmax(axis=1)
+        labels = active.classes_[best]
+        confidences = probabilities[np.arange(len(descriptions)), best]
+
+        results = []
+        for description, label, confidence in zip(descriptions, labels.tolist(), confidences.tolist()):
+            result = (label, float(confidence))
+            self.cache.put((active.version, description), result)
+            results.append(result)
+        return results
+
+    def _predict_row(self, active: LoadedModel, description: str, k: int = None):
+        try:
+            if k is not None:
+                return active.predict_top_k(description, k)
+            return active.predict_one(description)
+        except Exception:
+            ROW_ERRORS.inc()
+            logger.exception("Prediction failed")
+            return [("Other", 0.0)] if k is not None else ("Other", 0.0)
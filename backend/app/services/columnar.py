@@ -0,0 +1,187 @@
+"""
+Bulk categorization of Parquet and Arrow IPC files
+"""
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from app.services.categorization import CategorizationService
+from app.services.importer import DESCRIPTION_COLUMNS
+
+
+COLUMNAR_FORMATS = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+DEFAULT_BULK_BATCH_ROWS = 65536
+OUTPUT_COLUMNS = ("predicted_category", "confidence", "model_version")
+MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet", "arrow": "application/vnd.apache.arrow.file"}
+
+
+class ColumnarUnavailable(RuntimeError):
+    """Raised when pyarrow is not installed"""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ColumnarUnavailable("Bulk Parquet/Arrow categorization needs the pyarrow package") from e
+    return pyarrow
+
+
+def detect_columnar_format(filename: str) -> Optional[str]:
+    """'parquet' or 'arrow' from a file name's extension, or None"""
+    return COLUMNAR_FORMATS.get(Path(filename or "").suffix.lower())
+
+
+def find_description_column(names) -> str:
+    """
+    The first column whose name is a known description header, case-insensitively
+
+    Raises:
+        ValueError: If there is no such column
+    """
+    lowered = {name.lower(): name for name in names}
+    for candidate in DESCRIPTION_COLUMNS:
+        if candidate in lowered:
+            return lowered[candidate]
+    raise ValueError(f"No description column; expected one of {DESCRIPTION_COLUMNS}")
+
+
+def iter_batches(path: str, fmt: str, batch_rows: int = DEFAULT_BULK_BATCH_ROWS) -> Iterator:
+    """
+    Record batches of a Parquet or Arrow IPC file, read lazily
+
+    Parquet is read ``batch_rows`` rows at a time. Arrow IPC files keep
+    the batch sizes they were written with and are memory-mapped, so
+    reading them copies nothing; both the random-access file format and
+    the streaming format are accepted.
+    """
+    pa = _pyarrow()
+    if fmt == "parquet":
+        yield from pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_rows)
+        return
+    if fmt != "arrow":
+        raise ValueError(f"Columnar format must be one of {sorted(set(COLUMNAR_FORMATS.values()))}")
+
+    with pa.memory_map(path, "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+        except pa.ArrowInvalid:
+            source.seek(0)
+            yield from pa.ipc.open_stream(source)
+            return
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def categorize_batch(service: CategorizationService, batch, column: str):
+    """
+    ``batch`` with the predicted category, confidence and model version appended
+
+    Only the description column is turned into Python strings, because
+    the vectorizer needs them. The new columns are built straight from the
+    prediction arrays: the category and model version columns are taken
+    from small label tables by index inside Arrow, so no Python object is
+    created per output row. The label table can differ between batches,
+    so the columns are written as plain strings (Parquet dictionary-encodes
+    them on disk).
+    """
+    pa = _pyarrow()
+    descriptions = batch.column(batch.schema.get_field_index(column))
+    if not pa.types.is_string(descriptions.type) and not pa.types.is_large_string(descriptions.type):
+        descriptions = pa.compute.cast(descriptions, pa.string())
+
+    labels, indices, confidences, version = service.batch_predict_arrays(descriptions.to_pylist())
+    categories = pa.compute.take(pa.array(labels, pa.string()), pa.array(indices, pa.int32()))
+    versions = pa.compute.take(
+        pa.array([version or ""], pa.string()), pa.array(np.zeros(len(indices), dtype=np.int32))
+    )
+
+    # Re-categorizing an earlier output replaces its prediction columns
+    keep = [i for i, name in enumerate(batch.schema.names) if name not in OUTPUT_COLUMNS]
+    arrays = [batch.column(i) for i in keep] + [categories, pa.array(confidences, pa.float32()), versions]
+    names = [batch.schema.names[i] for i in keep] + list(OUTPUT_COLUMNS)
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def categorize_file(service: CategorizationService, input_path: str, output_path: str,
+                    input_format: str = None, output_format: str = None, column: str = None,
+                    batch_rows: int = None) -> Dict:
+    """
+    Categorize a Parquet or Arrow IPC file into a new file, one record batch at a time
+
+    Every input column is kept and ``predicted_category``, ``confidence``
+    and ``model_version`` are appended. At most one batch is held in
+    memory. Formats default to the file extensions.
+
+    Args:
+        service: Loaded categorization service
+        input_path: Parquet or Arrow IPC file to read
+        output_path: File to write
+        input_format: "parquet" or "arrow"
+        output_format: "parquet" or "arrow" (defaults to the input format)
+        column: Description column (defaults to the first known description header)
+        batch_rows: Rows per Parquet read batch (env BULK_BATCH_ROWS)
+
+    Returns:
+        Row and batch counts, timings and the model version
+
+    Raises:
+        ValueError: If a format cannot be determined or there is no description column
+        ColumnarUnavailable: If pyarrow is not installed
+    """
+    pa = _pyarrow()
+    if batch_rows is None:
+        batch_rows = int(os.getenv("BULK_BATCH_ROWS", DEFAULT_BULK_BATCH_ROWS))
+    input_format = input_format or detect_columnar_format(input_path)
+    output_format = output_format or detect_columnar_format(output_path) or input_format
+    for fmt in (input_format, output_format):
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"Columnar format must be one of {sorted(MEDIA_TYPES)}")
+
+    started = time.perf_counter()
+    scoring_seconds = 0.0
+    rows = batches = 0
+    writer = None
+    try:
+        for batch in iter_batches(input_path, input_format, max(1, batch_rows)):
+            if column is None:
+                column = find_description_column(batch.schema.names)
+            elif column not in batch.schema.names:
+                raise ValueError(f"Input has no '{column}' column")
+
+            scored_at = time.perf_counter()
+            result = categorize_batch(service, batch, column)
+            scoring_seconds += time.perf_counter() - scored_at
+
+            if writer is None:
+                if output_format == "parquet":
+                    writer = pa.parquet.ParquetWriter(output_path, result.schema)
+                else:
+                    writer = pa.ipc.new_file(output_path, result.schema)
+            writer.write_batch(result)
+            rows += result.num_rows
+            batches += 1
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        raise ValueError("Input has no record batches")
+
+    seconds = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "batches": batches,
+        "column": column,
+        "format": output_format,
+        "seconds": round(seconds, 4),
+        "scoring_seconds": round(scoring_seconds, 4),
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else 0.0,
+        "model_version": service.model_version,
+    }
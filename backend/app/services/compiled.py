@@ -0,0 +1,239 @@
+"""
+Compiled linear scoring engine for TF-IDF + LogisticRegression models
+"""
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def _strip_accents_unicode(text: str) -> str:
+    normalized = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def _strip_accents_ascii(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("ASCII")
+
+
+_ACCENT_STRIPPERS = {
+    None: None,
+    "unicode": _strip_accents_unicode,
+    "ascii": _strip_accents_ascii,
+}
+
+
+class CompiledLinearModel:
+    """
+    Score text with plain NumPy arrays extracted from a fitted model
+
+    A TfidfVectorizer followed by a LogisticRegression is a tokenizer, an
+    idf-weighted and normalized bag of words, a dot product with ``coef_``
+    and a softmax (or logistic, for one-vs-rest models). This class holds
+    those pieces as compact arrays and reimplements the word analyzer, so
+    scoring skips sklearn's validation and dispatch layers while producing
+    the same probabilities.
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray, coef_t: np.ndarray,
+                 intercept: np.ndarray, classes: np.ndarray, config: Dict):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        # (n_features, n_coef_rows), feature-major so a row's features gather into one block
+        self.coef_t = coef_t
+        self.intercept = intercept
+        self.classes_ = classes
+        self.config = dict(config)
+
+        self._lowercase = config["lowercase"]
+        self._strip_accents = _ACCENT_STRIPPERS[config["strip_accents"]]
+        self._token_pattern = re.compile(config["token_pattern"])
+        self._stop_words = frozenset(config["stop_words"] or ())
+        self._min_n, self._max_n = config["ngram_range"]
+        self._binary = config["binary"]
+        self._sublinear_tf = config["sublinear_tf"]
+        self._norm = config["norm"]
+        self._ovr = config["ovr"]
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model) -> "CompiledLinearModel":
+        """
+        Extract arrays from a fitted TfidfVectorizer and linear classifier
+
+        The classifier must be a LogisticRegression or a log-loss
+        SGDClassifier, whose probabilities this engine reproduces; other
+        linear models turn scores into probabilities differently.
+
+        Raises:
+            ValueError: If the vectorizer or model uses options this engine
+                does not reimplement (custom analyzers, char n-grams, ...)
+        """
+        from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+        if not hasattr(vectorizer, "vocabulary_") or not hasattr(vectorizer, "idf_"):
+            raise ValueError("Only fitted TfidfVectorizers can be compiled")
+        if vectorizer.analyzer != "word" or callable(vectorizer.analyzer):
+            raise ValueError("Only word analyzers can be compiled")
+        if vectorizer.preprocessor is not None or vectorizer.tokenizer is not None:
+            raise ValueError("Custom preprocessors and tokenizers cannot be compiled")
+        if vectorizer.strip_accents not in _ACCENT_STRIPPERS:
+            raise ValueError(f"Unsupported strip_accents: {vectorizer.strip_accents!r}")
+        if vectorizer.norm not in ("l1", "l2", None):
+            raise ValueError(f"Unsupported norm: {vectorizer.norm!r}")
+        if not hasattr(model, "coef_") or not hasattr(model, "intercept_"):
+            raise ValueError("Model must be a fitted linear classifier")
+
+        n_features = len(vectorizer.vocabulary_)
+        if vectorizer.use_idf:
+            idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+        else:
+            idf = np.ones(n_features, dtype=np.float64)
+
+        if isinstance(model, LogisticRegression):
+            multi_class = getattr(model, "multi_class", "auto")
+            ovr = multi_class in ("ovr", "warn") or (
+                multi_class in ("auto", "deprecated")
+                and (len(model.classes_) <= 2 or model.solver == "liblinear")
+            )
+        elif isinstance(model, SGDClassifier) and model.loss in ("log_loss", "log"):
+            # SGDClassifier always trains one binary classifier per class
+            ovr = True
+        else:
+            raise ValueError(f"Cannot compile {type(model).__name__}; only LogisticRegression "
+                             "and log-loss SGDClassifier are supported")
+
+        stop_words = vectorizer.get_stop_words()
+        config = {
+            "lowercase": bool(vectorizer.lowercase),
+            "strip_accents": vectorizer.strip_accents,
+            "token_pattern": vectorizer.token_pattern,
+            "stop_words": sorted(stop_words) if stop_words else [],
+            "ngram_range": tuple(vectorizer.ngram_range),
+            "binary": bool(vectorizer.binary),
+            "sublinear_tf": bool(vectorizer.sublinear_tf),
+            "norm": vectorizer.norm,
+            "ovr": bool(ovr),
+        }
+        vocabulary = {term: int(index) for term, index in vectorizer.vocabulary_.items()}
+        return cls(
+            vocabulary,
+            idf,
+            np.ascontiguousarray(np.asarray(model.coef_, dtype=np.float64).T),
+            np.asarray(model.intercept_, dtype=np.float64),
+            np.asarray(model.classes_),
+            config,
+        )
+
+    def analyze(self, text: str) -> List[str]:
+        """Split text into the terms the vectorizer would count"""
+        if self._lowercase:
+            text = text.lower()
+        if self._strip_accents is not None:
+            text = self._strip_accents(text)
+
+        tokens = self._token_pattern.findall(text)
+        if self._stop_words:
+            tokens = [token for token in tokens if token not in self._stop_words]
+
+        min_n, max_n = self._min_n, self._max_n
+        if max_n == 1:
+            return tokens
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            for i in range(len(tokens) - n + 1):
+                terms.append(" ".join(tokens[i:i + n]))
+        return terms
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """Sorted feature indices of the in-vocabulary terms; texts with equal signatures score identically"""
+        vocabulary = self.vocabulary
+        return tuple(sorted(index for index in map(vocabulary.get, self.analyze(text)) if index is not None))
+
+    def transform_row(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return sorted feature indices and tf-idf values for one text"""
+        counts = {}
+        vocabulary = self.vocabulary
+        for term in self.analyze(text):
+            index = vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+
+        indices = np.fromiter(sorted(counts), dtype=np.int64, count=len(counts))
+        values = np.fromiter((counts[i] for i in indices.tolist()), dtype=np.float64, count=len(counts))
+        if self._binary:
+            values[:] = 1.0
+        elif self._sublinear_tf:
+            values = np.log(values) + 1.0
+        values *= self.idf[indices]
+
+        if self._norm == "l2":
+            norm = np.sqrt(np.dot(values, values))
+        elif self._norm == "l1":
+            norm = np.abs(values).sum()
+        else:
+            norm = 0.0
+        if norm > 0:
+            values /= norm
+        return indices, values
+
+    def transform(self, texts: List[str]) -> sp.csr_matrix:
+        """Vectorize texts into a CSR matrix"""
+        indptr = [0]
+        all_indices = []
+        all_values = []
+        for text in texts:
+            indices, values = self.transform_row(text)
+            all_indices.append(indices)
+            all_values.append(values)
+            indptr.append(indptr[-1] + len(indices))
+
+        n_features = self.coef_t.shape[0]
+        if not texts:
+            return sp.csr_matrix((0, n_features), dtype=np.float64)
+        return sp.csr_matrix(
+            (np.concatenate(all_values), np.concatenate(all_indices), np.asarray(indptr)),
+            shape=(len(texts), n_features),
+        )
+
+    def _probabilities(self, decision: np.ndarray) -> np.ndarray:
+        """Turn decision scores (n_rows, n_coef_rows) into class probabilities"""
+        if decision.shape[1] == 1:
+            decision = decision[:, 0]
+            if self._ovr:
+                positive = 1.0 / (1.0 + np.exp(-decision))
+                return np.column_stack([1.0 - positive, positive])
+            decision = np.column_stack([-decision, decision])
+        elif self._ovr:
+            probabilities = 1.0 / (1.0 + np.exp(-decision))
+            return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+        decision = decision - decision.max(axis=1, keepdims=True)
+        np.exp(decision, out=decision)
+        decision /= decision.sum(axis=1, keepdims=True)
+        return decision
+
+    def score(self, X: sp.csr_matrix) -> np.ndarray:
+        """Class probabilities for an already vectorized matrix"""
+        decision = np.asarray(X @ self.coef_t) + self.intercept
+        return self._probabilities(decision)
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Class probabilities for each text, shape (n_texts, n_classes)"""
+        return self.score(self.transform(texts))
+
+    def predict_one(self, text: str) -> Tuple[str, float]:
+        """Label and confidence for one text without building a sparse matrix"""
+        return self.score_row(*self.transform_row(text))
+
+    def score_row_proba(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Class probabilities for one row from ``transform_row``"""
+        decision = values @ self.coef_t[indices] + self.intercept
+        return self._probabilities(decision[np.newaxis, :])[0]
+
+    def score_row(self, indices: np.ndarray, values: np.ndarray) -> Tuple[str, float]:
+        """Label and confidence for one row from ``transform_row``"""
+        probabilities = self.score_row_proba(indices, values)
+        best = int(probabilities.argmax())
+        return self.classes_[best], float(probabilities[best])
@@ -0,0 +1,160 @@
+"""
+Worker pool that runs CPU-bound inference off the asyncio event loop
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from app.services.categorization import CategorizationService
+
+
+EXECUTOR_MODES = ("thread", "process")
+
+# Per-process service used when running in "process" mode
+_worker_service = None
+
+
+def _init_worker(service_options: Dict):
+    """Load a CategorizationService in each pool process"""
+    global _worker_service
+    _worker_service = CategorizationService(**service_options)
+
+
+def _call_worker(method: str, *args):
+    return getattr(_worker_service, method)(*args)
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when the pool and its queue are full"""
+
+
+class InferenceExecutor:
+    """
+    Run CategorizationService calls in a thread or process pool
+
+    At most ``workers + queue_size`` calls may be in flight; beyond that,
+    calls raise ``ExecutorSaturated`` so the API can shed load instead of
+    queueing without bound. Callers that prefer to wait (e.g. imports)
+    pass ``wait=True``.
+
+    Worker processes load their own service with the parent's model,
+    inference mode and review threshold; overlays are sent with each call.
+    The merchant index is updated by corrections in the API process and
+    cannot be shared, so process mode refuses a service that has one.
+    """
+
+    def __init__(self, service: CategorizationService, workers: int = None,
+                 queue_size: int = None, mode: str = None):
+        if workers is None:
+            workers = int(os.getenv("INFERENCE_WORKERS", os.cpu_count() or 1))
+        if queue_size is None:
+            queue_size = int(os.getenv("INFERENCE_QUEUE_SIZE", 64))
+        if mode is None:
+            mode = os.getenv("INFERENCE_EXECUTOR", "thread")
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Executor mode must be one of {EXECUTOR_MODES}")
+        if mode == "process" and service.merchant_index is not None:
+            raise ValueError("Process executor cannot use the merchant index; set MERCHANT_INDEX_ENABLED=false")
+
+        self.service = service
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.mode = mode
+        self.capacity = self.workers + self.queue_size
+        self.in_flight = 0
+        self.rejected = 0
+        self._slots = None
+
+        self._pool = self._create_pool()
+
+    def _create_pool(self):
+        if self.mode == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=({
+                    "model_path": self.service.model_path,
+                    "vectorizer_path": self.service.vectorizer_path,
+                    "batch_chunk_size": self.service.batch_chunk_size,
+                    "inference_mode": self.service.inference_mode,
+                    "artifact_dir": self.service.artifact_dir,
+                    "review_threshold": self.service.review_threshold,
+                },),
+            )
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+
+    def refresh(self):
+        """
+        Pick up a newly activated model
+
+        Threads share the service and need nothing. Worker processes hold
+        their own copy, so a new pool is started for new calls while the old
+        one finishes the calls it already accepted.
+        """
+        if self.mode != "process":
+            return
+        old_pool, self._pool = self._pool, self._create_pool()
+        old_pool.shutdown(wait=False)
+
+    async def run(self, method: str, *args, wait: bool = False):
+        """
+        Run a CategorizationService method in the pool
+
+        Args:
+            method: Name of the service method, e.g. "predict"
+            *args: Positional arguments for the method
+            wait: Wait for a free slot instead of raising when saturated
+
+        Returns:
+            The method's return value
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        if not wait and self._slots.locked():
+            self.rejected += 1
+            raise ExecutorSaturated("Inference queue is full")
+
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                if self.mode == "process":
+                    return await loop.run_in_executor(self._pool, _call_worker, method, *args)
+                return await loop.run_in_executor(self._pool, getattr(self.service, method), *args)
+            finally:
+                self.in_flight -= 1
+
+    async def predict(self, description: str, wait: bool = False) -> Tuple[str, float]:
+        return await self.run("predict", description, wait=wait)
+
+    async def batch_predict(self, descriptions: List[str], wait: bool = False) -> List[Tuple[str, float]]:
+        return await self.run("batch_predict", descriptions, wait=wait)
+
+    async def predict_top_k(self, description: str, k: int, wait: bool = False) -> List[Tuple[str, float]]:
+        return await self.run("predict_top_k", description, k, wait=wait)
+
+    async def batch_predict_top_k(self, descriptions: List[str], k: int,
+                                  wait: bool = False) -> List[List[Tuple[str, float]]]:
+        return await self.run("batch_predict_top_k", descriptions, k, wait=wait)
+
+    async def batch_predict_report(self, descriptions: List[str], k: int = 1,
+                                   wait: bool = False) -> Tuple[List[List[Tuple[str, float]]], Dict]:
+        return await self.run("batch_predict_report", descriptions, k, wait=wait)
+
+    async def batch_predict_overlay(self, descriptions: List[str], overlay, k: int,
+                                    wait: bool = False) -> List[List[Tuple[str, float]]]:
+        # In process mode the overlay is pickled with each call; overlays are small by design
+        return await self.run("batch_predict_overlay", descriptions, overlay, k, wait=wait)
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,215 @@
+"""
+Streaming import pipeline for bank statement exports (CSV/OFX)
+"""
+import codecs
+import csv
+import json
+import re
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.services.categorization import CategorizationService
+
+
+DEFAULT_READ_SIZE = 64 * 1024
+DEFAULT_CHUNK_ROWS = 1000
+CONFIDENCE_THRESHOLD = 0.5
+
+SUPPORTED_FORMATS = {".csv": "csv", ".ofx": "ofx", ".qfx": "ofx"}
+
+DESCRIPTION_COLUMNS = ("description", "memo", "name", "payee", "details")
+AMOUNT_COLUMNS = ("amount", "value", "debit")
+DATE_COLUMNS = ("date", "posted", "transaction date", "posting date")
+
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.IGNORECASE | re.DOTALL)
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+def detect_format(filename: str) -> Optional[str]:
+    """Return the import format for a filename, or None if unsupported"""
+    name = (filename or "").lower()
+    for extension, fmt in SUPPORTED_FORMATS.items():
+        if name.endswith(extension):
+            return fmt
+    return None
+
+
+def _parse_amount(value) -> Optional[float]:
+    if value is None:
+        return None
+    value = str(value).strip().replace(",", "").replace("$", "")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _find_column(header: List[str], candidates) -> Optional[int]:
+    normalized = [column.strip().lower() for column in header]
+    for candidate in candidates:
+        if candidate in normalized:
+            return normalized.index(candidate)
+    return None
+
+
+class ImportPipeline:
+    """
+    Categorize an uploaded statement without loading it into memory
+
+    The upload is read in fixed-size blocks, decoded incrementally and
+    parsed into rows, which are grouped into bounded chunks and scored with
+    ``CategorizationService.batch_predict`` (in the inference pool when an
+    executor is given). Memory use is bounded by the read size and chunk
+    size, not by the file size.
+    """
+
+    def __init__(self, service: CategorizationService, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 read_size: int = DEFAULT_READ_SIZE, executor=None):
+        self.service = service
+        self.executor = executor
+        self.chunk_rows = max(1, chunk_rows)
+        self.read_size = max(1024, read_size)
+
+    async def _iter_text(self, upload) -> AsyncIterator[str]:
+        """Yield decoded text blocks from an UploadFile-like object"""
+        decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        while True:
+            block = await upload.read(self.read_size)
+            if not block:
+                break
+            if isinstance(block, str):
+                yield block
+            else:
+                yield decoder.decode(block)
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    async def _iter_lines(self, upload) -> AsyncIterator[str]:
+        pending = ""
+        async for text in self._iter_text(upload):
+            pending += text
+            lines = pending.splitlines(keepends=True)
+            # The last piece may be an incomplete line; keep it for the next block
+            pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+            for line in lines:
+                yield line
+        if pending:
+            yield pending
+
+    async def iter_csv_rows(self, upload) -> AsyncIterator[Dict]:
+        """Yield transaction rows from a CSV upload"""
+        header = None
+        description_idx = amount_idx = date_idx = None
+        record = ""
+
+        async for line in self._iter_lines(upload):
+            record += line
+            # A quoted field may contain newlines; wait until quotes balance
+            if record.count('"') % 2:
+                continue
+            fields = next(csv.reader([record]), [])
+            record = ""
+            if not fields or not any(field.strip() for field in fields):
+                continue
+
+            if header is None:
+                header = fields
+                description_idx = _find_column(header, DESCRIPTION_COLUMNS)
+                if description_idx is None:
+                    raise ValueError("CSV must have a 'description' column")
+                amount_idx = _find_column(header, AMOUNT_COLUMNS)
+                date_idx = _find_column(header, DATE_COLUMNS)
+                continue
+
+            def field(idx):
+                return fields[idx] if idx is not None and idx < len(fields) else None
+
+            yield {
+                "description": (field(description_idx) or "").strip(),
+                "amount": _parse_amount(field(amount_idx)),
+                "date": field(date_idx),
+            }
+
+    async def iter_ofx_rows(self, upload) -> AsyncIterator[Dict]:
+        """Yield transaction rows from an OFX/QFX upload"""
+        buffer = ""
+        async for text in self._iter_text(upload):
+            buffer += text
+            end = 0
+            for match in _OFX_TRANSACTION.finditer(buffer):
+                fields = {key.upper(): value.strip() for key, value in _OFX_FIELD.findall(match.group(1))}
+                description = " ".join(filter(None, (fields.get("NAME"), fields.get("MEMO"))))
+                yield {
+                    "description": description,
+                    "amount": _parse_amount(fields.get("TRNAMT")),
+                    "date": fields.get("DTPOSTED"),
+                }
+                end = match.end()
+            buffer = buffer[end:]
+            # Drop header noise so the buffer never grows past one transaction
+            start = buffer.upper().find("<STMTTRN>")
+            buffer = buffer[start:] if start >= 0 else buffer[-len("<STMTTRN>"):]
+
+    async def iter_chunks(self, upload, fmt: str) -> AsyncIterator[List[Dict]]:
+        """Group parsed rows into chunks of at most ``chunk_rows``"""
+        rows = self.iter_ofx_rows(upload) if fmt == "ofx" else self.iter_csv_rows(upload)
+        chunk = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def categorize_chunk(self, chunk: List[Dict]) -> List[Dict]:
+        """Attach category and confidence to each row of a chunk"""
+        descriptions = [row["description"] for row in chunk]
+        if self.executor is not None:
+            # Imports wait for a free worker rather than being rejected
+            predictions = await self.executor.batch_predict(descriptions, wait=True)
+        else:
+            predictions = self.service.batch_predict(descriptions)
+        for row, (category, confidence) in zip(chunk, predictions):
+            row["category"] = category
+            row["confidence"] = round(confidence, 4)
+        return chunk
+
+    async def iter_results(self, upload, fmt: str, stats: Dict, sink=None) -> AsyncIterator[List[Dict]]:
+        """
+        Yield categorized chunks, updating ``stats`` as rows are processed
+
+        ``sink``, if given, is awaited with each categorized chunk before it
+        is yielded (e.g. to bulk insert it into the database).
+        """
+        started = time.perf_counter()
+        stats.update(processed=0, categorized=0, uncategorized=0)
+        async for chunk in self.iter_chunks(upload, fmt):
+            chunk = await self.categorize_chunk(chunk)
+            if sink is not None:
+                await sink(chunk)
+            categorized = sum(1 for row in chunk if row["confidence"] > CONFIDENCE_THRESHOLD)
+            stats["processed"] += len(chunk)
+            stats["categorized"] += categorized
+            stats["uncategorized"] += len(chunk) - categorized
+            yield chunk
+        elapsed = time.perf_counter() - started
+        stats["elapsed_seconds"] = round(elapsed, 4)
+        stats["rows_per_second"] = round(stats["processed"] / elapsed, 1) if elapsed > 0 else 0.0
+
+    async def run(self, upload, fmt: str, sink=None) -> Dict:
+        """Categorize the whole upload and return the summary counts"""
+        stats = {}
+        async for _ in self.iter_results(upload, fmt, stats, sink):
+            pass
+        return stats
+
+    async def stream_ndjson(self, upload, fmt: str, sink=None) -> AsyncIterator[str]:
+        """Yield one JSON line per row, followed by a final summary line"""
+        stats = {}
+        async for chunk in self.iter_results(upload, fmt, stats, sink):
+            yield "".join(json.dumps(row) + "\n" for row in chunk)
+        yield json.dumps({"summary": stats}) + "\n"
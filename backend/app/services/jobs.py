@@ -0,0 +1,536 @@
+"""
+Persistent background job queue for large imports and batch categorizations
+"""
+import asyncio
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+import uuid
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+JOB_KINDS = ("import", "batch")
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Same threshold the synchronous import uses for "categorized"
+CONFIDENCE_THRESHOLD = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    user_id INTEGER,
+    status TEXT NOT NULL,
+    fmt TEXT NOT NULL,
+    persist INTEGER NOT NULL DEFAULT 0,
+    input_path TEXT NOT NULL,
+    input_bytes INTEGER NOT NULL DEFAULT 0,
+    result_path TEXT NOT NULL,
+    result_bytes INTEGER NOT NULL DEFAULT 0,
+    bytes_read INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    categorized INTEGER NOT NULL DEFAULT 0,
+    uncategorized INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_user_status ON jobs (user_id, status);
+"""
+
+
+class JobLimitExceeded(RuntimeError):
+    """Raised when a user already has the maximum number of unfinished jobs"""
+
+
+class _Closing:
+    """sqlite3 connection that is closed, not just committed, by ``with``"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._conn
+
+    def __exit__(self, *exc_info):
+        if self._conn.in_transaction:
+            self._conn.execute("ROLLBACK")
+        self._conn.close()
+
+
+class JobQueue:
+    """
+    Local job queue persisted in SQLite
+
+    Each job's input is spooled to a file under ``spool_dir`` and its
+    per-row results are appended to an NDJSON file next to it. Workers
+    claim queued jobs in submission order, skipping users who already have
+    ``max_running_per_user`` jobs running, and checkpoint progress after
+    every chunk. A job whose worker stops sending heartbeats for
+    ``lease_seconds`` is requeued and resumes from its last checkpoint.
+
+    Every method opens its own short-lived connection, so one queue can be
+    shared by the API process and any number of worker processes.
+    """
+
+    def __init__(self, path: str = None, spool_dir: str = None, max_running_per_user: int = None,
+                 max_queued_per_user: int = None, lease_seconds: float = None):
+        if path is None:
+            path = os.getenv("JOB_DB_PATH", "jobs.db")
+        if spool_dir is None:
+            spool_dir = os.getenv("JOB_SPOOL_DIR", "job_spool")
+        if max_running_per_user is None:
+            max_running_per_user = int(os.getenv("JOB_MAX_RUNNING_PER_USER", 1))
+        if max_queued_per_user is None:
+            max_queued_per_user = int(os.getenv("JOB_MAX_QUEUED_PER_USER", 10))
+        if lease_seconds is None:
+            lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", 60))
+
+        self.path = path
+        self.spool_dir = spool_dir
+        self.max_running_per_user = max(1, max_running_per_user)
+        self.max_queued_per_user = max(1, max_queued_per_user)
+        self.lease_seconds = max(1.0, lease_seconds)
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> _Closing:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return _Closing(conn)
+
+    def new_job_paths(self, fmt: str) -> Dict[str, str]:
+        """Fresh job id with spool paths for its input and results"""
+        job_id = uuid.uuid4().hex
+        return {
+            "id": job_id,
+            "input_path": os.path.join(self.spool_dir, f"{job_id}.input.{fmt}"),
+            "result_path": os.path.join(self.spool_dir, f"{job_id}.results.ndjson"),
+        }
+
+    def submit(self, job_id: str, kind: str, fmt: str, input_path: str, result_path: str,
+               user_id: Optional[int] = None, persist: bool = False) -> Dict:
+        """
+        Queue a job whose input has already been written to ``input_path``
+
+        Raises:
+            ValueError: If ``kind`` is unknown
+            JobLimitExceeded: If the user has too many unfinished jobs
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Job kind must be one of {JOB_KINDS}")
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            unfinished = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE user_id IS ? AND status IN ('queued', 'running')",
+                (user_id,)
+            ).fetchone()[0]
+            if unfinished >= self.max_queued_per_user:
+                conn.execute("ROLLBACK")
+                raise JobLimitExceeded(f"At most {self.max_queued_per_user} unfinished jobs per user")
+            conn.execute(
+                "INSERT INTO jobs (id, kind, user_id, status, fmt, persist, input_path, input_bytes,"
+                " result_path, created_at) VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, user_id, fmt, int(persist), input_path, os.path.getsize(input_path),
+                 result_path, time.time())
+            )
+            conn.execute("COMMIT")
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Mark the oldest runnable queued job as running by ``worker`` and return it"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs AS j WHERE j.status = 'queued' AND ("
+                " SELECT COUNT(*) FROM jobs AS r WHERE r.status = 'running' AND r.user_id IS j.user_id"
+                ") < ? ORDER BY j.created_at LIMIT 1",
+                (self.max_running_per_user,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1,"
+                " started_at = COALESCE(started_at, ?), heartbeat_at = ? WHERE id = ?",
+                (worker, now, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        job = dict(row)
+        job.update(status="running", worker=worker, attempts=job["attempts"] + 1)
+        return job
+
+    def checkpoint(self, job_id: str, processed: int, categorized: int, uncategorized: int,
+                   result_bytes: int, bytes_read: int) -> bool:
+        """
+        Record progress after a chunk has been written
+
+        Returns:
+            True if cancellation has been requested and the worker should stop
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET processed = ?, categorized = ?, uncategorized = ?, result_bytes = ?,"
+                " bytes_read = ?, heartbeat_at = ? WHERE id = ?",
+                (processed, categorized, uncategorized, result_bytes, bytes_read, time.time(), job_id)
+            )
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def finish(self, job_id: str, status: str, error: str = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, worker = NULL WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+
+    def release(self, job_id: str):
+        """Put a running job back in the queue, keeping its checkpoint (e.g. on shutdown)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL WHERE id = ? AND status = 'running'", (job_id,)
+            )
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a job: queued jobs stop immediately, running ones at their next checkpoint
+
+        Returns:
+            The updated job, or None if there is no such job
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ?"
+                " WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+            )
+            conn.execute("COMMIT")
+        return self.get(job_id)
+
+    def requeue_stale(self) -> int:
+        """Requeue running jobs whose worker has not checkpointed within the lease"""
+        with self._connect() as conn:
+            requeued = conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL"
+                " WHERE status = 'running' AND heartbeat_at < ?",
+                (time.time() - self.lease_seconds,)
+            ).rowcount
+        if requeued:
+            logger.warning("Requeued %d stale jobs", requeued)
+        return requeued
+
+    def purge(self, max_age_seconds: float) -> int:
+        """Delete finished jobs older than ``max_age_seconds`` along with their files"""
+        cutoff = time.time() - max_age_seconds
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, input_path, result_path FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+                FINISHED_STATUSES + (cutoff,)
+            ).fetchall()
+            for row in rows:
+                for path in (row["input_path"], row["result_path"]):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                conn.execute("DELETE FROM jobs WHERE id = ?", (row["id"],))
+        return len(rows)
+
+    def stats(self) -> Dict:
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in ("queued", "running") + FINISHED_STATUSES}
+
+
+def job_status(job: Dict) -> Dict:
+    """Public view of a job row for the status endpoint"""
+    now = job["finished_at"] or time.time()
+    elapsed = now - job["started_at"] if job["started_at"] else 0.0
+    progress = job["bytes_read"] / job["input_bytes"] if job["input_bytes"] else 0.0
+    if job["status"] == "succeeded":
+        progress = 1.0
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "user_id": job["user_id"],
+        "processed": job["processed"],
+        "categorized": job["categorized"],
+        "uncategorized": job["uncategorized"],
+        "progress": round(min(progress, 1.0), 4),
+        "attempts": job["attempts"],
+        "cancel_requested": bool(job["cancel_requested"]),
+        "error": job["error"],
+        "elapsed_seconds": round(elapsed, 4),
+        "rows_per_second": round(job["processed"] / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def write_batch_input(path: str, descriptions: List[str]):
+    """Spool a batch categorization as a one-column CSV, so it runs through the import path"""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["description"])
+        writer.writerows([description] for description in descriptions)
+
+
+async def spool_upload(upload, path: str, read_size: int = 1024 * 1024) -> int:
+    """Copy an UploadFile to ``path`` block by block; returns the bytes written"""
+    loop = asyncio.get_running_loop()
+    written = 0
+    with open(path, "wb") as f:
+        while True:
+            block = await upload.read(read_size)
+            if not block:
+                break
+            await loop.run_in_executor(None, f.write, block)
+            written += len(block)
+    return written
+
+
+class _SpoolReader:
+    """UploadFile-like async reader over a spooled input that counts bytes read"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self.bytes_read = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        block = self._file.read(size)
+        self.bytes_read += len(block)
+        return block
+
+    def close(self):
+        self._file.close()
+
+
+class JobRunner:
+    """
+    Run one claimed job through the streaming import pipeline
+
+    Chunks are categorized, optionally persisted, appended to the result
+    file and then checkpointed. A resumed job truncates the result file to
+    the last checkpoint and skips the rows it had already processed, so a
+    crash costs at most one chunk of work. Persisted rows are keyed by job
+    and input row, so a chunk that was inserted but not checkpointed is not
+    inserted again on resume.
+
+    ``should_stop`` is polled after each chunk; when it returns True the
+    job is released back to the queue at its checkpoint.
+    """
+
+    def __init__(self, queue: JobQueue, pipeline, store=None, should_stop=None):
+        self.queue = queue
+        self.pipeline = pipeline
+        self.store = store
+        self.should_stop = should_stop or (lambda: False)
+
+    async def run(self, job: Dict) -> str:
+        """Process ``job`` to completion, cancellation or failure and return its status afterwards"""
+        job_id = job["id"]
+        processed, categorized, uncategorized = job["processed"], job["categorized"], job["uncategorized"]
+        result_bytes = job["result_bytes"]
+        if not os.path.exists(job["result_path"]) or os.path.getsize(job["result_path"]) < result_bytes:
+            # The results did not survive the crash; start over
+            processed = categorized = uncategorized = result_bytes = 0
+        skip = processed
+
+        reader = _SpoolReader(job["input_path"])
+        try:
+            with open(job["result_path"], "ab") as results:
+                results.truncate(result_bytes)
+                async for chunk in self.pipeline.iter_chunks(reader, job["fmt"]):
+                    if skip:
+                        if len(chunk) <= skip:
+                            skip -= len(chunk)
+                            continue
+                        chunk, skip = chunk[skip:], 0
+
+                    chunk = await self.pipeline.categorize_chunk(chunk)
+                    if job["persist"] and self.store is not None:
+                        await self.store.insert_transactions(
+                            chunk, job["user_id"], job_id=job_id, first_row=processed
+                        )
+                    results.write("".join(json.dumps(row) + "\n" for row in chunk).encode())
+                    results.flush()
+
+                    confident = sum(1 for row in chunk if row["confidence"] > CONFIDENCE_THRESHOLD)
+                    processed += len(chunk)
+                    categorized += confident
+                    uncategorized += len(chunk) - confident
+                    result_bytes = results.tell()
+                    if self.queue.checkpoint(job_id, processed, categorized, uncategorized,
+                                             result_bytes, reader.bytes_read):
+                        self.queue.finish(job_id, "cancelled")
+                        return "cancelled"
+                    if self.should_stop():
+                        self.queue.release(job_id)
+                        return "queued"
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            self.queue.finish(job_id, "failed", f"{type(e).__name__}: {e}")
+            return "failed"
+        finally:
+            reader.close()
+
+        self.queue.checkpoint(job_id, processed, categorized, uncategorized, result_bytes, reader.bytes_read)
+        self.queue.finish(job_id, "succeeded")
+        return "succeeded"
+
+
+def run_worker(queue_options: Dict, service_options: Dict, worker: str, stop_event,
+               poll_interval: float = 0.5, retention_seconds: float = 0):
+    """
+    Worker process main loop: claim, run and checkpoint jobs until ``stop_event`` is set
+
+    Each worker loads its own CategorizationService and, for jobs with
+    ``persist``, its own database pool. The model is reloaded between jobs
+    when the files on disk change.
+    """
+    from app.models.session import Database
+    from app.services.categorization import CategorizationService
+    from app.services.importer import ImportPipeline
+    from app.services.persistence import TransactionStore
+    from app.services.registry import ModelRegistry
+
+    queue = JobQueue(**queue_options)
+    service = CategorizationService(**service_options)
+    registry = ModelRegistry(service)
+    pipeline = ImportPipeline(service, chunk_rows=int(os.getenv("JOB_CHUNK_ROWS", 5000)))
+
+    async def main():
+        database = Database()
+        runner = JobRunner(queue, pipeline, TransactionStore(database), should_stop=stop_event.is_set)
+        last_maintenance = 0.0
+        try:
+            while not stop_event.is_set():
+                if time.monotonic() - last_maintenance > queue.lease_seconds / 2:
+                    queue.requeue_stale()
+                    if retention_seconds > 0:
+                        queue.purge(retention_seconds)
+                    last_maintenance = time.monotonic()
+
+                job = queue.claim(worker)
+                if job is None:
+                    await asyncio.sleep(poll_interval)
+                    continue
+                try:
+                    registry.reload_if_changed()
+                except Exception:
+                    logger.exception("Model reload failed; keeping the current version")
+                await runner.run(job)
+        finally:
+            await database.dispose()
+
+    asyncio.run(main())
+
+
+class JobWorkerPool:
+    """
+    Supervise ``workers`` job worker processes
+
+    Workers are started with the "spawn" method so they do not inherit the
+    API's event loop or open connections. A worker that dies is replaced on
+    the next ``check``; the job it held is requeued once its lease expires.
+    """
+
+    def __init__(self, queue: JobQueue, service_options: Dict, workers: int = None,
+                 retention_hours: float = None):
+        if workers is None:
+            workers = int(os.getenv("JOB_WORKERS", 1))
+        if retention_hours is None:
+            retention_hours = float(os.getenv("JOB_RETENTION_HOURS", 24))
+
+        self.queue = queue
+        self.service_options = service_options
+        self.workers = max(0, workers)
+        self.retention_seconds = max(0.0, retention_hours) * 3600
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes: List = []
+        self._watch_task = None
+
+    def _spawn(self, index: int):
+        queue_options = {
+            "path": self.queue.path,
+            "spool_dir": self.queue.spool_dir,
+            "max_running_per_user": self.queue.max_running_per_user,
+            "max_queued_per_user": self.queue.max_queued_per_user,
+            "lease_seconds": self.queue.lease_seconds,
+        }
+        process = self._context.Process(
+            target=run_worker,
+            args=(queue_options, self.service_options, f"worker-{index}-{uuid.uuid4().hex[:8]}", self._stop),
+            kwargs={"retention_seconds": self.retention_seconds},
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.check()
+
+    def start(self, check_interval: float = 5.0):
+        """Start the workers and, inside a running event loop, restart any that die"""
+        self._processes = [self._spawn(i) for i in range(self.workers)]
+        if self.workers and self._watch_task is None:
+            self._watch_task = asyncio.ensure_future(self._watch(check_interval))
+
+    def check(self):
+        """Replace worker processes that have exited"""
+        if self._stop.is_set():
+            return
+        for i, process in enumerate(self._processes):
+            if not process.is_alive():
+                logger.warning("Job worker %s exited with %s; restarting", process.pid, process.exitcode)
+                self._processes[i] = self._spawn(i)
+                self.restarts += 1
+
+    def shutdown(self, timeout: float = 10.0):
+        """Stop workers after their current chunk; unfinished jobs resume on the next start"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "alive": sum(1 for process in self._processes if process.is_alive()),
+            "restarts": self.restarts,
+            "jobs": self.queue.stats(),
+        }
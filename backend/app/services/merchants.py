@@ -0,0 +1,227 @@
+"""
+Merchant alias index answering recurring merchants without the model
+"""
+import csv
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.preprocessing import preprocess, preprocess_many
+
+
+MERCHANT_CONFIDENCE = 1.0
+# Aliases need this many tokens; a single leading word ("uber") covers
+# merchants with different categories ("uber trip", "uber eats")
+MIN_ALIAS_TOKENS = 2
+# Words that do not identify a merchant; aliases made only of these are skipped
+GENERIC_TOKENS = frozenset((
+    "a", "an", "and", "at", "bill", "by", "card", "co", "com", "credit", "debit", "for", "from", "in",
+    "inc", "llc", "ltd", "my", "of", "on", "online", "order", "pay", "payment", "pos", "purchase",
+    "store", "the", "to", "transfer", "www",
+))
+# Trie key holding the category of the alias ending at a node; not a valid token
+_CATEGORY = ""
+
+
+class AliasMatcher:
+    """
+    Token trie over merchant aliases, matched at the start of a description
+
+    Aliases are token sequences ("whole foods", "uber trip"). ``match``
+    walks a description's leading tokens down the trie and returns the
+    category of the longest alias the description starts with, in time
+    proportional to the alias length regardless of how many aliases there
+    are. Matching is anchored because normalized descriptions start with
+    the merchant; an alias found further in ("... the electric bill") is
+    usually a different merchant's words.
+    """
+
+    def __init__(self, aliases: Dict[Tuple[str, ...], str]):
+        self._root: Dict = {}
+        for alias, category in aliases.items():
+            node = self._root
+            for token in alias:
+                node = node.setdefault(token, {})
+            node[_CATEGORY] = category
+        self.size = len(aliases)
+
+    def match(self, tokens: List[str]) -> Optional[str]:
+        node = self._root
+        best = None
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                break
+            best = node.get(_CATEGORY, best)
+        return best
+
+
+class _Snapshot:
+    """Immutable exact-key map and alias matcher, swapped in as a whole"""
+
+    def __init__(self, exact: Dict[str, str], matcher: AliasMatcher):
+        self.exact = exact
+        self.matcher = matcher
+
+
+class MerchantIndex:
+    """
+    Fast path mapping known merchants straight to a category
+
+    Labelled descriptions (the training CSV, corrected transactions) are
+    normalized with the shared ``Processor`` and counted per full
+    description and per leading 2-``max_alias_tokens`` token prefix that
+    is not made only of generic words ("pay the"). A full description or
+    prefix seen at least ``min_support`` times with labels agreeing at
+    least ``min_purity`` of the time becomes an exact key or an alias
+    matched at the start of a description. Matches are returned with
+    confidence 1.0; everything else falls through to the model.
+
+    User corrections are counted like any other label, so one user's
+    correction only changes the shared answer once enough observations
+    agree; per-user answers come from user overlays. Every
+    ``rebuild_every`` corrections (or on ``rebuild()``) the whole index is
+    recomputed from the counts into a new snapshot, which is swapped in
+    under the lock so an older rebuild can never replace a newer one.
+    Lookups read the current snapshot without taking the lock.
+    """
+
+    def __init__(self, min_support: int = None, min_purity: float = None,
+                 max_alias_tokens: int = 3, rebuild_every: int = None):
+        if min_support is None:
+            min_support = int(os.getenv("MERCHANT_MIN_SUPPORT", 3))
+        if min_purity is None:
+            min_purity = float(os.getenv("MERCHANT_MIN_PURITY", 0.95))
+        if rebuild_every is None:
+            rebuild_every = int(os.getenv("MERCHANT_REBUILD_EVERY", 50))
+
+        self.min_support = max(1, min_support)
+        self.min_purity = min_purity
+        self.max_alias_tokens = max(MIN_ALIAS_TOKENS, max_alias_tokens)
+        self.rebuild_every = max(1, rebuild_every)
+
+        self._exact_counts: Dict[str, Counter] = {}
+        self._alias_counts: Dict[Tuple[str, ...], Counter] = {}
+        self._snapshot = _Snapshot({}, AliasMatcher({}))
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.corrections = 0
+        self.lookups = 0
+        self.exact_hits = 0
+        self.alias_hits = 0
+        self.rebuilds = 0
+        self.last_rebuild_seconds = 0.0
+
+    def _observe(self, normalized: str, category: str):
+        counts = self._exact_counts.get(normalized)
+        if counts is None:
+            counts = self._exact_counts[normalized] = Counter()
+        counts[category] += 1
+
+        tokens = normalized.split()
+        for n in range(MIN_ALIAS_TOKENS, min(len(tokens), self.max_alias_tokens) + 1):
+            alias = tuple(tokens[:n])
+            if GENERIC_TOKENS.issuperset(alias):
+                continue
+            counts = self._alias_counts.get(alias)
+            if counts is None:
+                counts = self._alias_counts[alias] = Counter()
+            counts[category] += 1
+
+    def _dominant(self, counts: Counter, min_support: int) -> Optional[str]:
+        category, count = counts.most_common(1)[0]
+        total = sum(counts.values())
+        if total >= min_support and count / total >= self.min_purity:
+            return category
+        return None
+
+    def add_many(self, pairs: Iterable[Tuple[str, str]]):
+        """Count labelled (description, category) pairs and rebuild the index"""
+        pairs = [(d, c) for d, c in pairs if isinstance(d, str) and isinstance(c, str) and c]
+        with self._lock:
+            for normalized, (_, category) in zip(preprocess_many([d for d, _ in pairs]), pairs):
+                self._observe(normalized, category)
+        self.rebuild()
+
+    def load_csv(self, path: str) -> int:
+        """
+        Add a labelled ``description,category`` CSV (e.g. the training set)
+
+        Returns:
+            Number of rows read; 0 if the file does not exist
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, newline="") as f:
+            pairs = [(row.get("description"), row.get("category")) for row in csv.DictReader(f)]
+        self.add_many(pairs)
+        return len(pairs)
+
+    def add_correction(self, description: str, category: str):
+        """Count a corrected description towards its exact key and aliases"""
+        normalized = preprocess(description)
+        with self._lock:
+            self._observe(normalized, category)
+            self.corrections += 1
+            self._pending += 1
+            rebuild = self._pending >= self.rebuild_every
+        if rebuild:
+            self.rebuild()
+
+    def rebuild(self):
+        """Recompute all exact keys and aliases from the counts and swap them in"""
+        started = time.perf_counter()
+        with self._lock:
+            exact = {}
+            for key, counts in self._exact_counts.items():
+                category = self._dominant(counts, self.min_support)
+                if category is not None:
+                    exact[key] = category
+            aliases = {}
+            for alias, counts in self._alias_counts.items():
+                category = self._dominant(counts, self.min_support)
+                if category is not None:
+                    aliases[alias] = category
+            self._pending = 0
+            self._snapshot = _Snapshot(exact, AliasMatcher(aliases))
+            self.rebuilds += 1
+            self.last_rebuild_seconds = time.perf_counter() - started
+
+    def lookup(self, normalized: str) -> Optional[Tuple[str, float]]:
+        """
+        Category for an already normalized description, or None on a miss
+
+        Exact keys win over aliases.
+        """
+        self.lookups += 1
+        snapshot = self._snapshot
+        category = snapshot.exact.get(normalized)
+        if category is None:
+            category = snapshot.matcher.match(normalized.split())
+            if category is None:
+                return None
+            self.alias_hits += 1
+            return category, MERCHANT_CONFIDENCE
+        self.exact_hits += 1
+        return category, MERCHANT_CONFIDENCE
+
+    @property
+    def hit_ratio(self) -> float:
+        return (self.exact_hits + self.alias_hits) / self.lookups if self.lookups else 0.0
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            "exact_keys": len(snapshot.exact),
+            "aliases": snapshot.matcher.size,
+            "corrections": self.corrections,
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "alias_hits": self.alias_hits,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "rebuilds": self.rebuilds,
+            "last_rebuild_seconds": round(self.last_rebuild_seconds, 4),
+        }
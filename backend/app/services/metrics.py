@@ -0,0 +1,334 @@
+"""
+Prometheus-style metrics for the inference hot path
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+LOAD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock", "_enabled")
+
+    def __init__(self, enabled: bool):
+        self.value = 0.0
+        self._lock = threading.Lock()
+        self._enabled = enabled
+
+    def inc(self, amount: float = 1.0):
+        if self._enabled:
+            with self._lock:
+                self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self, enabled: bool):
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from ``function()`` whenever metrics are rendered"""
+        self.function = function
+
+    def get(self) -> float:
+        return float(self.function()) if self.function is not None else self.value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock", "_enabled")
+
+    def __init__(self, enabled: bool, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+        self._enabled = enabled
+
+    def observe(self, value: float):
+        if not self._enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> "_Timer":
+        """Context manager observing the elapsed seconds of its block"""
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("child", "started")
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.child.observe(time.perf_counter() - self.started)
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), enabled: bool = True):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.enabled = enabled
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        """
+        The time series for one combination of label values
+
+        Hot paths should look children up once and keep them, rather than
+        pay for the label lookup on every observation.
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        return lines + self._samples()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild(self.enabled)
+
+    def inc(self, amount: float = 1.0, **labels):
+        self.labels(**labels).inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in sorted(self._children.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, set directly or read from a callback"""
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild(self.enabled)
+
+    def set(self, value: float, **labels):
+        self.labels(**labels).set(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in sorted(self._children.items()):
+            try:
+                value = child.get()
+            except Exception:
+                continue
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 enabled: bool = True, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames, enabled)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.enabled, self.buckets)
+
+    def observe(self, value: float, **labels):
+        self.labels(**labels).observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        bucket_labels = self.labelnames + ("le",)
+        for key, child in sorted(self._children.items()):
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_labels, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in Prometheus text format
+
+    With ``enabled=False`` (METRICS_ENABLED=false) observations are dropped
+    at the cost of one attribute check, so instrumented code needs no
+    conditionals of its own.
+    """
+
+    def __init__(self, enabled: bool = None):
+        if enabled is None:
+            enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames, self.enabled))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, self.enabled))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, self.enabled, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter(
+    "expenseflow_requests_total", "HTTP requests by endpoint, method and status", ("endpoint", "method", "status")
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "expenseflow_request_seconds", "HTTP request latency by endpoint", ("endpoint",)
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "expenseflow_stage_seconds", "Time spent in each request and inference stage", ("stage",)
+)
+BATCH_SIZE = REGISTRY.histogram(
+    "expenseflow_batch_size", "Descriptions scored per model call", ("source",), buckets=BATCH_SIZE_BUCKETS
+)
+PREDICTION_ERRORS = REGISTRY.counter(
+    "expenseflow_prediction_errors_total", "Predictions that failed and returned the fallback", ("stage",)
+)
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "expenseflow_model_load_seconds", "Time to load a model version", buckets=LOAD_BUCKETS
+)
+MODEL_RELOADS = REGISTRY.counter(
+    "expenseflow_model_reloads_total", "Model reload attempts by outcome", ("outcome",)
+)
+
+# Children used on the hot path, resolved once
+PARSE_SECONDS = STAGE_SECONDS.labels(stage="parse")
+VECTORIZE_SECONDS = STAGE_SECONDS.labels(stage="vectorize")
+PREDICT_PROBA_SECONDS = STAGE_SECONDS.labels(stage="predict_proba")
+SERIALIZE_SECONDS = STAGE_SECONDS.labels(stage="serialize")
+DEDUP_SECONDS = STAGE_SECONDS.labels(stage="dedup")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and timing them by route
+
+    Requests are labelled with the route's path template (e.g.
+    ``/api/categorize``), not the raw URL, so label cardinality stays
+    bounded; unmatched paths share the "unmatched" label. The arrival time
+    is stored in the request state as ``received_at`` so handlers can
+    observe the parse stage.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._requests = {}
+        self._latency = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        scope.setdefault("state", {})["received_at"] = started
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            key = (endpoint, scope.get("method", ""), status)
+            counter = self._requests.get(key)
+            if counter is None:
+                counter = self._requests[key] = REQUESTS.labels(endpoint=endpoint, method=key[1], status=status)
+                self._latency[endpoint] = REQUEST_SECONDS.labels(endpoint=endpoint)
+            counter.inc()
+            self._latency[endpoint].observe(time.perf_counter() - started)
+
+
+def observe_parse(scope: Dict):
+    """Record the time from request arrival to handler entry as the parse stage"""
+    received_at = scope.get("state", {}).get("received_at")
+    if received_at is not None:
+        PARSE_SECONDS.observe(time.perf_counter() - received_at)
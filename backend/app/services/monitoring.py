@@ -0,0 +1,304 @@
+"""
+Online accuracy and drift monitoring for the served model
+"""
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+DEFAULT_CONFIDENCE_BINS = 20
+# Smallest bin share used in the PSI so empty bins do not divide by zero
+_PSI_EPSILON = 1e-4
+
+
+class ConfusionCounter:
+    """
+    Streaming confusion matrix over a growing label set
+
+    Labels get integer ids on first sight, and counts live in a square
+    int64 array that doubles when it runs out of room, so each update is
+    O(1) amortized. True-positive, predicted and actual totals per label
+    are kept alongside, so precision and recall are read without summing
+    the matrix.
+    """
+
+    def __init__(self, labels: Sequence[str] = (), capacity: int = 16):
+        self.index: Dict[str, int] = {}
+        self.labels: List[str] = []
+        capacity = max(capacity, len(labels), 1)
+        self.matrix = np.zeros((capacity, capacity), dtype=np.int64)
+        self.true_positives = np.zeros(capacity, dtype=np.int64)
+        self.predicted = np.zeros(capacity, dtype=np.int64)
+        self.actual = np.zeros(capacity, dtype=np.int64)
+        self.total = 0
+        for label in labels:
+            self.label_id(label)
+
+    def label_id(self, label: str) -> int:
+        label_id = self.index.get(label)
+        if label_id is None:
+            label_id = self.index[label] = len(self.labels)
+            self.labels.append(label)
+            if label_id >= len(self.actual):
+                self._grow(2 * len(self.actual))
+        return label_id
+
+    def _grow(self, capacity: int):
+        matrix = np.zeros((capacity, capacity), dtype=np.int64)
+        size = len(self.actual)
+        matrix[:size, :size] = self.matrix
+        self.matrix = matrix
+        for name in ("true_positives", "predicted", "actual"):
+            counts = np.zeros(capacity, dtype=np.int64)
+            counts[:size] = getattr(self, name)
+            setattr(self, name, counts)
+
+    def add(self, actual: str, predicted: str):
+        """Count one (true label, predicted label) pair"""
+        row, column = self.label_id(actual), self.label_id(predicted)
+        self.matrix[row, column] += 1
+        self.actual[row] += 1
+        self.predicted[column] += 1
+        if row == column:
+            self.true_positives[row] += 1
+        self.total += 1
+
+    def accuracy(self) -> float:
+        return float(self.true_positives.sum() / self.total) if self.total else 0.0
+
+    def per_category(self) -> Dict[str, Dict]:
+        """Precision, recall and support of every label seen so far"""
+        n = len(self.labels)
+        tp, predicted, actual = self.true_positives[:n], self.predicted[:n], self.actual[:n]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predicted > 0, tp / predicted, 0.0)
+            recall = np.where(actual > 0, tp / actual, 0.0)
+        return {
+            label: {"precision": round(float(p), 4), "recall": round(float(r), 4), "support": int(s)}
+            for label, p, r, s in zip(self.labels, precision, recall, actual)
+        }
+
+    def to_dict(self) -> Dict:
+        n = len(self.labels)
+        return {"labels": list(self.labels), "matrix": self.matrix[:n, :n].tolist()}
+
+
+class RollingRate:
+    """Share of True outcomes among the last ``window`` observations, updated in O(1)"""
+
+    def __init__(self, window: int):
+        self.window = max(1, window)
+        self._ring = np.zeros(self.window, dtype=np.bool_)
+        self._position = 0
+        self.count = 0
+        self.hits = 0
+
+    def add(self, outcome: bool):
+        if self.count == self.window:
+            self.hits -= int(self._ring[self._position])
+        else:
+            self.count += 1
+        self._ring[self._position] = outcome
+        self.hits += int(outcome)
+        self._position = (self._position + 1) % self.window
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.window
+
+    @property
+    def rate(self) -> float:
+        return self.hits / self.count if self.count else 0.0
+
+
+class ConfidenceHistogram:
+    """
+    Histogram of the last ``window`` prediction confidences
+
+    Each confidence is stored as its bin number in a ring buffer, and the
+    bin counts are adjusted as values enter and leave the window: O(1)
+    per prediction, with no re-binning.
+    """
+
+    def __init__(self, window: int, bins: int = DEFAULT_CONFIDENCE_BINS):
+        self.window = max(1, window)
+        self.bins = max(2, bins)
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self._ring = np.zeros(self.window, dtype=np.int16)
+        self._position = 0
+        self.count = 0
+        self.total = 0.0
+
+    def _bin(self, confidence: float) -> int:
+        return min(self.bins - 1, max(0, int(confidence * self.bins)))
+
+    def add(self, confidence: float):
+        slot = self._bin(confidence)
+        if self.count == self.window:
+            evicted = int(self._ring[self._position])
+            self.counts[evicted] -= 1
+            self.total -= (evicted + 0.5) / self.bins
+        else:
+            self.count += 1
+        self._ring[self._position] = slot
+        self.counts[slot] += 1
+        self.total += (slot + 0.5) / self.bins
+        self._position = (self._position + 1) % self.window
+
+    def add_many(self, confidences: Sequence[float]):
+        for confidence in confidences:
+            self.add(confidence)
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.window
+
+    @property
+    def mean(self) -> float:
+        """Mean confidence, at bin-center resolution"""
+        return self.total / self.count if self.count else 0.0
+
+    def distribution(self) -> np.ndarray:
+        return self.counts / self.count if self.count else np.zeros(self.bins)
+
+
+def population_stability_index(reference: np.ndarray, current: np.ndarray) -> float:
+    """
+    PSI between two binned distributions
+
+    Rule of thumb: below 0.1 no shift, 0.1 to 0.2 moderate, above 0.2 a
+    significant shift.
+    """
+    reference = np.maximum(reference, _PSI_EPSILON)
+    current = np.maximum(current, _PSI_EPSILON)
+    return float(np.sum((current - reference) * np.log(current / reference)))
+
+
+class ModelMonitor:
+    """
+    Accuracy and confidence drift of the served model
+
+    Corrections update a confusion matrix (with per-category precision and
+    recall) and a rolling accuracy over the last ``correction_window``
+    reviewed predictions. Predictions update a histogram of the last
+    ``prediction_window`` confidences. After each model reset the first
+    full windows become the reference; later windows are compared with it,
+    and an alert is raised when accuracy falls by more than
+    ``accuracy_drop`` or the confidence distribution's PSI exceeds
+    ``psi_threshold``.
+
+    Accuracy is measured on reviewed transactions only (a correction whose
+    predicted and correct categories match counts as a confirmation), so
+    its absolute level depends on what users review; the alert looks at
+    its change.
+    """
+
+    def __init__(self, correction_window: int = None, prediction_window: int = None,
+                 accuracy_drop: float = None, psi_threshold: float = None, bins: int = None):
+        if correction_window is None:
+            correction_window = int(os.getenv("MONITOR_CORRECTION_WINDOW", 500))
+        if prediction_window is None:
+            prediction_window = int(os.getenv("MONITOR_PREDICTION_WINDOW", 10000))
+        if accuracy_drop is None:
+            accuracy_drop = float(os.getenv("MONITOR_ACCURACY_DROP", 0.05))
+        if psi_threshold is None:
+            psi_threshold = float(os.getenv("MONITOR_PSI_THRESHOLD", 0.2))
+        if bins is None:
+            bins = int(os.getenv("MONITOR_CONFIDENCE_BINS", DEFAULT_CONFIDENCE_BINS))
+
+        self.correction_window = max(1, correction_window)
+        self.prediction_window = max(1, prediction_window)
+        self.accuracy_drop = accuracy_drop
+        self.psi_threshold = psi_threshold
+        self.bins = bins
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, model_version: Optional[str] = None, labels: Sequence[str] = ()):
+        """Start over for a new model version; the next full windows become the reference"""
+        with self._lock:
+            self.model_version = model_version
+            self.confusion = ConfusionCounter(labels)
+            self.accuracy = RollingRate(self.correction_window)
+            self.confidence = ConfidenceHistogram(self.prediction_window, self.bins)
+            self.reference_accuracy: Optional[float] = None
+            self.reference_distribution: Optional[np.ndarray] = None
+            self.reference_mean: Optional[float] = None
+
+    def record_correction(self, predicted_category: Optional[str], correct_category: str):
+        """Count a reviewed prediction; ``predicted_category`` None is ignored"""
+        if predicted_category is None:
+            return
+        with self._lock:
+            self.confusion.add(correct_category, predicted_category)
+            self.accuracy.add(predicted_category == correct_category)
+            if self.reference_accuracy is None and self.accuracy.full:
+                self.reference_accuracy = self.accuracy.rate
+
+    def record_predictions(self, confidences: Sequence[float]):
+        with self._lock:
+            histogram = self.confidence
+            for confidence in confidences:
+                histogram.add(confidence)
+                if self.reference_distribution is None and histogram.full:
+                    self.reference_distribution = histogram.distribution()
+                    self.reference_mean = histogram.mean
+
+    def record_prediction(self, confidence: float):
+        self.record_predictions((confidence,))
+
+    def psi(self) -> Optional[float]:
+        if self.reference_distribution is None or not self.confidence.count:
+            return None
+        return population_stability_index(self.reference_distribution, self.confidence.distribution())
+
+    def alerts(self) -> List[Dict]:
+        """Current drift alerts; empty while the model looks stable or references are still filling"""
+        with self._lock:
+            alerts = []
+            if self.reference_accuracy is not None and self.accuracy.full:
+                drop = self.reference_accuracy - self.accuracy.rate
+                if drop > self.accuracy_drop:
+                    alerts.append({
+                        "kind": "accuracy",
+                        "reference": round(self.reference_accuracy, 4),
+                        "current": round(self.accuracy.rate, 4),
+                        "drop": round(drop, 4),
+                    })
+            psi = self.psi()
+            if psi is not None and self.confidence.full and psi > self.psi_threshold:
+                alerts.append({
+                    "kind": "confidence",
+                    "psi": round(psi, 4),
+                    "reference_mean": round(self.reference_mean, 4),
+                    "current_mean": round(self.confidence.mean, 4),
+                })
+            return alerts
+
+    @property
+    def drift_detected(self) -> bool:
+        return bool(self.alerts())
+
+    def stats(self, include_matrix: bool = False) -> Dict:
+        alerts = self.alerts()
+        with self._lock:
+            psi = self.psi()
+            stats = {
+                "model_version": self.model_version,
+                "corrections": self.confusion.total,
+                "accuracy": round(self.confusion.accuracy(), 4),
+                "window_accuracy": round(self.accuracy.rate, 4),
+                "reference_accuracy": self.reference_accuracy,
+                "predictions_in_window": self.confidence.count,
+                "mean_confidence": round(self.confidence.mean, 4),
+                "confidence_psi": round(psi, 4) if psi is not None else None,
+                "drift_detected": bool(alerts),
+                "alerts": alerts,
+            }
+            if include_matrix:
+                stats["per_category"] = self.confusion.per_category()
+                stats["confusion_matrix"] = self.confusion.to_dict()
+                stats["confidence_histogram"] = self.confidence.counts.tolist()
+            return stats
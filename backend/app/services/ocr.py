@@ -0,0 +1,349 @@
+"""
+Receipt OCR pipeline running in a bounded process pool
+"""
+import asyncio
+import io
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from app.services.executor import ExecutorSaturated, InferenceExecutor
+from app.services.metrics import STAGE_SECONDS
+
+
+OCR_ENGINES = ("tesseract", "stub")
+DEFAULT_MAX_IMAGE_SIDE = 1600
+
+_AMOUNT = re.compile(r"(?<![\d.,])(\d{1,3}(?:[,\s]\d{3})*|\d+)[.,](\d{2})(?!\d)")
+_TOTAL_LINE = re.compile(r"\b(?:grand\s+total|total|amount\s+due|balance\s+due|amount)\b", re.IGNORECASE)
+_SUBTOTAL_LINE = re.compile(r"\b(?:sub\s*-?\s*total|tax|tip|change|cash|savings|discount)\b", re.IGNORECASE)
+_SKIP_MERCHANT = re.compile(r"^(?:receipt|welcome|thank|store|tel|phone|www\.|http)", re.IGNORECASE)
+
+
+class OCREngineUnavailable(RuntimeError):
+    """Raised when the configured OCR engine cannot run on this host"""
+
+
+class OCREngine:
+    """Turns a receipt image into text"""
+
+    # Engines that read raw bytes skip the image decode stage
+    needs_image = True
+
+    def image_to_text(self, image) -> str:
+        raise NotImplementedError
+
+
+class TesseractEngine(OCREngine):
+    """Local Tesseract OCR through pytesseract"""
+
+    def __init__(self, config: str = "--oem 1 --psm 4"):
+        try:
+            import pytesseract
+        except ImportError as e:
+            raise OCREngineUnavailable("Tesseract OCR needs the pytesseract package") from e
+        self._pytesseract = pytesseract
+        self.config = config
+
+    def image_to_text(self, image) -> str:
+        try:
+            return self._pytesseract.image_to_string(image, config=self.config)
+        except self._pytesseract.TesseractNotFoundError as e:
+            raise OCREngineUnavailable("The tesseract binary is not installed") from e
+
+
+class StubEngine(OCREngine):
+    """
+    Engine for tests and local development
+
+    Returns ``text`` if given, otherwise the upload itself decoded as
+    UTF-8, so a plain-text "receipt" exercises the rest of the pipeline.
+    """
+    needs_image = False
+
+    def __init__(self, text: str = None):
+        self.text = text
+
+    def image_to_text(self, image) -> str:
+        if self.text is not None:
+            return self.text
+        return image.decode("utf-8", errors="ignore")
+
+
+def build_engine(name: str) -> OCREngine:
+    if name == "tesseract":
+        return TesseractEngine()
+    if name == "stub":
+        return StubEngine()
+    raise ValueError(f"OCR engine must be one of {OCR_ENGINES}")
+
+
+def decode_image(data: bytes, max_side: int = DEFAULT_MAX_IMAGE_SIDE):
+    """
+    Decode an upload into a grayscale image no larger than ``max_side``
+
+    JPEGs are decoded directly at a reduced scale (``draft``), which is
+    much cheaper than decoding at full size and resizing afterwards.
+
+    Raises:
+        ValueError: If the bytes are not a readable image, or decode to more
+            pixels than Pillow's decompression-bomb limit
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("L", (max_side, max_side))
+        image = ImageOps.exif_transpose(image).convert("L")
+        image.thumbnail((max_side, max_side))
+    except Image.DecompressionBombError as e:
+        raise ValueError(f"Image too large: {e}") from e
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError(f"Not a readable image: {e}") from e
+    return image
+
+
+def parse_amount(text: str) -> Optional[float]:
+    match = None
+    for match in _AMOUNT.finditer(text):
+        pass
+    if match is None:
+        return None
+    whole = re.sub(r"[,\s]", "", match.group(1))
+    return float(f"{whole}.{match.group(2)}")
+
+
+def extract_receipt_fields(text: str) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Merchant name and total from OCR text
+
+    The merchant is the first line near the top that is mostly letters and
+    not a greeting or contact line. The amount is the last figure on the
+    last "total"/"amount due" line that is not a subtotal, tax or tip line;
+    if there is none, the largest figure on the receipt.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+
+    merchant = None
+    for line in lines[:8]:
+        letters = sum(ch.isalpha() for ch in line)
+        if letters >= 3 and letters / len(line) >= 0.5 and not _SKIP_MERCHANT.match(line):
+            merchant = " ".join(line.split())
+            break
+
+    amount = None
+    for line in lines:
+        if _TOTAL_LINE.search(line) and not _SUBTOTAL_LINE.search(line):
+            value = parse_amount(line)
+            if value is not None:
+                amount = value
+    if amount is None:
+        values = [value for value in (parse_amount(line) for line in lines) if value is not None]
+        amount = max(values) if values else None
+
+    return merchant, amount
+
+
+def process_receipt(data: bytes, engine: OCREngine, max_side: int = DEFAULT_MAX_IMAGE_SIDE) -> Dict:
+    """Decode, OCR and extract fields from one receipt, timing each stage"""
+    timings = {}
+
+    started = time.perf_counter()
+    image = decode_image(data, max_side) if engine.needs_image else data
+    decoded = time.perf_counter()
+    timings["decode"] = decoded - started
+
+    text = engine.image_to_text(image)
+    recognized = time.perf_counter()
+    timings["ocr"] = recognized - decoded
+
+    merchant, amount = extract_receipt_fields(text)
+    timings["extract"] = time.perf_counter() - recognized
+
+    return {"text": text, "merchant": merchant, "amount": amount, "timings": timings}
+
+
+# Per-process engine used by the pool workers
+_worker_engine = None
+
+
+def _init_worker(engine_name: str):
+    global _worker_engine
+    try:
+        _worker_engine = build_engine(engine_name)
+    except OCREngineUnavailable as e:
+        # Report the problem per request instead of breaking the pool
+        _worker_engine = e
+
+
+def _process_in_worker(data: bytes, max_side: int) -> Dict:
+    if isinstance(_worker_engine, Exception):
+        raise OCREngineUnavailable(str(_worker_engine))
+    return process_receipt(data, _worker_engine, max_side)
+
+
+class ReceiptPipeline:
+    """
+    Categorize receipt images without blocking the event loop
+
+    Decoding, downscaling, OCR and field extraction run in a process pool
+    of ``workers`` processes, each with its own engine. At most
+    ``workers + queue_size`` receipts may be queued or running; beyond
+    that, single uploads raise ``ExecutorSaturated`` (429) while batch
+    uploads wait for a slot. The extracted merchant (or the first line of
+    text) is then categorized through the inference executor.
+
+    If a worker dies (e.g. killed for memory on a huge image) the pool is
+    broken; the receipts it held fail with ``OCREngineUnavailable`` and
+    the next receipt starts a new pool.
+    """
+
+    def __init__(self, executor: InferenceExecutor, engine: str = None, workers: int = None,
+                 queue_size: int = None, max_side: int = None):
+        if engine is None:
+            engine = os.getenv("OCR_ENGINE", "tesseract")
+        if engine not in OCR_ENGINES:
+            raise ValueError(f"OCR engine must be one of {OCR_ENGINES}")
+        if workers is None:
+            workers = int(os.getenv("OCR_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+        if queue_size is None:
+            queue_size = int(os.getenv("OCR_QUEUE_SIZE", 16))
+        if max_side is None:
+            max_side = int(os.getenv("OCR_MAX_IMAGE_SIDE", DEFAULT_MAX_IMAGE_SIDE))
+
+        self.executor = executor
+        self.engine = engine
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.max_side = max(64, max_side)
+
+        self.in_flight = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self._slots = None
+        self._pool = None
+        self._stage_metrics = {
+            stage: STAGE_SECONDS.labels(stage=f"ocr_{stage}")
+            for stage in ("decode", "ocr", "extract", "categorize")
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Started on first use so importing the app does not fork OCR workers
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.engine,)
+            )
+        return self._pool
+
+    async def _recognize(self, data: bytes, wait: bool) -> Dict:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        if not wait and self._slots.locked():
+            self.rejected += 1
+            raise ExecutorSaturated("OCR queue is full")
+
+        async with self._slots:
+            self.in_flight += 1
+            pool = self._get_pool()
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(pool, _process_in_worker, data, self.max_side)
+            except BrokenProcessPool as e:
+                if self._pool is pool:
+                    self._pool = None
+                    pool.shutdown(wait=False, cancel_futures=True)
+                raise OCREngineUnavailable("OCR worker died; retry the receipt") from e
+            finally:
+                self.in_flight -= 1
+
+    @staticmethod
+    def _query(result: Dict) -> str:
+        if result["merchant"]:
+            return result["merchant"]
+        lines = [line.strip() for line in result["text"].splitlines() if line.strip()]
+        return lines[0] if lines else ""
+
+    def _finish(self, result: Dict, prediction: Tuple[str, float], categorize_seconds: float) -> Dict:
+        category, confidence = prediction
+        timings = dict(result["timings"], categorize=categorize_seconds)
+        for stage, seconds in timings.items():
+            self._stage_metrics[stage].observe(seconds)
+        self.processed += 1
+        return {
+            "merchant": result["merchant"] or "",
+            "amount": result["amount"] if result["amount"] is not None else 0.0,
+            "category": category,
+            "confidence": round(confidence, 4),
+            "text": result["text"],
+            "timings_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+        }
+
+    async def process(self, data: bytes, wait: bool = False) -> Dict:
+        """
+        OCR and categorize one receipt
+
+        Raises:
+            ExecutorSaturated: If the OCR queue is full and ``wait`` is False
+            ValueError: If the upload is not a readable image
+            OCREngineUnavailable: If the OCR engine cannot run
+        """
+        try:
+            result = await self._recognize(data, wait)
+        except (ValueError, OCREngineUnavailable):
+            self.failed += 1
+            raise
+
+        started = time.perf_counter()
+        prediction = await self.executor.predict(self._query(result), wait=True)
+        return self._finish(result, prediction, time.perf_counter() - started)
+
+    async def process_many(self, images: List[bytes]) -> List[Dict]:
+        """
+        OCR a batch of receipts concurrently, then categorize them in one call
+
+        A receipt that cannot be read gets ``{"error": ...}`` in its slot
+        instead of failing the whole batch.
+        """
+        recognized = await asyncio.gather(
+            *(self._recognize(data, wait=True) for data in images), return_exceptions=True
+        )
+        for result in recognized:
+            if isinstance(result, OCREngineUnavailable):
+                raise result
+            if isinstance(result, BaseException) and not isinstance(result, ValueError):
+                raise result
+
+        readable = [result for result in recognized if not isinstance(result, BaseException)]
+        started = time.perf_counter()
+        predictions = await self.executor.batch_predict([self._query(r) for r in readable], wait=True)
+        categorize_seconds = (time.perf_counter() - started) / max(1, len(readable))
+
+        predictions = iter(predictions)
+        results = []
+        for result in recognized:
+            if isinstance(result, BaseException):
+                self.failed += 1
+                results.append({"error": str(result)})
+            else:
+                results.append(self._finish(result, next(predictions), categorize_seconds))
+        return results
+
+    def stats(self) -> Dict:
+        return {
+            "engine": self.engine,
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,148 @@
+"""
+Incremental model updates from user corrections
+"""
+import copy
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+
+from app.services.categorization import CategorizationService, LoadedModel, artifact_version
+from app.services.preprocessing import preprocess_many
+
+
+def supports_incremental_updates(loaded: Optional[LoadedModel]) -> bool:
+    """
+    True if ``loaded`` can be updated in place of a full retrain
+
+    That needs a classifier with ``partial_fit`` and a stateless vectorizer
+    (e.g. HashingVectorizer), so the feature space does not move when new
+    descriptions arrive.
+    """
+    if loaded is None or loaded.model is None or loaded.vectorizer is None:
+        return False
+    stateless = not hasattr(loaded.vectorizer, "vocabulary_") and not hasattr(loaded.vectorizer, "idf_")
+    return stateless and hasattr(loaded.model, "partial_fit")
+
+
+def _atomic_dump(obj, path: str):
+    tmp_path = f"{path}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class OnlineLearner:
+    """
+    Buffer corrections and apply them with ``partial_fit``
+
+    Once ``batch_size`` corrections are buffered (or on ``flush()``), the
+    active classifier is copied, updated with one ``partial_fit`` call,
+    written over MODEL_PATH and activated as a new version. In-flight
+    requests keep using the previous copy. Updates run one at a time, so
+    each starts from the model the previous one published.
+    """
+
+    def __init__(self, service: CategorizationService, batch_size: int = None):
+        if batch_size is None:
+            batch_size = int(os.getenv("ONLINE_UPDATE_BATCH", 32))
+
+        self.service = service
+        self.batch_size = max(1, batch_size)
+        self._buffer: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+
+        self.updates = 0
+        self.applied_corrections = 0
+        self.skipped_corrections = 0
+        self.last_update_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return supports_incremental_updates(self.service.active)
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def add(self, description: str, correct_category: str) -> Optional[LoadedModel]:
+        """
+        Buffer one correction, updating the model when the batch is full
+
+        Returns:
+            The new LoadedModel if an update was published, else None
+        """
+        with self._lock:
+            self._buffer.append((description, correct_category))
+            if len(self._buffer) < self.batch_size:
+                return None
+        return self.flush()
+
+    def flush(self) -> Optional[LoadedModel]:
+        """Apply all buffered corrections now"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return None
+        return self.update(batch)
+
+    def update(self, corrections: List[Tuple[str, str]]) -> Optional[LoadedModel]:
+        """
+        Apply a batch of (description, correct_category) pairs
+
+        Corrections to categories the model does not know are skipped, since
+        ``partial_fit`` cannot add classes.
+
+        Returns:
+            The new LoadedModel, or None if nothing was applied
+
+        Raises:
+            ValueError: If the active model cannot be updated incrementally
+        """
+        with self._update_lock:
+            return self._update(corrections)
+
+    def _update(self, corrections: List[Tuple[str, str]]) -> Optional[LoadedModel]:
+        active = self.service.active
+        if not supports_incremental_updates(active):
+            raise ValueError("Active model does not support incremental updates")
+
+        started = time.perf_counter()
+        known = set(active.model.classes_.tolist())
+        usable = [(d, c) for d, c in corrections if isinstance(d, str) and c in known]
+        self.skipped_corrections += len(corrections) - len(usable)
+        if not usable:
+            return None
+
+        descriptions, categories = zip(*usable)
+        model = copy.deepcopy(active.model)
+        model.partial_fit(active.vectorizer.transform(preprocess_many(descriptions)), list(categories))
+
+        model_path = self.service.model_path
+        _atomic_dump(model, model_path)
+        loaded = LoadedModel(
+            artifact_version(model_path, self.service.vectorizer_path),
+            model=model,
+            vectorizer=active.vectorizer,
+            source=model_path,
+            load_seconds=time.perf_counter() - started,
+        )
+        self.service.activate(loaded)
+
+        self.updates += 1
+        self.applied_corrections += len(usable)
+        self.last_update_seconds = time.perf_counter() - started
+        return loaded
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "pending": self.pending,
+            "batch_size": self.batch_size,
+            "updates": self.updates,
+            "applied_corrections": self.applied_corrections,
+            "skipped_corrections": self.skipped_corrections,
+            "last_update_seconds": round(self.last_update_seconds, 4),
+        }
@@ -0,0 +1,238 @@
+"""
+Per-user adjustment layers on top of the shared model
+"""
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.categorization import top_k
+from app.services.preprocessing import preprocess, preprocess_many
+
+
+# Lower bound on global probabilities before taking logs
+PROBABILITY_FLOOR = 1e-6
+
+# Rough per-entry costs of the dicts below, for the cache's memory budget
+_EXACT_ENTRY_BYTES = 160
+_TOKEN_ENTRY_BYTES = 200
+_BIAS_ENTRY_BYTES = 100
+
+
+class UserOverlay:
+    """
+    Sparse correction layer for one user
+
+    Learned from the user's corrections: an exact override per corrected
+    (normalized) description, and per-token log-odds biases that push
+    descriptions sharing words with a correction towards the corrected
+    category and away from the one that was predicted. At scoring time
+    the biases are added to the global model's log-probabilities, which
+    are then renormalized; categories the global model does not have
+    (custom user labels) start from a uniform prior over all labels.
+
+    Updates replace the exact, category and per-token dicts rather than
+    mutating them, so scoring threads never see a dict change size under
+    them.
+    """
+
+    def __init__(self, step: float = 1.0, max_weight: float = 4.0):
+        self.step = step
+        self.max_weight = max_weight
+        self.exact: Dict[str, str] = {}
+        self.bias: Dict[str, Dict[str, float]] = {}
+        self.categories: Dict[str, None] = {}
+        self.corrections = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.exact)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory footprint, used for cache eviction"""
+        bias_entries = sum(len(weights) for weights in self.bias.values())
+        return (
+            len(self.exact) * _EXACT_ENTRY_BYTES
+            + len(self.bias) * _TOKEN_ENTRY_BYTES
+            + bias_entries * _BIAS_ENTRY_BYTES
+        )
+
+    def learn(self, normalized: str, correct_category: str, predicted_category: str = None):
+        """Fold one correction of an already normalized description into the layer"""
+        exact = dict(self.exact)
+        exact[normalized] = correct_category
+        self.exact = exact
+        if correct_category not in self.categories:
+            categories = dict(self.categories)
+            categories[correct_category] = None
+            self.categories = categories
+        self._learn_tokens(normalized, correct_category, predicted_category)
+
+    def learn_many(self, corrections: Sequence[Tuple[str, str, Optional[str]]]):
+        """Learn (description, correct_category, predicted_category) rows, normalizing in one pass"""
+        descriptions = [description for description, _, _ in corrections]
+        exact, categories = dict(self.exact), dict(self.categories)
+        for normalized, (_, correct, predicted) in zip(preprocess_many(descriptions), corrections):
+            exact[normalized] = correct
+            categories.setdefault(correct, None)
+            self._learn_tokens(normalized, correct, predicted)
+        self.exact, self.categories = exact, categories
+
+    def _learn_tokens(self, normalized: str, correct_category: str, predicted_category: Optional[str]):
+        self.corrections += 1
+        for token in set(normalized.split()):
+            weights = dict(self.bias.get(token, ()))
+            weights[correct_category] = min(self.max_weight, weights.get(correct_category, 0.0) + self.step)
+            if predicted_category and predicted_category != correct_category:
+                weights[predicted_category] = max(
+                    -self.max_weight, weights.get(predicted_category, 0.0) - self.step / 2
+                )
+            self.bias[token] = weights
+
+    def override(self, normalized: str) -> Optional[str]:
+        return self.exact.get(normalized)
+
+    def touches(self, normalized: str) -> bool:
+        """Whether any token of the description carries a bias"""
+        bias = self.bias
+        return any(token in bias for token in normalized.split())
+
+    def rank(self, normalized: List[str], classes: np.ndarray, probabilities: np.ndarray,
+             k: int) -> List[List[Tuple[str, float]]]:
+        """
+        Top ``k`` categories per row after applying the biases to global probabilities
+
+        Args:
+            normalized: Normalized descriptions, one per row
+            classes: The global model's class labels
+            probabilities: Global probabilities, shape (rows, classes)
+            k: Number of categories to return per row
+        """
+        labels = list(classes)
+        columns = {label: i for i, label in enumerate(labels)}
+        for category in self.categories:
+            if category not in columns:
+                columns[category] = len(labels)
+                labels.append(category)
+
+        scores = np.full((len(normalized), len(labels)), -np.log(len(labels)))
+        scores[:, :probabilities.shape[1]] = np.log(np.maximum(probabilities, PROBABILITY_FLOOR))
+        bias = self.bias
+        for row, text in enumerate(normalized):
+            for token in text.split():
+                weights = bias.get(token)
+                if weights is None:
+                    continue
+                for category, weight in weights.items():
+                    column = columns.get(category)
+                    if column is not None:
+                        scores[row, column] += weight
+
+        scores -= scores.max(axis=1, keepdims=True)
+        adjusted = np.exp(scores)
+        adjusted /= adjusted.sum(axis=1, keepdims=True)
+        return top_k(np.array(labels, dtype=object), adjusted, k)
+
+
+class UserOverlayStore:
+    """
+    LRU cache of user overlays under a memory budget
+
+    An overlay is built from the user's stored corrections the first time
+    the user is scored (``loader(user_id)`` returns (description,
+    correct_category, predicted_category) rows) and kept until the
+    overlays' approximate total size exceeds ``max_bytes``, at which point
+    the least recently used ones are dropped. New corrections are applied
+    to a cached overlay immediately; uncached users pick them up from the
+    database on their next load.
+    """
+
+    def __init__(self, loader: Callable[[int], Awaitable[List[Tuple[str, str, Optional[str]]]]],
+                 max_bytes: int = None, step: float = None, max_weight: float = None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("USER_OVERLAY_CACHE_MB", 64)) * 1024 * 1024)
+        if step is None:
+            step = float(os.getenv("USER_OVERLAY_STEP", 1.0))
+        if max_weight is None:
+            max_weight = float(os.getenv("USER_OVERLAY_MAX_WEIGHT", 4.0))
+
+        self.loader = loader
+        self.max_bytes = max(0, max_bytes)
+        self.step = step
+        self.max_weight = max_weight
+
+        self._overlays: "OrderedDict[int, UserOverlay]" = OrderedDict()
+        self._sizes: Dict[int, int] = {}
+        self._loading: Dict[int, asyncio.Future] = {}
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _new_overlay(self) -> UserOverlay:
+        return UserOverlay(self.step, self.max_weight)
+
+    def _account(self, user_id: int, overlay: UserOverlay):
+        self.bytes += overlay.nbytes - self._sizes.get(user_id, 0)
+        self._sizes[user_id] = overlay.nbytes
+        # Keep at least the overlay just used, even if it alone is over budget
+        while self.bytes > self.max_bytes and len(self._overlays) > 1:
+            evicted, _ = self._overlays.popitem(last=False)
+            self.bytes -= self._sizes.pop(evicted)
+            self.evictions += 1
+
+    async def get(self, user_id: int) -> UserOverlay:
+        """The user's overlay, loading it on first use; empty if they have no corrections"""
+        overlay = self._overlays.get(user_id)
+        if overlay is not None:
+            self._overlays.move_to_end(user_id)
+            self.hits += 1
+            return overlay
+
+        self.misses += 1
+        pending = self._loading.get(user_id)
+        if pending is not None:
+            # Another request is already loading this user
+            return await asyncio.shield(pending)
+
+        pending = self._loading[user_id] = asyncio.get_running_loop().create_future()
+        try:
+            rows = await self.loader(user_id)
+            overlay = self._new_overlay()
+            if rows:
+                await asyncio.get_running_loop().run_in_executor(None, overlay.learn_many, rows)
+            self.loads += 1
+            self._overlays[user_id] = overlay
+            self._account(user_id, overlay)
+            pending.set_result(overlay)
+            return overlay
+        except BaseException as e:
+            pending.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            pending.exception()
+            raise
+        finally:
+            del self._loading[user_id]
+
+    def record(self, user_id: int, description: str, correct_category: str, predicted_category: str = None):
+        """Apply a new correction to the user's overlay if it is cached"""
+        overlay = self._overlays.get(user_id)
+        if overlay is None:
+            return
+        overlay.learn(preprocess(description), correct_category, predicted_category)
+        self._account(user_id, overlay)
+
+    def stats(self) -> Dict:
+        return {
+            "users": len(self._overlays),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,486 @@
+"""
+Bulk persistence of categorized transactions and corrections
+"""
+import base64
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import Correction, MonthlyCategoryTotal, Transaction, User
+from app.models.session import Database
+
+
+# Monthly totals of transactions without a user are kept under this id
+ANONYMOUS_USER = 0
+MAX_PAGE_SIZE = 500
+# Statement date layouts tried after ISO 8601; OFX dates are handled separately
+DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%d.%m.%Y", "%Y/%m/%d")
+_OFX_DATE = re.compile(r"^(\d{8})(\d{6})?")
+
+
+class UnknownUserError(ValueError):
+    """Raised when a write names a user id that has no ``users`` row"""
+
+
+def month_key(timestamp: datetime) -> str:
+    return timestamp.strftime("%Y-%m")
+
+
+def parse_transaction_date(value) -> Optional[datetime]:
+    """
+    Parse an imported row's date (CSV column or OFX DTPOSTED) into naive UTC
+
+    Returns:
+        The date, or None if it is missing or in an unknown layout
+    """
+    if not value:
+        return None
+    value = str(value).strip()
+    match = _OFX_DATE.match(value)
+    if match:
+        try:
+            return datetime.strptime(match.group(1) + (match.group(2) or "000000"), "%Y%m%d%H%M%S")
+        except ValueError:
+            return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        for layout in DATE_FORMATS:
+            try:
+                return datetime.strptime(value, layout)
+            except ValueError:
+                continue
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def encode_cursor(created_at: datetime, transaction_id: int) -> str:
+    """Opaque keyset cursor pointing just after (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{transaction_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Raises:
+        ValueError: If the cursor was not produced by ``encode_cursor``
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, transaction_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(transaction_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+class TransactionStore:
+    """
+    Write categorized transactions in batches
+
+    Rows go through ``session.execute(insert(Transaction), rows)``, which
+    SQLAlchemy sends as a single executemany (multi-row VALUES where the
+    driver supports it) instead of one ORM object and INSERT per row.
+
+    Writes naming a user id without a ``users`` row raise
+    ``UnknownUserError``. With ``auto_create_users`` (AUTO_CREATE_USERS) a
+    bare ``users`` row is created instead, for deployments that register
+    users nowhere else; user ids are not authenticated, so any caller can
+    then create users.
+    """
+
+    def __init__(self, database: Database, batch_size: int = None, auto_create_users: bool = None):
+        if batch_size is None:
+            batch_size = int(os.getenv("DB_INSERT_BATCH", 5000))
+        if auto_create_users is None:
+            auto_create_users = os.getenv("AUTO_CREATE_USERS", "false").lower() == "true"
+        self.database = database
+        self.batch_size = max(1, batch_size)
+        self.auto_create_users = auto_create_users
+        self.inserted = 0
+
+    @staticmethod
+    def _transaction_row(row: Dict, user_id: Optional[int], imported_at: datetime) -> Dict:
+        return {
+            "user_id": user_id,
+            "description": row["description"],
+            "amount": row.get("amount"),
+            "predicted_category": row.get("category"),
+            "predicted_confidence": row.get("confidence"),
+            "is_corrected": False,
+            "created_at": parse_transaction_date(row.get("date")) or imported_at,
+        }
+
+    async def insert_transactions(self, rows: List[Dict], user_id: Optional[int] = None,
+                                  session: AsyncSession = None, job_id: Optional[str] = None,
+                                  first_row: int = 0) -> int:
+        """
+        Bulk insert categorized rows
+
+        A row's ``created_at`` is its statement date (``date``), or the
+        import time when the date is missing or unreadable, and its amount
+        is counted in that month's totals.
+
+        Rows imported by a batch job are keyed by (``job_id``, input row
+        number), and rows already stored under their key are skipped, so
+        inserting a chunk again after a crash neither duplicates
+        transactions nor counts them twice in the monthly totals.
+
+        Args:
+            rows: Dicts with description, amount, category, confidence and
+                optionally date
+            user_id: Owner of the transactions
+            session: Session to use; a new one is committed if omitted
+            job_id: Batch job the rows come from
+            first_row: Input row number of ``rows[0]`` within the job
+
+        Returns:
+            Number of rows inserted
+
+        Raises:
+            UnknownUserError: If ``user_id`` is not a registered user
+        """
+        if not rows:
+            return 0
+        if session is None:
+            async with self.database.session() as session:
+                return await self.insert_transactions(rows, user_id, session, job_id, first_row)
+
+        await self._ensure_user(session, user_id)
+        imported_at = datetime.utcnow()
+        rows = [self._transaction_row(row, user_id, imported_at) for row in rows]
+        statement = insert(Transaction)
+        if job_id is not None:
+            for index, row in enumerate(rows, first_row):
+                row["import_job_id"], row["import_row"] = job_id, index
+            stored = set((await session.execute(
+                select(Transaction.import_row).where(
+                    Transaction.import_job_id == job_id,
+                    Transaction.import_row >= first_row,
+                    Transaction.import_row < first_row + len(rows),
+                )
+            )).scalars())
+            rows = [row for row in rows if row["import_row"] not in stored]
+            statement = self._upsert(Transaction).on_conflict_do_nothing(
+                index_elements=["import_job_id", "import_row"]
+            )
+            if not rows:
+                return 0
+
+        deltas = defaultdict(lambda: [0.0, 0])
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            await session.execute(statement, batch)
+            for row in batch:
+                delta = deltas[(month_key(row["created_at"]), row["predicted_category"] or "Other")]
+                delta[0] += row["amount"] or 0.0
+                delta[1] += 1
+
+        await self._apply_totals(session, [
+            (user_id, month, category, total, count) for (month, category), (total, count) in deltas.items()
+        ])
+        self.inserted += len(rows)
+        return len(rows)
+
+    def _upsert(self, model):
+        """Dialect-specific INSERT supporting ON CONFLICT"""
+        dialect = self.database.engine.dialect.name
+        return (postgresql_insert if dialect == "postgresql" else sqlite_insert)(model)
+
+    async def check_user(self, user_id: Optional[int], session: AsyncSession = None):
+        """
+        Fail early for a write that ``_ensure_user`` would reject
+
+        Raises:
+            UnknownUserError: If ``user_id`` is not a registered user and
+                users are not created automatically
+        """
+        if user_id is None or self.auto_create_users:
+            return
+        if session is None:
+            async with self.database.session() as session:
+                return await self.check_user(user_id, session)
+        if (await session.execute(select(User.id).where(User.id == user_id))).first() is None:
+            raise UnknownUserError(f"Unknown user {user_id}")
+
+    async def _ensure_user(self, session: AsyncSession, user_id: Optional[int]):
+        """Check that ``user_id`` exists, or create a bare users row for it with ``auto_create_users``"""
+        if user_id is None:
+            return
+        if not self.auto_create_users:
+            await self.check_user(user_id, session)
+            return
+        await session.execute(self._upsert(User).values(id=user_id).on_conflict_do_nothing(index_elements=["id"]))
+
+    async def _apply_totals(self, session: AsyncSession, deltas: List[Tuple]):
+        """Add (user_id, month, category, amount, count) deltas to the monthly totals in one upsert"""
+        if not deltas:
+            return
+        statement = self._upsert(MonthlyCategoryTotal)
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "month", "category"],
+            set_={
+                "total_amount": MonthlyCategoryTotal.total_amount + statement.excluded.total_amount,
+                "transaction_count": MonthlyCategoryTotal.transaction_count + statement.excluded.transaction_count,
+            }
+        )
+        await session.execute(statement, [
+            {
+                "user_id": ANONYMOUS_USER if user_id is None else user_id,
+                "month": month,
+                "category": category,
+                "total_amount": amount,
+                "transaction_count": count,
+            }
+            for user_id, month, category, amount, count in deltas
+        ])
+
+    async def record_correction(self, correct_category: str, transaction_id: Optional[int] = None,
+                                predicted_category: Optional[str] = None, user_id: Optional[int] = None,
+                                description: Optional[str] = None,
+                                session: AsyncSession = None) -> Optional[Transaction]:
+        """
+        Store a correction and mark its transaction as corrected
+
+        The corrected description (``description``, or the transaction's)
+        is stored on the correction too, so corrections without a stored
+        transaction can still rebuild user overlays.
+
+        Returns:
+            The corrected Transaction, or None if there is no such transaction
+
+        Raises:
+            UnknownUserError: If ``user_id`` is not a registered user
+        """
+        if session is None:
+            async with self.database.session() as session:
+                return await self.record_correction(
+                    correct_category, transaction_id, predicted_category, user_id, description, session
+                )
+
+        transaction = None
+        if transaction_id is not None:
+            transaction = (await session.execute(
+                select(Transaction).where(Transaction.id == transaction_id)
+            )).scalar_one_or_none()
+        if transaction is not None:
+            predicted_category = predicted_category or transaction.predicted_category
+            user_id = user_id if user_id is not None else transaction.user_id
+            description = description if description is not None else transaction.description
+            previous_category = transaction.actual_category or transaction.predicted_category or "Other"
+            await session.execute(
+                update(Transaction)
+                .where(Transaction.id == transaction_id)
+                .values(actual_category=correct_category, is_corrected=True)
+            )
+            if previous_category != correct_category and transaction.created_at is not None:
+                # Move the transaction between categories in its month's totals
+                month = month_key(transaction.created_at)
+                amount = transaction.amount or 0.0
+                await self._apply_totals(session, [
+                    (transaction.user_id, month, previous_category, -amount, -1),
+                    (transaction.user_id, month, correct_category, amount, 1),
+                ])
+
+        await self._ensure_user(session, user_id)
+        await session.execute(insert(Correction).values(
+            user_id=user_id,
+            transaction_id=transaction.id if transaction is not None else None,
+            description=description,
+            predicted_category=predicted_category,
+            correct_category=correct_category,
+        ))
+        return transaction
+
+    async def corrected_descriptions(self, session: AsyncSession = None) -> List[Tuple[str, str]]:
+        """
+        (description, category) pairs confirmed by users, oldest first
+
+        Used to seed the merchant index; uncorrected predictions are left
+        out so the model's own mistakes are not fed back into it.
+        """
+        if session is None:
+            async with self.database.session() as session:
+                return await self.corrected_descriptions(session)
+
+        result = await session.execute(
+            select(Transaction.description, Transaction.actual_category)
+            .where(Transaction.is_corrected.is_(True), Transaction.actual_category.is_not(None))
+            .order_by(Transaction.id)
+        )
+        return [(description, category) for description, category in result.all()]
+
+    async def user_corrections(self, user_id: int,
+                               session: AsyncSession = None) -> List[Tuple[str, str, Optional[str]]]:
+        """
+        (description, correct_category, predicted_category) for one user's corrections, oldest first
+
+        Used to build the user's scoring overlay. The description stored on
+        the correction is used, falling back to its transaction's for
+        corrections recorded before descriptions were stored; corrections
+        with neither are skipped.
+        """
+        if session is None:
+            async with self.database.session() as session:
+                return await self.user_corrections(user_id, session)
+
+        description = func.coalesce(Correction.description, Transaction.description)
+        result = await session.execute(
+            select(description, Correction.correct_category, Correction.predicted_category)
+            .outerjoin(Transaction, Correction.transaction_id == Transaction.id)
+            .where(Correction.user_id == user_id, description.is_not(None))
+            .order_by(Correction.id)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def list_transactions(self, user_id: Optional[int] = None, start: datetime = None, end: datetime = None,
+                                category: str = None, needs_review: bool = None, review_threshold: float = 0.5,
+                                limit: int = 50, cursor: str = None,
+                                session: AsyncSession = None) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        One keyset page of a user's transactions, newest first
+
+        Pages are ordered by (created_at, id) and continue after ``cursor``,
+        so each page is an index range scan no matter how deep it is.
+
+        Args:
+            user_id: Owner; None lists transactions without a user
+            start: Include transactions dated at or after this time
+            end: Include transactions dated before this time
+            category: Corrected category, or predicted if not corrected
+            needs_review: True for uncorrected rows below ``review_threshold``,
+                False for the rest
+            review_threshold: Confidence below which a prediction needs review
+            limit: Page size, at most MAX_PAGE_SIZE
+            cursor: ``next_cursor`` of the previous page
+
+        Returns:
+            (transactions, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        if session is None:
+            async with self.database.session() as session:
+                return await self.list_transactions(
+                    user_id, start, end, category, needs_review, review_threshold, limit, cursor, session
+                )
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = select(Transaction).where(
+            Transaction.user_id.is_(None) if user_id is None else Transaction.user_id == user_id
+        )
+        if start is not None:
+            query = query.where(Transaction.created_at >= start)
+        if end is not None:
+            query = query.where(Transaction.created_at < end)
+        if category is not None:
+            query = query.where(or_(
+                Transaction.actual_category == category,
+                and_(Transaction.actual_category.is_(None), Transaction.predicted_category == category),
+            ))
+        if needs_review is not None:
+            uncertain = and_(
+                Transaction.is_corrected.is_(False),
+                or_(Transaction.predicted_confidence.is_(None), Transaction.predicted_confidence < review_threshold),
+            )
+            query = query.where(uncertain if needs_review else ~uncertain)
+        if cursor is not None:
+            created_at, transaction_id = decode_cursor(cursor)
+            query = query.where(tuple_(Transaction.created_at, Transaction.id) < tuple_(created_at, transaction_id))
+
+        query = query.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(limit + 1)
+        transactions = list((await session.execute(query)).scalars().all())
+
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            last = transactions[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return transactions, next_cursor
+
+    async def monthly_totals(self, user_id: Optional[int] = None, start_month: str = None, end_month: str = None,
+                             session: AsyncSession = None) -> List[Dict]:
+        """
+        Materialized per-category spending by month, oldest month first
+
+        Args:
+            user_id: Owner; None for transactions without a user
+            start_month: First month to include, "YYYY-MM"
+            end_month: Last month to include, "YYYY-MM"
+
+        Returns:
+            Dicts with month, category, total_amount and transaction_count
+        """
+        if session is None:
+            async with self.database.session() as session:
+                return await self.monthly_totals(user_id, start_month, end_month, session)
+
+        query = select(MonthlyCategoryTotal).where(
+            MonthlyCategoryTotal.user_id == (ANONYMOUS_USER if user_id is None else user_id),
+            MonthlyCategoryTotal.transaction_count > 0,
+        )
+        if start_month is not None:
+            query = query.where(MonthlyCategoryTotal.month >= start_month)
+        if end_month is not None:
+            query = query.where(MonthlyCategoryTotal.month <= end_month)
+        query = query.order_by(MonthlyCategoryTotal.month, MonthlyCategoryTotal.category)
+        return [
+            {
+                "month": total.month,
+                "category": total.category,
+                "total_amount": round(total.total_amount, 2),
+                "transaction_count": total.transaction_count,
+            }
+            for total in (await session.execute(query)).scalars()
+        ]
+
+    async def backfill_monthly_totals(self, session: AsyncSession = None) -> int:
+        """
+        Build the monthly totals from the transactions if the totals table is empty
+
+        Needed once for databases created before the totals existed; after
+        that, inserts and corrections keep them current.
+
+        Returns:
+            Number of (user, month, category) totals written
+        """
+        if session is None:
+            async with self.database.session() as session:
+                return await self.backfill_monthly_totals(session)
+
+        if (await session.execute(select(MonthlyCategoryTotal.user_id).limit(1))).first() is not None:
+            return 0
+
+        if self.database.engine.dialect.name == "postgresql":
+            month = func.to_char(Transaction.created_at, "YYYY-MM")
+        else:
+            month = func.strftime("%Y-%m", Transaction.created_at)
+        category = func.coalesce(Transaction.actual_category, Transaction.predicted_category, "Other")
+        result = await session.execute(
+            select(
+                func.coalesce(Transaction.user_id, ANONYMOUS_USER), month, category,
+                func.coalesce(func.sum(Transaction.amount), 0.0), func.count(Transaction.id),
+            )
+            .where(Transaction.created_at.is_not(None))
+            .group_by(func.coalesce(Transaction.user_id, ANONYMOUS_USER), month, category)
+        )
+        totals = [
+            {"user_id": user_id, "month": month, "category": category, "total_amount": total,
+             "transaction_count": count}
+            for user_id, month, category, total, count in result.all()
+        ]
+        if totals:
+            await session.execute(insert(MonthlyCategoryTotal), totals)
+        return len(totals)
+
+    def stats(self) -> Dict:
+        return {"inserted": self.inserted, "batch_size": self.batch_size}
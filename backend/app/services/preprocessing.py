@@ -0,0 +1,15 @@
+"""
+Shared description normalization for training and serving
+"""
+import sys
+from pathlib import Path
+
+# The normalizer lives in the top-level src package so the training
+# scripts, the API and the CLI all run exactly the same code
+_REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from src.preprocessing.processor import Processor, preprocess, preprocess_many  # noqa: E402
+
+__all__ = ["Processor", "preprocess", "preprocess_many"]
@@ -0,0 +1,189 @@
+"""
+Model registry with zero-downtime hot reload
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.services.artifacts import LATEST_FILE, MANIFEST_FILE
+from app.services.categorization import CategorizationService, LoadedModel
+from app.services.metrics import MODEL_RELOADS
+
+
+logger = logging.getLogger(__name__)
+
+
+WARMUP_DESCRIPTIONS = [
+    "Starbucks Coffee",
+    "Uber Ride",
+    "Electric Bill",
+    "Amazon Purchase",
+]
+
+
+class ModelRegistry:
+    """
+    Load new model versions in the background and swap them in atomically
+
+    A reload builds a complete LoadedModel (classifier and vectorizer, or a
+    compiled artifact), warms it up, and only then hands it to
+    ``CategorizationService.activate``. Requests already running finish on
+    the version they started with. If loading fails, the current model stays
+    active.
+
+    Reloads are triggered by ``reload()`` or, when ``poll_interval`` is
+    positive, by watching the model files for changes. A change must be seen
+    on two consecutive polls before it is loaded, so a half-written pair of
+    pickles is not picked up.
+    """
+
+    def __init__(self, service: CategorizationService, poll_interval: float = None,
+                 warmup_descriptions: List[str] = None):
+        if poll_interval is None:
+            poll_interval = float(os.getenv("MODEL_WATCH_INTERVAL", 0))
+
+        self.service = service
+        self.poll_interval = max(0.0, poll_interval)
+        self.warmup_descriptions = warmup_descriptions or WARMUP_DESCRIPTIONS
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload_seconds = 0.0
+        self.total_reload_seconds = 0.0
+        self.last_reload_at = None
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[LoadedModel], None]] = []
+        self._watch_task = None
+        self._fingerprint = self._current_fingerprint()
+        self._pending_fingerprint = None
+
+    def add_listener(self, callback: Callable[[LoadedModel], None]):
+        """Call ``callback(loaded)`` after each successful swap"""
+        self._listeners.append(callback)
+
+    def _watched_paths(self) -> List[Path]:
+        if self.service.artifact_dir is not None:
+            root = Path(self.service.artifact_dir)
+            latest = root / LATEST_FILE
+            return [latest if latest.exists() else root / MANIFEST_FILE]
+        return [Path(self.service.model_path), Path(self.service.vectorizer_path)]
+
+    def _current_fingerprint(self) -> Optional[tuple]:
+        fingerprint = []
+        for path in self._watched_paths():
+            try:
+                stat = path.stat()
+            except OSError:
+                return None
+            fingerprint.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+    def _load(self) -> LoadedModel:
+        if self.service.artifact_dir is not None:
+            return LoadedModel.from_artifact(self.service.artifact_dir)
+        return LoadedModel.from_pickles(
+            self.service.model_path,
+            self.service.vectorizer_path,
+            compile=self.service.inference_mode == "compiled",
+        )
+
+    def reload(self) -> LoadedModel:
+        """
+        Load, warm up and activate the model currently on disk
+
+        Blocks until the new version is active. Concurrent calls are
+        serialized.
+
+        Returns:
+            The newly active LoadedModel
+
+        Raises:
+            Exception: Whatever loading or warm-up raised; the previous
+                model stays active
+        """
+        with self._lock:
+            started = time.perf_counter()
+            fingerprint = self._current_fingerprint()
+            try:
+                loaded = self._load()
+                # Run one batch through the new version before it takes traffic
+                loaded.predict_proba(self.warmup_descriptions)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                MODEL_RELOADS.inc(outcome="failure")
+                raise
+
+            self.service.activate(loaded)
+            self._fingerprint = fingerprint
+            self._pending_fingerprint = None
+
+            elapsed = time.perf_counter() - started
+            self.reloads += 1
+            self.last_reload_seconds = elapsed
+            self.total_reload_seconds += elapsed
+            self.last_reload_at = datetime.utcnow().isoformat() + "Z"
+            self.last_error = None
+            MODEL_RELOADS.inc(outcome="success")
+
+        for callback in self._listeners:
+            callback(loaded)
+        return loaded
+
+    def reload_if_changed(self) -> Optional[LoadedModel]:
+        """Reload if the model files changed since the last load; for callers without a watcher"""
+        fingerprint = self._current_fingerprint()
+        if fingerprint is None or fingerprint == self._fingerprint:
+            return None
+        return self.reload()
+
+    async def reload_async(self) -> LoadedModel:
+        """Run ``reload`` in a background thread without blocking the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.reload)
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            fingerprint = self._current_fingerprint()
+            if fingerprint is None or fingerprint == self._fingerprint:
+                self._pending_fingerprint = None
+                continue
+            if fingerprint != self._pending_fingerprint:
+                # Wait one more poll for the files to settle
+                self._pending_fingerprint = fingerprint
+                continue
+            try:
+                await self.reload_async()
+            except Exception:
+                logger.exception("Model reload failed")
+                # Do not retry the same broken files on every poll
+                self._fingerprint = fingerprint
+
+    def start(self):
+        """Start watching the model files, if a poll interval is configured"""
+        if self.poll_interval > 0 and self._watch_task is None:
+            self._watch_task = asyncio.ensure_future(self._watch())
+
+    def stop(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    def stats(self) -> Dict:
+        return {
+            "active_version": self.service.model_version,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_reload_seconds": round(self.last_reload_seconds, 4),
+            "total_reload_seconds": round(self.total_reload_seconds, 4),
+            "last_reload_at": self.last_reload_at,
+            "last_error": self.last_error,
+            "watching": self._watch_task is not None,
+        }
@@ -0,0 +1,5 @@
+"""
+Benchmarks for categorization, training, loading and the HTTP API
+
+Run from the backend directory: ``python -m benchmarks --rows 10000``
+"""
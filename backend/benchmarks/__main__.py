@@ -0,0 +1,138 @@
+"""
+Run the benchmark suite and write the results as JSON
+
+    python -m benchmarks --rows 100000 --output results/baseline.json
+
+Compare two runs with ``python -m benchmarks.compare old.json new.json``.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "scripts"))
+
+from benchmarks.columnar import bench_columnar
+from benchmarks.load import load_app, load_test
+from benchmarks.metrics_overhead import bench_metrics_overhead
+from benchmarks.micro import (
+    bench_batch_dedup,
+    bench_batch_predict,
+    bench_loading,
+    bench_merchant_index,
+    bench_predict,
+    bench_training,
+)
+from benchmarks.preprocessing import bench_preprocessing
+from benchmarks.synthetic import generate_transactions, write_dataset
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(rows: int, seed: int, sample_rows: int, requests: int, concurrency: int,
+        skip_load: bool = False, dataset_path: str = None) -> dict:
+    from app.services.categorization import CategorizationService
+    from app.services.preprocessing import preprocess_many
+    from train_model import build_classifier, build_vectorizer, save_model
+
+    if dataset_path:
+        write_dataset(dataset_path, rows, seed)
+        print(f"Wrote {rows} synthetic rows to {dataset_path}")
+
+    raw_descriptions, categories = map(list, zip(*generate_transactions(rows, seed)))
+    # Train on normalized text, as train_model.py does; the service normalizes at serving time
+    descriptions = preprocess_many(raw_descriptions)
+    # Held-out descriptions from a different seed, so predictions are not cache hits on training rows
+    sample = [description for description, _ in generate_transactions(sample_rows, seed + 1)]
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "rows": rows,
+            "seed": seed,
+            "sample_rows": sample_rows,
+        }
+    }
+
+    print("Timing description normalization...")
+    results["preprocessing"] = bench_preprocessing(max(rows, 100_000), seed)
+
+    print("Timing metrics instrumentation...")
+    results["metrics_overhead"] = bench_metrics_overhead()
+
+    print("Timing the merchant index...")
+    results["merchant_index"] = bench_merchant_index(list(zip(raw_descriptions, categories)), sample)
+
+    print(f"Training on {rows} rows...")
+    results["training"] = bench_training(descriptions, categories)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vectorizer = build_vectorizer("tfidf")
+        model = build_classifier("tfidf").fit(vectorizer.fit_transform(descriptions), categories)
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_model(model, vectorizer, tmp)
+        model_path = os.path.join(tmp, "classifier.pkl")
+        vectorizer_path = os.path.join(tmp, "tfidf_vectorizer.pkl")
+
+        print("Timing model loading...")
+        results["loading"] = bench_loading(model_path, vectorizer_path, os.path.join(tmp, "artifacts"))
+
+        for mode in ("sklearn", "compiled"):
+            print(f"Timing predict and batch_predict ({mode})...")
+            service = CategorizationService(model_path, vectorizer_path, inference_mode=mode)
+            results[f"predict_{mode}"] = bench_predict(service, sample[:1000])
+            results[f"batch_predict_{mode}"] = bench_batch_predict(service, sample)
+            results[f"batch_dedup_{mode}"] = bench_batch_dedup(service, sample)
+
+        print("Timing bulk categorization through CSV+JSON and Parquet/Arrow...")
+        results["columnar"] = bench_columnar(CategorizationService(model_path, vectorizer_path), sample)
+
+        if not skip_load:
+            print(f"Load testing the API with {requests} requests at concurrency {concurrency}...")
+            app = load_app(model_path, vectorizer_path)
+            results["api"] = load_test(app, sample, requests=requests, concurrency=concurrency)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark categorization, training, loading and the API")
+    parser.add_argument("--rows", type=int, default=10_000, help="Synthetic training rows")
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed")
+    parser.add_argument("--sample-rows", type=int, default=5000, help="Held-out rows used for inference")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint in the load test")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients in the load test")
+    parser.add_argument("--skip-load", action="store_true", help="Skip the API load test")
+    parser.add_argument("--dataset", type=str, default=None, help="Also write the synthetic rows to this CSV")
+    parser.add_argument("--output", type=str, default="benchmark-results.json", help="Results JSON path")
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+    results = run(args.rows, args.seed, args.sample_rows, args.requests, args.concurrency,
+                  args.skip_load, args.dataset)
+    results["meta"]["total_seconds"] = time.perf_counter() - started
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
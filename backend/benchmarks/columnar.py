@@ -0,0 +1,98 @@
+"""
+Bulk categorization throughput: Parquet/Arrow batches vs CSV and JSON
+
+The CSV+JSON path is what a bulk run looks like through
+``/api/batch-categorize``: read a CSV, build a JSON request body, parse
+it, score, serialize the JSON response and write the results back as CSV.
+The columnar path is ``categorize_file`` from Parquet to Parquet and
+from Arrow IPC to Arrow IPC.
+"""
+import csv
+import json
+import os
+import tempfile
+from typing import Dict, List
+
+from app.services.categorization import CategorizationService
+from benchmarks.micro import time_calls
+
+
+def csv_json_roundtrip(service: CategorizationService, input_path: str, output_path: str,
+                       batch_rows: int = 1000) -> int:
+    """Categorize a CSV through JSON request and response bodies, as the batch endpoint does"""
+    rows = 0
+    with open(input_path, newline="", encoding="utf-8") as source, \
+            open(output_path, "w", newline="", encoding="utf-8") as sink:
+        reader = csv.DictReader(source)
+        writer = csv.writer(sink)
+        writer.writerow(reader.fieldnames + ["predicted_category", "confidence", "model_version"])
+
+        batch = []
+        for row in reader:
+            batch.append(row)
+            if len(batch) >= batch_rows:
+                rows += _score_json_batch(service, batch, writer)
+                batch = []
+        if batch:
+            rows += _score_json_batch(service, batch, writer)
+    return rows
+
+
+def _score_json_batch(service: CategorizationService, batch: List[Dict], writer) -> int:
+    request = json.loads(json.dumps({"descriptions": [row["description"] for row in batch]}))
+    predictions = service.batch_predict(request["descriptions"])
+    response = json.loads(json.dumps({
+        "results": [
+            {"category": category, "confidence": round(confidence, 4)} for category, confidence in predictions
+        ],
+        "model_version": service.model_version,
+    }))
+    for row, result in zip(batch, response["results"]):
+        writer.writerow(list(row.values()) + [result["category"], result["confidence"], response["model_version"]])
+    return len(batch)
+
+
+def bench_columnar(service: CategorizationService, descriptions: List[str], repeats: int = 3) -> Dict:
+    """Rows per second of the CSV+JSON path and the Parquet and Arrow bulk paths, cache cold"""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        return {"skipped": "pyarrow is not installed"}
+    from app.services.columnar import categorize_file
+
+    amounts = [round((i % 9973) * 0.37, 2) for i in range(len(descriptions))]
+    table = pa.table({"description": descriptions, "amount": amounts})
+    results = {"rows": len(descriptions)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "input.csv")
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["description", "amount"])
+            writer.writerows(zip(descriptions, amounts))
+        pa.parquet.write_table(table, os.path.join(tmp, "input.parquet"))
+        with pa.ipc.new_file(os.path.join(tmp, "input.arrow"), table.schema) as writer:
+            writer.write_table(table, max_chunksize=65536)
+
+        def run_csv():
+            service.cache.clear()
+            csv_json_roundtrip(service, csv_path, os.path.join(tmp, "output.csv"))
+
+        def run_columnar(fmt):
+            def run():
+                service.cache.clear()
+                categorize_file(service, os.path.join(tmp, f"input.{fmt}"), os.path.join(tmp, f"output.{fmt}"))
+            return run
+
+        for name, fn in (("csv_json", run_csv), ("parquet", run_columnar("parquet")),
+                         ("arrow", run_columnar("arrow"))):
+            timing = time_calls(fn, repeats)
+            timing["rows_per_second"] = len(descriptions) / timing["median_s"]
+            results[name] = timing
+
+    for fmt in ("parquet", "arrow"):
+        results[f"{fmt}_speedup"] = round(results[fmt]["rows_per_second"] / results["csv_json"]["rows_per_second"], 2)
+    return results
+
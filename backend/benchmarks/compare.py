@@ -0,0 +1,67 @@
+"""
+Diff two benchmark result files
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+"""
+import argparse
+import json
+from typing import Dict
+
+# Metrics where a larger value is better; everything else timed is "lower is better"
+HIGHER_IS_BETTER = ("rows_per_second", "requests_per_second")
+TRACKED = ("median_s", "p95_s", "p50_ms", "p95_ms", "p99_ms") + HIGHER_IS_BETTER
+
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """Map dotted paths to the tracked numeric metrics of a results tree"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            if key != "meta":
+                flat.update(flatten(value, path + "."))
+        elif key in TRACKED and isinstance(value, (int, float)):
+            flat[path] = float(value)
+    return flat
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float = 0.1) -> list:
+    """
+    Relative change of every metric present in both runs
+
+    Returns:
+        (path, baseline, candidate, change, regressed) tuples, where change
+        is positive when the candidate is better
+    """
+    old, new = flatten(baseline), flatten(candidate)
+    rows = []
+    for path in sorted(old.keys() & new.keys()):
+        if old[path] == 0:
+            continue
+        change = (new[path] - old[path]) / old[path]
+        if not path.endswith(HIGHER_IS_BETTER):
+            change = -change
+        rows.append((path, old[path], new[path], change, change < -threshold))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", type=str, help="Baseline results JSON")
+    parser.add_argument("candidate", type=str, help="Candidate results JSON")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as a regression")
+
+    args = parser.parse_args()
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows = compare(baseline, candidate, args.threshold)
+    print(f"{'metric':<55}{'baseline':>14}{'candidate':>14}{'change':>9}")
+    for path, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{path:<55}{old:>14.6g}{new:>14.6g}{change:>+9.1%}{flag}")
+    regressions = sum(1 for row in rows if row[4])
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+    raise SystemExit(1 if regressions else 0)
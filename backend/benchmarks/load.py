@@ -0,0 +1,94 @@
+"""
+In-process load test of the categorization endpoints over ASGI
+"""
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List
+
+
+def load_app(model_path: str, vectorizer_path: str):
+    """
+    Import the FastAPI app configured to serve the given model
+
+    Must run before ``main`` is imported anywhere else, since the app reads
+    its configuration at import time. The database is an in-memory SQLite
+    one, as the categorization endpoints never touch it.
+    """
+    os.environ["MODEL_PATH"] = str(model_path)
+    os.environ["VECTORIZER_PATH"] = str(vectorizer_path)
+    os.environ["MODEL_ARTIFACT_DIR"] = ""
+    os.environ["MODEL_WATCH_INTERVAL"] = "0"
+    os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+
+    import main
+    return main.app
+
+
+def _summarize(latencies: List[float], elapsed: float, statuses: Dict[int, int], rows: int) -> Dict:
+    latencies.sort()
+
+    def percentile(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+
+    return {
+        "requests": len(latencies),
+        "rows": rows,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "rows_per_second": rows / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+async def _run(app, path: str, payloads: List[Dict], concurrency: int, rows_per_request: int) -> Dict:
+    import httpx
+
+    latencies, statuses = [], {}
+    queue = iter(payloads)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            for payload in queue:
+                started = time.perf_counter()
+                response = await client.post(path, json=payload)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return _summarize(latencies, elapsed, statuses, len(latencies) * rows_per_request)
+
+
+def load_test(app, descriptions: List[str], requests: int = 2000, concurrency: int = 32,
+              batch_size: int = 100) -> Dict:
+    """
+    Drive /api/categorize and /api/batch-categorize with concurrent clients
+
+    Requests go through the full ASGI stack (routing, validation, the
+    micro-batcher and executor) without a network socket, so results
+    reflect the application rather than the HTTP server.
+    """
+    single = [{"description": descriptions[i % len(descriptions)]} for i in range(requests)]
+    batch_requests = max(1, requests // 10)
+    batches = [
+        {"descriptions": [descriptions[(i * batch_size + j) % len(descriptions)] for j in range(batch_size)]}
+        for i in range(batch_requests)
+    ]
+
+    async def run_all():
+        # One event loop for both phases: the micro-batcher binds to it
+        return {
+            "concurrency": concurrency,
+            "categorize": await _run(app, "/api/categorize", single, concurrency, 1),
+            "batch_categorize": await _run(app, "/api/batch-categorize", batches, concurrency, batch_size),
+        }
+
+    return asyncio.run(run_all())
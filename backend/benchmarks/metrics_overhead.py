@@ -0,0 +1,84 @@
+"""
+Cost of the metrics instrumentation per observation and per request
+
+    python -m benchmarks.metrics_overhead
+"""
+import asyncio
+import json
+import time
+from typing import Dict
+
+from app.services.metrics import MetricsMiddleware, MetricsRegistry
+
+# Observations recorded while serving one /api/categorize request: request
+# counter and latency, parse, serialize, micro-batch size and queue delay,
+# chunk size, vectorize and predict_proba
+OBSERVATIONS_PER_REQUEST = 9
+
+
+def _per_call_ns(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def bench_primitives(calls: int = 200_000) -> Dict:
+    """Nanoseconds per counter increment and histogram observation, enabled and disabled"""
+    results = {}
+    for enabled in (True, False):
+        registry = MetricsRegistry(enabled=enabled)
+        counter = registry.counter("bench_total", "bench", ("label",)).labels(label="x")
+        histogram = registry.histogram("bench_seconds", "bench", ("label",))
+        child = histogram.labels(label="x")
+        key = "enabled" if enabled else "disabled"
+        results[key] = {
+            "counter_inc_ns": _per_call_ns(counter.inc, calls),
+            "histogram_observe_ns": _per_call_ns(lambda: child.observe(0.0042), calls),
+            "histogram_observe_with_labels_ns": _per_call_ns(lambda: histogram.observe(0.0042, label="x"), calls),
+        }
+    return results
+
+
+async def _empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _drive(app, requests: int) -> float:
+    scope = {"type": "http", "method": "POST", "path": "/api/categorize", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def bench_middleware(requests: int = 50_000) -> Dict:
+    """Microseconds per request through an empty ASGI app with and without the middleware"""
+    bare = asyncio.run(_drive(_empty_app, requests))
+    instrumented = asyncio.run(_drive(MetricsMiddleware(_empty_app), requests))
+    return {"bare_us": bare, "instrumented_us": instrumented, "overhead_us": instrumented - bare}
+
+
+def bench_metrics_overhead() -> Dict:
+    primitives = bench_primitives()
+    middleware = bench_middleware()
+    per_observation_ns = primitives["enabled"]["histogram_observe_ns"]
+    return {
+        "primitives": primitives,
+        "middleware": middleware,
+        "observations_per_request": OBSERVATIONS_PER_REQUEST,
+        "estimated_request_overhead_us": middleware["overhead_us"]
+        + per_observation_ns * (OBSERVATIONS_PER_REQUEST - 2) / 1000,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(bench_metrics_overhead(), indent=2))
@@ -0,0 +1,117 @@
+"""
+Microbenchmarks for CategorizationService and model training
+"""
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from app.services.categorization import CategorizationService
+from app.services.merchants import MerchantIndex
+from app.services.preprocessing import preprocess_many
+
+
+def time_calls(fn: Callable, repeats: int) -> Dict:
+    """Call ``fn`` ``repeats`` times and summarize wall-clock seconds"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "repeats": repeats,
+        "min_s": timings[0],
+        "median_s": statistics.median(timings),
+        "p95_s": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max_s": timings[-1],
+    }
+
+
+def bench_predict(service: CategorizationService, descriptions: List[str]) -> Dict:
+    """Single-description latency, with the prediction cache cold and warm"""
+    service.cache.clear()
+    rows = iter(descriptions)
+    cold = time_calls(lambda: service.predict(next(rows)), len(descriptions))
+    warm = time_calls(lambda: service.predict(descriptions[0]), len(descriptions))
+    return {"cold": cold, "warm": warm}
+
+
+def bench_batch_predict(service: CategorizationService, descriptions: List[str],
+                        batch_sizes=(1, 64, 1024), repeats: int = 5) -> Dict:
+    """Per-row throughput of batch_predict at several batch sizes, cache cold"""
+    results = {}
+    for batch_size in batch_sizes:
+        batch = descriptions[:batch_size]
+
+        def run():
+            service.cache.clear()
+            service.batch_predict(batch)
+
+        timing = time_calls(run, repeats)
+        timing["rows"] = len(batch)
+        timing["rows_per_second"] = len(batch) / timing["median_s"]
+        results[str(batch_size)] = timing
+    return results
+
+
+def bench_batch_dedup(service: CategorizationService, descriptions: List[str], repeats: int = 5) -> Dict:
+    """How far grouping identical model inputs cuts batch model work, cache cold"""
+    reports = []
+
+    def run():
+        service.cache.clear()
+        reports.append(service.batch_predict_report(descriptions)[1])
+
+    timing = time_calls(run, repeats)
+    timing["rows"] = len(descriptions)
+    timing["rows_per_second"] = len(descriptions) / timing["median_s"]
+    timing["report"] = reports[-1]
+    return timing
+
+
+def bench_training(descriptions: List[str], categories: List[str], repeats: int = 1) -> Dict:
+    """Time vectorizer and classifier fitting with the production defaults"""
+    from train_model import build_classifier, build_vectorizer
+
+    fitted = {}
+
+    def fit_vectorizer():
+        fitted["vectorizer"] = build_vectorizer("tfidf")
+        fitted["X"] = fitted["vectorizer"].fit_transform(descriptions)
+
+    vectorizer_timing = time_calls(fit_vectorizer, repeats)
+    classifier_timing = time_calls(
+        lambda: build_classifier("tfidf").fit(fitted["X"], categories), repeats
+    )
+    return {"rows": len(descriptions), "vectorizer": vectorizer_timing, "classifier": classifier_timing}
+
+
+def bench_merchant_index(pairs: List, descriptions: List[str], repeats: int = 5) -> Dict:
+    """Build time, per-lookup cost and fast-path hit ratio of the merchant index"""
+    index = MerchantIndex()
+    build = time_calls(lambda: index.add_many(pairs), 1)
+    normalized = preprocess_many(descriptions)
+
+    def lookup_all():
+        for description in normalized:
+            index.lookup(description)
+
+    index.lookups = index.exact_hits = index.alias_hits = 0
+    timing = time_calls(lookup_all, repeats)
+    timing["lookups_per_second"] = len(normalized) / timing["median_s"]
+    return {"build": build, "lookup": timing, "stats": index.stats()}
+
+
+def bench_loading(model_path: str, vectorizer_path: str, artifact_dir: str = None, repeats: int = 5) -> Dict:
+    """Time constructing a service from pickles and, if given, from the mmap artifact"""
+    results = {
+        "pickle": time_calls(lambda: CategorizationService(model_path, vectorizer_path), repeats),
+        "pickle_compiled": time_calls(
+            lambda: CategorizationService(model_path, vectorizer_path, inference_mode="compiled"), repeats
+        ),
+    }
+    if artifact_dir is not None:
+        results["artifact"] = time_calls(
+            lambda: CategorizationService(artifact_dir=artifact_dir, inference_mode="compiled"), repeats
+        )
+    return results
@@ -0,0 +1,67 @@
+"""
+Seeded generator of realistic bank transaction descriptions
+"""
+import csv
+import random
+from typing import Iterator, Tuple
+
+
+MERCHANTS = {
+    "Food": ["STARBUCKS", "WHOLE FOODS MKT", "TRADER JOE'S", "CHIPOTLE", "MCDONALD'S",
+             "SAFEWAY", "DOORDASH", "BLUE BOTTLE COFFEE", "KROGER", "SUBWAY"],
+    "Transport": ["UBER *TRIP", "LYFT *RIDE", "SHELL OIL", "CHEVRON", "EXXONMOBIL",
+                  "BART CLIPPER", "AMTRAK", "PARKWHIZ", "YELLOW CAB"],
+    "Bills": ["PG&E ELECTRIC", "COMCAST CABLE", "VERIZON WIRELESS", "AT&T BILL PAYMENT",
+              "CITY WATER UTIL", "STATE FARM INS", "SPECTRUM INTERNET"],
+    "Entertainment": ["NETFLIX.COM", "SPOTIFY USA", "AMC THEATRES", "STEAMGAMES.COM",
+                      "HULU", "TICKETMASTER", "DISNEY PLUS"],
+    "Shopping": ["AMAZON MKTPLACE", "AMZN MKTP US", "TARGET", "WALMART", "BEST BUY",
+                 "IKEA", "MACY'S", "ETSY"],
+    "Health": ["CVS/PHARMACY", "WALGREENS", "PLANET FITNESS", "KAISER PERMANENTE",
+               "LABCORP", "QUEST DIAGNOSTICS"],
+    "Work Supplies": ["STAPLES", "OFFICE DEPOT", "ZOOM.US", "DROPBOX", "ADOBE SYSTEMS",
+                      "GITHUB", "FEDEX OFFICE"],
+}
+
+CATEGORIES = tuple(MERCHANTS)
+
+PREFIXES = ["", "", "", "POS PURCHASE ", "DEBIT CARD PURCHASE ", "CHECKCARD ", "SQ *", "TST* ", "PAYPAL *"]
+CITIES = ["SAN FRANCISCO CA", "NEW YORK NY", "AUSTIN TX", "SEATTLE WA", "CHICAGO IL", "DENVER CO", ""]
+
+
+def _description(rng: random.Random, merchant: str) -> str:
+    parts = [rng.choice(PREFIXES) + merchant]
+    if rng.random() < 0.6:
+        parts.append(f"#{rng.randint(1, 99999):05d}")
+    city = rng.choice(CITIES)
+    if city:
+        parts.append(city)
+    if rng.random() < 0.7:
+        parts.append(f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}")
+    if rng.random() < 0.5:
+        parts.append(f"CARD {rng.randint(0, 9999):04d}")
+    return " ".join(parts)
+
+
+def generate_transactions(n: int, seed: int = 42) -> Iterator[Tuple[str, str]]:
+    """
+    Yield ``n`` (description, category) pairs
+
+    Descriptions look like bank statement lines: a merchant name with an
+    optional processor prefix, store number, city, date and card suffix.
+    The same seed always yields the same rows, and rows are generated
+    lazily so millions can be streamed to disk.
+    """
+    rng = random.Random(seed)
+    for _ in range(n):
+        category = rng.choice(CATEGORIES)
+        yield _description(rng, rng.choice(MERCHANTS[category])), category
+
+
+def write_dataset(path: str, n: int, seed: int = 42) -> str:
+    """Write a ``description,category`` CSV of ``n`` synthetic rows"""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["description", "category"])
+        writer.writerows(generate_transactions(n, seed))
+    return path
@@ -1,14 +1,39 @@
 """
 Main FastAPI application
 """
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import Depends, FastAPI, File, Header, Query, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import json
 import os
+import shutil
+import tempfile
+import time
 from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.session import Database
+from app.services.batcher import MicroBatcher
 from app.services.categorization import CategorizationService
+from app.services.columnar import MEDIA_TYPES, ColumnarUnavailable, categorize_file, detect_columnar_format
+from app.services.executor import ExecutorSaturated, InferenceExecutor
+from app.services.importer import ImportPipeline, detect_format
+from app.services.jobs import (
+    JobLimitExceeded, JobQueue, JobWorkerPool, job_status, spool_upload, write_batch_input
+)
+from app.services.merchants import MerchantIndex
+from app.services.metrics import CONTENT_TYPE, REGISTRY, SERIALIZE_SECONDS, MetricsMiddleware, observe_parse
+from app.services.ocr import OCREngineUnavailable, ReceiptPipeline
+from app.services.monitoring import ModelMonitor
+from app.services.online import OnlineLearner
+from app.services.overlays import UserOverlayStore
+from app.services.persistence import TransactionStore, UnknownUserError
+from app.services.registry import ModelRegistry
 
 # Load environment variables
 load_dotenv()
@@ -29,14 +54,182 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count and time every request by route for /metrics
+if REGISTRY.enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# Answer recurring merchants from an alias index before the model
+merchant_index = None
+if os.getenv("MERCHANT_INDEX_ENABLED", "true").lower() == "true":
+    merchant_index = MerchantIndex()
+    merchant_index.load_csv(os.getenv(
+        "MERCHANT_INDEX_DATASET",
+        str(Path(__file__).parent / "data" / "sample_transactions.csv")
+    ))
+
 # Initialize categorization service
-categorization_service = CategorizationService()
+categorization_service = CategorizationService(merchant_index=merchant_index)
+
+# Run inference in a worker pool so the event loop stays responsive
+inference_executor = InferenceExecutor(categorization_service)
+
+# Coalesce concurrent single-description requests into vectorized batches
+micro_batcher = MicroBatcher(inference_executor)
+
+# Hot-reload new model versions without restarting workers
+model_registry = ModelRegistry(categorization_service)
+model_registry.add_listener(lambda loaded: inference_executor.refresh())
+
+# Accuracy and confidence drift of the served model; a reloaded model starts a new reference
+model_monitor = None
+if os.getenv("MONITORING_ENABLED", "true").lower() == "true":
+    model_monitor = ModelMonitor()
+    model_monitor.reset(categorization_service.model_version)
+    model_registry.add_listener(lambda loaded: model_monitor.reset(loaded.version))
+
+# Apply corrections incrementally when the model supports partial_fit
+online_learner = OnlineLearner(categorization_service)
+
+# Decode and OCR receipts in their own bounded process pool
+receipt_pipeline = ReceiptPipeline(inference_executor)
+OCR_MAX_BATCH = int(os.getenv("OCR_MAX_BATCH", 20))
+OCR_MAX_IMAGE_BYTES = int(os.getenv("OCR_MAX_IMAGE_BYTES", 10 * 1024 * 1024))
+
+# Async pooled database for transactions and corrections
+database = Database()
+transaction_store = TransactionStore(database)
+
+# Per-user correction layers applied on top of the shared model, cached under a memory budget
+user_overlays = None
+if os.getenv("USER_OVERLAYS_ENABLED", "true").lower() == "true":
+    user_overlays = UserOverlayStore(transaction_store.user_corrections)
+
+import_pipeline = ImportPipeline(
+    categorization_service,
+    chunk_rows=int(os.getenv("IMPORT_CHUNK_ROWS", 1000)),
+    executor=inference_executor
+)
+
+# Large imports and batches run as background jobs in separate worker processes.
+# The queue creates its database and spool directory, so it is opened at startup, not on import.
+job_queue: Optional[JobQueue] = None
+job_workers: Optional[JobWorkerPool] = None
+
+# Gauges read from the components' own counters when /metrics is scraped
+_cache_gauge = REGISTRY.gauge("expenseflow_prediction_cache", "Prediction cache statistics", ("stat",))
+for _stat in ("size", "hits", "misses", "evictions", "hit_ratio"):
+    _cache_gauge.labels(stat=_stat).set_function(lambda stat=_stat: categorization_service.cache.stats()[stat])
+REGISTRY.gauge("expenseflow_executor_in_flight", "Inference calls running or queued").labels().set_function(
+    lambda: inference_executor.in_flight
+)
+REGISTRY.gauge("expenseflow_executor_rejected", "Inference calls rejected as saturated").labels().set_function(
+    lambda: inference_executor.rejected
+)
+REGISTRY.gauge(
+    "expenseflow_merchant_fast_path_hit_ratio", "Share of lookups answered by the merchant index"
+).labels().set_function(lambda: merchant_index.hit_ratio if merchant_index is not None else 0.0)
+REGISTRY.gauge("expenseflow_ocr_in_flight", "Receipts being decoded or OCRed, or queued").labels().set_function(
+    lambda: receipt_pipeline.in_flight
+)
+REGISTRY.gauge("expenseflow_user_overlay_bytes", "Approximate memory held by cached user overlays").labels().set_function(
+    lambda: user_overlays.bytes if user_overlays is not None else 0
+)
+if model_monitor is not None:
+    REGISTRY.gauge(
+        "expenseflow_monitor_window_accuracy", "Accuracy over the most recent corrections"
+    ).labels().set_function(lambda: model_monitor.accuracy.rate)
+    REGISTRY.gauge(
+        "expenseflow_monitor_confidence_psi", "PSI of recent prediction confidences against the reference"
+    ).labels().set_function(lambda: model_monitor.psi() or 0.0)
+    REGISTRY.gauge("expenseflow_monitor_drift", "1 while a drift alert is raised").labels().set_function(
+        lambda: float(model_monitor.drift_detected)
+    )
+REGISTRY.gauge("expenseflow_microbatch_pending", "Descriptions waiting for a micro-batch").labels().set_function(
+    lambda: micro_batcher.pending
+)
+
+
+@app.on_event("startup")
+async def startup():
+    """Create database tables, seed the merchant index, watch model files and start the job workers"""
+    global job_queue, job_workers
+    if os.getenv("DB_CREATE_TABLES", "true").lower() == "true":
+        await database.create_tables()
+    await transaction_store.backfill_monthly_totals()
+    if merchant_index is not None:
+        # Custom user categories stay in their users' overlays, not the shared index
+        history = [
+            (description, category) for description, category in await transaction_store.corrected_descriptions()
+            if user_overlays is None or categorization_service.knows_category(category)
+        ]
+        await asyncio.get_running_loop().run_in_executor(None, merchant_index.add_many, history)
+    model_registry.start()
+    job_queue = JobQueue()
+    job_workers = JobWorkerPool(job_queue, {
+        "model_path": categorization_service.model_path,
+        "vectorizer_path": categorization_service.vectorizer_path,
+        "artifact_dir": categorization_service.artifact_dir,
+    })
+    job_workers.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop the model watcher, the job workers, the inference and OCR worker pools and the database pool"""
+    model_registry.stop()
+    if job_workers is not None:
+        await asyncio.get_running_loop().run_in_executor(None, job_workers.shutdown)
+    inference_executor.shutdown()
+    receipt_pipeline.shutdown()
+    await database.dispose()
+
+
+async def get_session():
+    """Per-request database session, committed when the request succeeds"""
+    async with database.session() as session:
+        yield session
+
+
+@app.exception_handler(UnknownUserError)
+async def unknown_user_handler(request, exc: UnknownUserError):
+    """Reject writes for users that are not registered (see AUTO_CREATE_USERS)"""
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request, exc: ExecutorSaturated):
+    """Shed load with 429 when the inference queue is full"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+
+def json_response(model: BaseModel) -> Response:
+    """Serialize a response model once, recording the serialize stage"""
+    started = time.perf_counter()
+    body = model.model_dump_json()
+    SERIALIZE_SECONDS.observe(time.perf_counter() - started)
+    return Response(content=body, media_type="application/json")
+
+
+MAX_TOP_K = 10
 
 
 # Pydantic models for request/response
 class CategorizationRequest(BaseModel):
     """Request model for categorization"""
     description: str
+    user_id: Optional[int] = None
+    top_k: int = Field(1, ge=1, le=MAX_TOP_K)
+    review_threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+
+class CategoryScore(BaseModel):
+    """One candidate category with its probability"""
+    category: str
+    confidence: float
 
 
 class CategorizationResponse(BaseModel):
@@ -44,18 +237,60 @@ class CategorizationResponse(BaseModel):
     description: str
     category: str
     confidence: float
+    needs_review: bool = False
+    alternatives: Optional[List[CategoryScore]] = None
+    model_version: Optional[str] = None
+
+
+class CorrectionRequest(BaseModel):
+    """Request model for a user correction"""
+    transaction_id: Optional[int] = None
+    user_id: Optional[int] = None
+    description: Optional[str] = None
+    predicted_category: Optional[str] = None
+    correct_category: str
 
 
 class BatchCategorizeRequest(BaseModel):
     """Request model for batch categorization"""
     descriptions: List[str]
+    user_id: Optional[int] = None
+    top_k: int = Field(1, ge=1, le=MAX_TOP_K)
+    review_threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
 
 
 class BatchCategorizeResponse(BaseModel):
     """Response model for batch categorization"""
     processed: int
     categorized: int
+    needs_review: int = 0
     results: List[CategorizationResponse]
+    dedup: Optional[Dict] = None
+    model_version: Optional[str] = None
+
+
+def categorization_result(description: str, ranked: List, review_threshold: Optional[float],
+                          top_k: int, model_version: Optional[str] = None) -> CategorizationResponse:
+    """Response for one description from its ranked (category, probability) list"""
+    category, confidence = ranked[0]
+    return CategorizationResponse(
+        description=description,
+        category=category,
+        confidence=round(confidence, 4),
+        needs_review=categorization_service.needs_review(confidence, review_threshold),
+        alternatives=[
+            CategoryScore(category=label, confidence=round(probability, 4)) for label, probability in ranked[1:]
+        ] if top_k > 1 else None,
+        model_version=model_version
+    )
+
+
+async def user_overlay(user_id: Optional[int]):
+    """The user's overlay if overlays are enabled and the user has corrections, else None"""
+    if user_overlays is None or user_id is None:
+        return None
+    overlay = await user_overlays.get(user_id)
+    return overlay if overlay else None
 
 
 # Root endpoint
@@ -76,92 +311,515 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "ok",
-        "model_loaded": categorization_service.model_loaded
+        "model_loaded": categorization_service.model_loaded,
+        "model_version": categorization_service.model_version,
+        "registry": model_registry.stats(),
+        "online_learning": online_learner.stats(),
+        "cache": categorization_service.cache.stats(),
+        "executor": inference_executor.stats(),
+        "batcher": micro_batcher.stats(),
+        "ocr": receipt_pipeline.stats(),
+        "jobs": job_workers.stats() if job_workers is not None else None,
+        "merchant_index": merchant_index.stats() if merchant_index is not None else None,
+        "user_overlays": user_overlays.stats() if user_overlays is not None else None,
+        "monitoring": model_monitor.stats() if model_monitor is not None else None
     }
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """Request, stage, batch-size, error and model-load metrics in Prometheus text format"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 # Single categorization endpoint
 @app.post("/api/categorize", response_model=CategorizationResponse)
-async def categorize(request: CategorizationRequest):
-    """Categorize a single transaction description"""
+async def categorize(request: CategorizationRequest, http_request: Request):
+    """
+    Categorize a single transaction description
+
+    With ``top_k`` > 1 the runner-up categories are returned as
+    ``alternatives``, from the same model pass. ``needs_review`` is set
+    when the confidence is below ``review_threshold`` (default
+    REVIEW_CONFIDENCE_THRESHOLD). With ``user_id``, the user's own
+    corrections and custom categories are applied on top of the shared
+    model.
+    """
+    observe_parse(http_request.scope)
     if not categorization_service.model_loaded:
         raise HTTPException(
             status_code=503,
             detail="Model not loaded. Please train the model first."
         )
 
-    category, confidence = categorization_service.predict(request.description)
+    overlay = await user_overlay(request.user_id)
+    if overlay is not None:
+        ranked = (await inference_executor.batch_predict_overlay([request.description], overlay, request.top_k))[0]
+    elif request.top_k > 1:
+        ranked = await inference_executor.predict_top_k(request.description, request.top_k)
+    else:
+        ranked = [await micro_batcher.predict(request.description)]
+    if model_monitor is not None:
+        model_monitor.record_prediction(ranked[0][1])
 
-    return CategorizationResponse(
-        description=request.description,
-        category=category,
-        confidence=round(confidence, 4)
-    )
+    return json_response(categorization_result(
+        request.description, ranked, request.review_threshold, request.top_k,
+        model_version=categorization_service.model_version
+    ))
 
 
 # Batch categorization endpoint
 @app.post("/api/batch-categorize", response_model=BatchCategorizeResponse)
-async def batch_categorize(request: BatchCategorizeRequest):
-    """Categorize multiple transaction descriptions"""
+async def batch_categorize(request: BatchCategorizeRequest, http_request: Request):
+    """
+    Categorize multiple transaction descriptions, optionally with top-k alternatives and a user's overlay
+
+    Rows that normalize to the same model input are scored once; ``dedup``
+    reports how many rows needed the model, how many groups were scored
+    and the model time this saved.
+    """
+    observe_parse(http_request.scope)
     if not categorization_service.model_loaded:
         raise HTTPException(
             status_code=503,
             detail="Model not loaded. Please train the model first."
         )
 
-    results = []
-    for description in request.descriptions:
-        category, confidence = categorization_service.predict(description)
-        results.append(CategorizationResponse(
-            description=description,
-            category=category,
-            confidence=round(confidence, 4)
-        ))
-
-    return BatchCategorizeResponse(
+    overlay = await user_overlay(request.user_id)
+    dedup = None
+    if overlay is not None:
+        ranked = await inference_executor.batch_predict_overlay(request.descriptions, overlay, request.top_k)
+    else:
+        ranked, dedup = await inference_executor.batch_predict_report(request.descriptions, request.top_k)
+    if model_monitor is not None:
+        model_monitor.record_predictions([candidates[0][1] for candidates in ranked])
+    results = [
+        categorization_result(description, candidates, request.review_threshold, request.top_k)
+        for description, candidates in zip(request.descriptions, ranked)
+    ]
+
+    return json_response(BatchCategorizeResponse(
         processed=len(request.descriptions),
         categorized=len([r for r in results if r.confidence > 0.5]),
-        results=results
-    )
+        needs_review=len([r for r in results if r.needs_review]),
+        results=results,
+        dedup=dedup,
+        model_version=categorization_service.model_version
+    ))
 
 
-# CSV import endpoint (placeholder)
-@app.post("/api/import")
-async def import_csv(file: UploadFile = File(...)):
-    """Import and categorize transactions from CSV"""
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="File must be CSV format")
+def transaction_view(transaction) -> Dict:
+    """Public fields of a stored transaction for the listing endpoint"""
+    confidence = transaction.predicted_confidence
+    return {
+        "id": transaction.id,
+        "user_id": transaction.user_id,
+        "description": transaction.description,
+        "amount": transaction.amount,
+        "predicted_category": transaction.predicted_category,
+        "predicted_confidence": confidence,
+        "actual_category": transaction.actual_category,
+        "category": transaction.actual_category or transaction.predicted_category,
+        "is_corrected": bool(transaction.is_corrected),
+        "needs_review": not transaction.is_corrected and (
+            confidence is None or categorization_service.needs_review(confidence)
+        ),
+        "created_at": transaction.created_at.isoformat() if transaction.created_at else None,
+    }
+
 
-    # TODO: Implement CSV parsing and batch categorization
+# Transaction listing endpoint
+@app.get("/api/transactions")
+async def list_transactions(user_id: Optional[int] = None, start: Optional[datetime] = None,
+                            end: Optional[datetime] = None, category: Optional[str] = None,
+                            needs_review: Optional[bool] = None, limit: int = Query(50, ge=1, le=500),
+                            cursor: Optional[str] = None):
+    """
+    One page of a user's transactions, newest first
+
+    Filter by transaction date (``start`` inclusive, ``end`` exclusive),
+    which is the statement date or else the import time, by category and
+    by ``needs_review``. Pass the returned ``next_cursor`` to get the next
+    page; it is null on the last page.
+    """
+    try:
+        transactions, next_cursor = await transaction_store.list_transactions(
+            user_id, start, end, category, needs_review, categorization_service.review_threshold, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
-        "processed": 0,
-        "categorized": 0,
-        "uncategorized": 0
+        "transactions": [transaction_view(transaction) for transaction in transactions],
+        "next_cursor": next_cursor,
     }
 
 
-# OCR endpoint (placeholder)
+# Monthly spending endpoint
+@app.get("/api/spending/monthly")
+async def monthly_spending(user_id: Optional[int] = None,
+                           start_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+                           end_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$")):
+    """Per-month spending totals with a per-category breakdown, read from the materialized totals"""
+    totals = await transaction_store.monthly_totals(user_id, start_month, end_month)
+    months = {}
+    for total in totals:
+        month = months.setdefault(total["month"], {
+            "month": total["month"], "total_amount": 0.0, "transaction_count": 0, "categories": []
+        })
+        month["total_amount"] = round(month["total_amount"] + total["total_amount"], 2)
+        month["transaction_count"] += total["transaction_count"]
+        month["categories"].append({
+            "category": total["category"],
+            "total_amount": total["total_amount"],
+            "transaction_count": total["transaction_count"],
+        })
+    return {"user_id": user_id, "months": list(months.values())}
+
+
+# CSV/OFX import endpoint
+@app.post("/api/import")
+async def import_csv(file: UploadFile = File(...), stream: bool = False,
+                     user_id: Optional[int] = None, persist: bool = True):
+    """
+    Import and categorize transactions from a CSV or OFX statement
+
+    The upload is parsed and categorized in bounded chunks, and each chunk
+    is bulk inserted into the database unless ``persist=false``. With
+    ``stream=true`` the per-row results are streamed back as NDJSON,
+    followed by a summary line.
+    """
+    fmt = detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="File must be CSV or OFX format")
+
+    sink = None
+    if persist:
+        await transaction_store.check_user(user_id)
+
+        async def sink(chunk):
+            await transaction_store.insert_transactions(chunk, user_id)
+
+    if stream:
+        return StreamingResponse(
+            import_pipeline.stream_ndjson(file, fmt, sink),
+            media_type="application/x-ndjson"
+        )
+
+    try:
+        return await import_pipeline.run(file, fmt, sink)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _stream_file(path: str, cleanup_dir: str, block_size: int = 1024 * 1024):
+    try:
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                yield block
+    finally:
+        shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+
+# Columnar bulk categorization endpoint
+@app.post("/api/bulk/categorize")
+async def bulk_categorize(file: UploadFile = File(...), column: Optional[str] = None,
+                          output_format: Optional[str] = None):
+    """
+    Categorize a Parquet or Arrow IPC file and return it with prediction columns appended
+
+    The upload is spooled to disk (Parquet needs random access) and scored
+    record batch by record batch; the response is the input with
+    ``predicted_category``, ``confidence`` and ``model_version`` columns,
+    in the input format unless ``output_format`` is given. Row count,
+    throughput and model version are returned in ``X-Bulk-*`` headers.
+    """
+    if not categorization_service.model_loaded:
+        raise HTTPException(status_code=503, detail="Model not loaded. Please train the model first.")
+    input_format = detect_columnar_format(file.filename)
+    if input_format is None:
+        raise HTTPException(status_code=400, detail="File must be Parquet or Arrow IPC format")
+    output_format = output_format or input_format
+    if output_format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"output_format must be one of {sorted(MEDIA_TYPES)}")
+
+    workdir = tempfile.mkdtemp(prefix="bulk-")
+    input_path = os.path.join(workdir, f"input.{input_format}")
+    output_path = os.path.join(workdir, f"output.{output_format}")
+    try:
+        await spool_upload(file, input_path)
+        stats = await asyncio.get_running_loop().run_in_executor(None, lambda: categorize_file(
+            categorization_service, input_path, output_path, input_format, output_format, column
+        ))
+    except ValueError as e:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    except ColumnarUnavailable as e:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise HTTPException(status_code=503, detail=str(e))
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    os.remove(input_path)
+
+    return StreamingResponse(
+        _stream_file(output_path, workdir),
+        media_type=MEDIA_TYPES[output_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="categorized.{output_format}"',
+            "X-Bulk-Rows": str(stats["rows"]),
+            "X-Bulk-Rows-Per-Second": str(stats["rows_per_second"]),
+            "X-Bulk-Model-Version": stats["model_version"] or "",
+        }
+    )
+
+
+async def _submit_job(paths: Dict, kind: str, fmt: str, user_id: Optional[int], persist: bool) -> JSONResponse:
+    loop = asyncio.get_running_loop()
+    try:
+        job = await loop.run_in_executor(None, lambda: job_queue.submit(
+            paths["id"], kind, fmt, paths["input_path"], paths["result_path"], user_id, persist
+        ))
+    except JobLimitExceeded as e:
+        os.remove(paths["input_path"])
+        raise HTTPException(status_code=429, detail=str(e))
+    return JSONResponse(status_code=202, content={
+        **job_status(job),
+        "status_url": f"/api/jobs/{job['id']}",
+        "result_url": f"/api/jobs/{job['id']}/result",
+    })
+
+
+async def _get_job(job_id: str) -> Dict:
+    job = await asyncio.get_running_loop().run_in_executor(None, job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+# Background import job
+@app.post("/api/jobs/import", status_code=202)
+async def submit_import_job(file: UploadFile = File(...), user_id: Optional[int] = None, persist: bool = True):
+    """
+    Accept a CSV or OFX statement for background categorization
+
+    The upload is spooled to disk and queued; poll the returned status URL
+    and fetch the per-row results from the result URL when it succeeds.
+    """
+    fmt = detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="File must be CSV or OFX format")
+
+    if persist:
+        await transaction_store.check_user(user_id)
+    paths = job_queue.new_job_paths(fmt)
+    await spool_upload(file, paths["input_path"])
+    return await _submit_job(paths, "import", fmt, user_id, persist)
+
+
+# Background batch categorization job
+@app.post("/api/jobs/batch-categorize", status_code=202)
+async def submit_batch_job(request: BatchCategorizeRequest, user_id: Optional[int] = None):
+    """
+    Queue a batch of descriptions for background categorization
+
+    The owner is ``user_id`` from the query string or the request body;
+    the per-user job limits apply to it.
+    """
+    if user_id is not None and request.user_id is not None and user_id != request.user_id:
+        raise HTTPException(status_code=400, detail="user_id in the query and the body differ")
+    user_id = user_id if user_id is not None else request.user_id
+    paths = job_queue.new_job_paths("csv")
+    await asyncio.get_running_loop().run_in_executor(
+        None, write_batch_input, paths["input_path"], request.descriptions
+    )
+    return await _submit_job(paths, "batch", "csv", user_id, persist=False)
+
+
+# Job status
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Status, progress counters and throughput of a background job"""
+    return job_status(await _get_job(job_id))
+
+
+# Job results
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Per-row results of a finished job as NDJSON, followed by a summary line
+
+    Returns 409 while the job is still queued or running.
+    """
+    job = await _get_job(job_id)
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+
+    async def lines():
+        with open(job["result_path"], "rb") as f:
+            while True:
+                block = await asyncio.get_running_loop().run_in_executor(None, f.read, 1024 * 1024)
+                if not block:
+                    break
+                yield block
+        yield (json.dumps({"summary": job_status(job)}) + "\n").encode()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# Job cancellation
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one after its current chunk"""
+    await _get_job(job_id)
+    job = await asyncio.get_running_loop().run_in_executor(None, job_queue.cancel, job_id)
+    return job_status(job)
+
+
+async def _read_image(file: UploadFile) -> bytes:
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=400, detail=f"{file.filename or 'File'} must be an image")
+    data = await file.read(OCR_MAX_IMAGE_BYTES + 1)
+    if len(data) > OCR_MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail=f"Images must be at most {OCR_MAX_IMAGE_BYTES} bytes")
+    return data
+
+
+# OCR endpoint
 @app.post("/api/ocr-categorize")
 async def ocr_categorize(file: UploadFile = File(...)):
-    """Extract text from receipt image and categorize"""
-    if not file.content_type.startswith('image/'):
-        raise HTTPException(status_code=400, detail="File must be an image")
+    """
+    Extract merchant and amount from a receipt image and categorize it
+
+    Returns 429 when the OCR queue is full.
+    """
+    data = await _read_image(file)
+    try:
+        return await receipt_pipeline.process(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OCREngineUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+# Batch OCR endpoint
+@app.post("/api/ocr-categorize/batch")
+async def ocr_categorize_batch(files: List[UploadFile] = File(...)):
+    """
+    Extract and categorize several receipt images at once
+
+    Images are OCRed concurrently within the pipeline's bounds; an
+    unreadable image gets an ``error`` entry instead of failing the batch.
+    """
+    if len(files) > OCR_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {OCR_MAX_BATCH} images per batch")
+    images = [await _read_image(file) for file in files]
+    try:
+        results = await receipt_pipeline.process_many(images)
+    except OCREngineUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"processed": len(results), "results": results}
+
+
+# Model hot-reload endpoint
+@app.post("/api/admin/reload")
+async def reload_model(x_admin_token: Optional[str] = Header(None)):
+    """Load the model currently on disk and swap it in without downtime"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if admin_token and x_admin_token != admin_token:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    try:
+        loaded = await model_registry.reload_async()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Model files not found: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
 
-    # TODO: Implement OCR and categorization
     return {
-        "merchant": "",
-        "amount": 0.0,
-        "category": "Other",
-        "confidence": 0.0
+        "status": "reloaded",
+        "model_version": loaded.version,
+        "reload_seconds": round(model_registry.last_reload_seconds, 4)
     }
 
 
-# Correction feedback endpoint (placeholder)
+# Drift monitoring endpoint
+@app.get("/api/monitoring")
+async def monitoring(detail: bool = False):
+    """
+    Accuracy and confidence drift of the served model since it was loaded
+
+    ``drift_detected`` is set while recent accuracy has fallen below its
+    reference or the recent confidence distribution has shifted from it;
+    retraining jobs poll this instead of running on a fixed schedule.
+    With ``detail`` the per-category precision and recall, the confusion
+    matrix and the confidence histogram are included.
+    """
+    if model_monitor is None:
+        raise HTTPException(status_code=404, detail="Monitoring is disabled")
+    return model_monitor.stats(include_matrix=detail)
+
+
+# Correction feedback endpoint
 @app.post("/api/correct")
-async def record_correction(data: dict):
-    """Record user correction for retraining"""
-    # TODO: Save correction to database and schedule retraining
-    return {"status": "recorded", "retraining_scheduled": "tonight"}
+async def record_correction(correction: CorrectionRequest, session: AsyncSession = Depends(get_session)):
+    """
+    Record user correction for retraining
+
+    The correction is stored and its transaction marked as corrected, and
+    counted by the merchant index, which answers the description with the
+    corrected category once enough observations agree. If the active model supports incremental updates, it is also
+    buffered and applied in batches of ONLINE_UPDATE_BATCH; otherwise it
+    waits for the nightly retrain. The correcting user's overlay learns
+    it immediately; a category the shared model does not have is a custom
+    category and only goes into that user's overlay. The correction also
+    feeds the accuracy monitor behind ``/api/monitoring``.
+    """
+    transaction = await transaction_store.record_correction(
+        correction.correct_category,
+        transaction_id=correction.transaction_id,
+        predicted_category=correction.predicted_category,
+        user_id=correction.user_id,
+        description=correction.description,
+        session=session
+    )
+    description = correction.description
+    user_id = correction.user_id
+    if transaction is not None:
+        description = description if description is not None else transaction.description
+        user_id = user_id if user_id is not None else transaction.user_id
+    predicted_category = correction.predicted_category
+    if predicted_category is None and transaction is not None:
+        predicted_category = transaction.predicted_category
+    if model_monitor is not None:
+        model_monitor.record_correction(predicted_category, correction.correct_category)
+
+    shared = user_overlays is None or categorization_service.knows_category(correction.correct_category)
+    if user_overlays is not None and user_id is not None and description is not None:
+        user_overlays.record(user_id, description, correction.correct_category, predicted_category)
+
+    if merchant_index is not None and description is not None and shared:
+        await asyncio.get_running_loop().run_in_executor(
+            None, merchant_index.add_correction, description, correction.correct_category
+        )
+
+    if not online_learner.enabled or description is None or not shared:
+        return {"status": "recorded", "retraining_scheduled": "tonight"}
+
+    loaded = await asyncio.get_running_loop().run_in_executor(
+        None, online_learner.add, description, correction.correct_category
+    )
+    if loaded is not None:
+        inference_executor.refresh()
+    return {
+        "status": "recorded",
+        "retraining_scheduled": "incremental",
+        "pending_corrections": online_learner.pending,
+        "model_version": loaded.version if loaded is not None else categorization_service.model_version
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,104 @@
+"""
+Benchmark incremental updates against full retraining
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from train_model import build_classifier, build_vectorizer
+
+from app.services.preprocessing import preprocess_many
+
+
+INITIAL_EPOCHS = 5
+
+
+def full_retrain(X, y):
+    vectorizer = build_vectorizer("tfidf")
+    model = build_classifier("tfidf")
+    model.fit(vectorizer.fit_transform(X), y)
+    return vectorizer, model
+
+
+def benchmark(dataset_path: str, batches: int = 10, initial_fraction: float = 0.5):
+    """
+    Replay part of a dataset as a stream of correction batches
+
+    The first ``initial_fraction`` of the training split trains both
+    models. The rest arrives in ``batches`` batches; after each one the
+    TF-IDF model is refit from scratch on everything seen so far, and the
+    hashing model gets one ``partial_fit`` call. Both are scored on the
+    same held-out test split.
+    """
+    df = pd.read_csv(dataset_path)
+    X = np.array(preprocess_many(df['description'].astype(str)), dtype=object)
+    y = df['category'].values
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    n_initial = max(1, int(len(X_train) * initial_fraction))
+    stream = np.array_split(np.arange(n_initial, len(X_train)), batches)
+    classes = np.unique(y)
+
+    started = time.perf_counter()
+    tfidf_vectorizer, tfidf_model = full_retrain(X_train[:n_initial], y_train[:n_initial])
+    full_initial = time.perf_counter() - started
+
+    started = time.perf_counter()
+    hashing_vectorizer = build_vectorizer("hashing")
+    hashing_model = build_classifier("hashing")
+    X_initial = hashing_vectorizer.transform(X_train[:n_initial])
+    # partial_fit (rather than fit) so every class is known to later updates
+    for _ in range(INITIAL_EPOCHS):
+        hashing_model.partial_fit(X_initial, y_train[:n_initial], classes)
+    hashing_initial = time.perf_counter() - started
+
+    print(f"Initial training on {n_initial} rows: full {full_initial:.3f}s, incremental {hashing_initial:.3f}s\n")
+    print(f"{'batch':>5}{'seen':>8}{'full (s)':>10}{'full acc':>10}{'incr (s)':>10}{'incr acc':>10}")
+
+    full_total = incremental_total = 0.0
+    for i, rows in enumerate(stream, start=1):
+        if len(rows) == 0:
+            continue
+        seen = rows[-1] + 1
+
+        started = time.perf_counter()
+        tfidf_vectorizer, tfidf_model = full_retrain(X_train[:seen], y_train[:seen])
+        full_seconds = time.perf_counter() - started
+        full_accuracy = accuracy_score(y_test, tfidf_model.predict(tfidf_vectorizer.transform(X_test)))
+
+        started = time.perf_counter()
+        hashing_model.partial_fit(hashing_vectorizer.transform(X_train[rows]), y_train[rows])
+        incremental_seconds = time.perf_counter() - started
+        incremental_accuracy = accuracy_score(y_test, hashing_model.predict(hashing_vectorizer.transform(X_test)))
+
+        full_total += full_seconds
+        incremental_total += incremental_seconds
+        print(
+            f"{i:>5}{seen:>8}{full_seconds:>10.3f}{full_accuracy:>10.4f}"
+            f"{incremental_seconds:>10.4f}{incremental_accuracy:>10.4f}"
+        )
+
+    print(f"\nTotal update time: full {full_total:.3f}s, incremental {incremental_total:.4f}s")
+    if incremental_total > 0:
+        print(f"Incremental updates were {full_total / incremental_total:.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare incremental updates with full retraining")
+    parser.add_argument("--dataset", type=str, required=True, help="Path to training dataset CSV file")
+    parser.add_argument("--batches", type=int, default=10, help="Number of correction batches")
+    parser.add_argument(
+        "--initial-fraction",
+        type=float,
+        default=0.5,
+        help="Fraction of the training split used for the initial model"
+    )
+
+    args = parser.parse_args()
+    benchmark(args.dataset, args.batches, args.initial_fraction)
@@ -0,0 +1,94 @@
+"""
+Measure insert throughput of bulk vs row-by-row transaction persistence
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.database import Transaction
+from app.models.session import Database
+from app.services.persistence import TransactionStore
+
+
+MERCHANTS = [
+    ("Starbucks Coffee", "Food"),
+    ("Uber Ride", "Transport"),
+    ("Electric Bill", "Bills"),
+    ("Amazon Purchase", "Shopping"),
+    ("Netflix Subscription", "Entertainment"),
+    ("CVS Pharmacy", "Health"),
+]
+
+
+def make_rows(n: int):
+    rng = random.Random(42)
+    rows = []
+    for i in range(n):
+        merchant, category = rng.choice(MERCHANTS)
+        rows.append({
+            "description": f"{merchant} #{rng.randint(1000, 9999)}",
+            "amount": round(rng.uniform(1, 500), 2),
+            "category": category,
+            "confidence": round(rng.uniform(0.3, 1.0), 4),
+        })
+    return rows
+
+
+async def bulk_insert(url: str, rows, batch_size: int) -> float:
+    database = Database(url)
+    await database.create_tables()
+    store = TransactionStore(database, batch_size=batch_size)
+    started = time.perf_counter()
+    await store.insert_transactions(rows, user_id=None)
+    elapsed = time.perf_counter() - started
+    await database.dispose()
+    return elapsed
+
+
+async def orm_insert(url: str, rows) -> float:
+    database = Database(url)
+    await database.create_tables()
+    started = time.perf_counter()
+    async with database.session() as session:
+        for row in rows:
+            session.add(Transaction(
+                description=row["description"],
+                amount=row["amount"],
+                predicted_category=row["category"],
+                predicted_confidence=row["confidence"],
+            ))
+            await session.flush()
+    elapsed = time.perf_counter() - started
+    await database.dispose()
+    return elapsed
+
+
+async def main(rows: int, orm_rows: int, batch_size: int):
+    data = make_rows(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        bulk_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bulk.db')}"
+        orm_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'orm.db')}"
+
+        bulk_seconds = await bulk_insert(bulk_url, data, batch_size)
+        orm_seconds = await orm_insert(orm_url, data[:orm_rows])
+
+    print(f"\n{'method':<12}{'rows':>10}{'seconds':>10}{'rows/sec':>12}")
+    print(f"{'bulk':<12}{rows:>10}{bulk_seconds:>10.3f}{rows / bulk_seconds:>12.0f}")
+    print(f"{'row-by-row':<12}{orm_rows:>10}{orm_seconds:>10.3f}{orm_rows / orm_seconds:>12.0f}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark transaction insert throughput on SQLite")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows for the bulk insert")
+    parser.add_argument("--orm-rows", type=int, default=10_000, help="Rows for the row-by-row insert")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per executemany batch")
+
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.orm_rows, args.batch_size))
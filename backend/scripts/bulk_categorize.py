@@ -0,0 +1,66 @@
+"""
+Categorize a Parquet or Arrow IPC file in bulk
+
+Reads the input batch by batch, scores each batch with one vectorized
+pass and writes the input columns plus predicted_category, confidence
+and model_version to the output file, without CSV or JSON in between.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.categorization import CategorizationService
+from app.services.columnar import DEFAULT_BULK_BATCH_ROWS, MEDIA_TYPES, ColumnarUnavailable, categorize_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Categorize a Parquet or Arrow IPC file")
+    parser.add_argument("input", type=str, help="Parquet (.parquet) or Arrow IPC (.arrow, .feather) file")
+    parser.add_argument("output", type=str, help="File to write; format from its extension unless --output-format")
+    parser.add_argument(
+        "--column",
+        type=str,
+        default=None,
+        help="Description column (default: the first of description, memo, name, payee, details)"
+    )
+    parser.add_argument("--input-format", type=str, choices=sorted(MEDIA_TYPES), default=None)
+    parser.add_argument("--output-format", type=str, choices=sorted(MEDIA_TYPES), default=None)
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=DEFAULT_BULK_BATCH_ROWS,
+        help="Rows per Parquet read batch"
+    )
+    parser.add_argument("--model", type=str, default="models/classifier.pkl", help="Path to trained model")
+    parser.add_argument(
+        "--vectorizer",
+        type=str,
+        default="models/tfidf_vectorizer.pkl",
+        help="Path to TF-IDF vectorizer"
+    )
+    parser.add_argument(
+        "--artifact-dir",
+        type=str,
+        default=None,
+        help="Memory-map an exported artifact instead of loading the pickles"
+    )
+
+    args = parser.parse_args()
+
+    service = CategorizationService(args.model, args.vectorizer, artifact_dir=args.artifact_dir)
+    if not service.model_loaded:
+        print("Error: Model files not found. Please train the model first.", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        stats = categorize_file(
+            service, args.input, args.output, args.input_format, args.output_format,
+            args.column, args.batch_rows
+        )
+    except (ValueError, ColumnarUnavailable) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(stats, indent=2))
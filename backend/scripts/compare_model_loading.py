@@ -0,0 +1,99 @@
+"""
+Compare cold start and per-worker memory of pickle vs memory-mapped artifacts
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _memory_kb() -> dict:
+    """RSS and PSS (shared pages split between processes) from /proc, in kB"""
+    memory = {"rss_kb": None, "pss_kb": None}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Rss:"):
+                    memory["rss_kb"] = int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    memory["pss_kb"] = int(line.split()[1])
+    except OSError:
+        import resource
+        memory["rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return memory
+
+
+def _worker(mode, model_path, vectorizer_path, artifact_dir, ready, release, results):
+    from app.services.categorization import CategorizationService
+
+    baseline = _memory_kb()
+    started = time.perf_counter()
+    if mode == "mmap":
+        service = CategorizationService(artifact_dir=artifact_dir, inference_mode="compiled")
+    else:
+        service = CategorizationService(model_path, vectorizer_path)
+    load_seconds = time.perf_counter() - started
+
+    # Touch every page of the arrays, as a warmed-up worker would
+    service.batch_predict(["Starbucks Coffee", "Uber Ride", "Electric Bill"])
+    if service.compiled is not None:
+        float(service.compiled.coef_t.sum())
+
+    ready.put(None)
+    # Measure while all workers are alive so shared pages are split between them
+    release.wait()
+    memory = _memory_kb()
+    results.put({
+        "load_seconds": load_seconds,
+        "rss_kb": memory["rss_kb"] - (baseline["rss_kb"] or 0),
+        "pss_kb": (memory["pss_kb"] or 0) - (baseline["pss_kb"] or 0),
+    })
+
+
+def compare(mode: str, workers: int, model_path: str, vectorizer_path: str, artifact_dir: str) -> dict:
+    """Start ``workers`` processes loading the model in ``mode`` and average their stats"""
+    ctx = multiprocessing.get_context("spawn")
+    ready, results, release = ctx.Queue(), ctx.Queue(), ctx.Event()
+    processes = [
+        ctx.Process(
+            target=_worker,
+            args=(mode, model_path, vectorizer_path, artifact_dir, ready, release, results)
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+    release.set()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    return {
+        key: sum(s[key] for s in stats) / len(stats)
+        for key in ("load_seconds", "rss_kb", "pss_kb")
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pickle vs memory-mapped model loading")
+    parser.add_argument("--model", type=str, default="models/classifier.pkl", help="Path to trained model")
+    parser.add_argument("--vectorizer", type=str, default="models/tfidf_vectorizer.pkl",
+                        help="Path to TF-IDF vectorizer")
+    parser.add_argument("--artifacts", type=str, default="models/artifacts", help="Artifact directory")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes")
+
+    args = parser.parse_args()
+
+    print(f"\n{'mode':<8}{'load (ms)':>12}{'RSS/worker (MB)':>18}{'PSS/worker (MB)':>18}")
+    for mode in ("pickle", "mmap"):
+        stats = compare(mode, args.workers, args.model, args.vectorizer, args.artifacts)
+        print(
+            f"{mode:<8}{stats['load_seconds'] * 1000:>12.2f}"
+            f"{stats['rss_kb'] / 1024:>18.2f}{stats['pss_kb'] / 1024:>18.2f}"
+        )
+    print()
@@ -1,14 +1,277 @@
 """
 Prediction CLI script
+
+Classifies one description, or streams many from stdin or a file. With
+``--serve`` it runs a daemon on a Unix socket that keeps the model
+resident; ``--socket`` sends the work to that daemon instead of loading
+the model in every process.
 """
+import argparse
+import csv
+import json
+import os
+import socket
+import socketserver
+import stat
 import sys
-import joblib
+import threading
+import time
 from pathlib import Path
-import argparse
+from typing import Iterable, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# numpy, sklearn and joblib are imported only where a model is loaded, so a
+# client talking to the daemon starts in milliseconds
+
+OUTPUT_FORMATS = ("text", "tsv", "jsonl")
+DEFAULT_BATCH_SIZE = 1024
+RELOAD_CHECK_SECONDS = 1.0
+
+
+def iter_descriptions(stream, column: str = None) -> Iterator[str]:
+    """
+    Descriptions from a text stream: one per line, or one CSV column
+
+    Raises:
+        ValueError: If ``column`` is not in the CSV header
+    """
+    if column is None:
+        for line in stream:
+            line = line.rstrip("\r\n")
+            if line.strip():
+                yield line
+        return
+
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None or column not in reader.fieldnames:
+        raise ValueError(f"CSV has no '{column}' column")
+    for row in reader:
+        yield row[column] or ""
+
+
+def iter_batches(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def format_results(descriptions: List[str], ranked: List[List[Tuple[str, float]]], fmt: str,
+                   review_threshold: float = None) -> str:
+    """Render one batch of ranked predictions as text, TSV or JSON lines"""
+    lines = []
+    for description, candidates in zip(descriptions, ranked):
+        category, confidence = candidates[0]
+        needs_review = review_threshold is not None and confidence < review_threshold
+        if fmt == "jsonl":
+            record = {"description": description, "category": category, "confidence": round(confidence, 4)}
+            if len(candidates) > 1:
+                record["alternatives"] = [
+                    {"category": label, "confidence": round(probability, 4)} for label, probability in candidates[1:]
+                ]
+            if review_threshold is not None:
+                record["needs_review"] = needs_review
+            lines.append(json.dumps(record))
+        elif fmt == "tsv":
+            fields = [" ".join(description.split()), category, f"{confidence:.4f}"]
+            for label, probability in candidates[1:]:
+                fields += [label, f"{probability:.4f}"]
+            if review_threshold is not None:
+                fields.append("review" if needs_review else "ok")
+            lines.append("\t".join(fields))
+        else:
+            lines.append(f"\nTransaction: {description}")
+            lines.append(f"Predicted Category: {category}")
+            lines.append(f"Confidence Score: {confidence:.2%}")
+            for label, probability in candidates[1:]:
+                lines.append(f"  Alternative: {label} ({probability:.2%})")
+            if needs_review:
+                lines.append("Needs review: confidence is below the review threshold")
+            lines.append("")
+    return "".join(line + "\n" for line in lines)
+
+
+class LocalScorer:
+    """Scores batches with a CategorizationService loaded in this process"""
+
+    def __init__(self, model_path: str, vectorizer_path: str, artifact_dir: str = None):
+        from app.services.categorization import CategorizationService
+        from app.services.registry import ModelRegistry
+
+        self.service = CategorizationService(model_path, vectorizer_path, artifact_dir=artifact_dir)
+        if not self.service.model_loaded:
+            raise FileNotFoundError(f"No model at {artifact_dir or model_path}")
+        self.registry = ModelRegistry(self.service)
+        self._checked_at = time.monotonic()
+        self._reload_lock = threading.Lock()
+
+    def refresh(self):
+        """Pick up a retrained model, checking the files at most once per second"""
+        now = time.monotonic()
+        if now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return
+        with self._reload_lock:
+            if now - self._checked_at < RELOAD_CHECK_SECONDS:
+                return
+            self._checked_at = now
+            try:
+                self.registry.reload_if_changed()
+            except Exception as e:
+                print(f"Model reload failed, keeping {self.service.model_version}: {e}", file=sys.stderr)
+
+    def score(self, descriptions: List[str], top_k: int) -> List[List[Tuple[str, float]]]:
+        return self.service.batch_predict_top_k(descriptions, top_k)
+
+
+class DaemonScorer:
+    """
+    Scores batches through a running daemon
+
+    The protocol is one JSON object per line in each direction:
+    ``{"descriptions": [...], "top_k": k}`` and ``{"results": [...]}``
+    (or ``{"error": "..."}``).
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._reader = self._socket.makefile("r", encoding="utf-8")
+        self._writer = self._socket.makefile("w", encoding="utf-8")
+
+    def score(self, descriptions: List[str], top_k: int) -> List[List[Tuple[str, float]]]:
+        self._writer.write(json.dumps({"descriptions": descriptions, "top_k": top_k}) + "\n")
+        self._writer.flush()
+        response = json.loads(self._reader.readline() or '{"error": "daemon closed the connection"}')
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return [[tuple(candidate) for candidate in candidates] for candidates in response["results"]]
+
+    def close(self):
+        self._socket.close()
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        scorer = self.server.scorer
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                descriptions = request["descriptions"]
+                top_k = max(1, int(request.get("top_k", 1)))
+                scorer.refresh()
+                response = {"results": scorer.score(descriptions, top_k)}
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def remove_stale_socket(socket_path: str):
+    """
+    Remove a socket left behind by a daemon that is no longer running
+
+    Raises:
+        ValueError: If the path exists and is not a socket
+        RuntimeError: If a daemon is still accepting connections on it
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{socket_path} exists and is not a socket")
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.remove(socket_path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"A daemon is already serving on {socket_path}")
+
+
+def serve(socket_path: str, model_path: str, vectorizer_path: str, artifact_dir: str = None):
+    """
+    Keep the model loaded and answer CLI clients on a Unix socket
+
+    Each connection is handled in its own thread; a retrained model is
+    picked up without restarting. The socket is created with mode 0600 so
+    only the owning user can connect. A socket left by a dead daemon is
+    replaced; a live daemon's socket or any other file is left alone, and
+    on shutdown only the socket this process created is removed.
+
+    Raises:
+        ValueError: If ``socket_path`` exists and is not a socket
+        RuntimeError: If another daemon is serving on ``socket_path``
+    """
+    remove_stale_socket(socket_path)
+    scorer = LocalScorer(model_path, vectorizer_path, artifact_dir)
+
+    previous_umask = os.umask(0o177)
+    try:
+        server = _DaemonServer(socket_path, _DaemonHandler)
+    finally:
+        os.umask(previous_umask)
+    server.scorer = scorer
+    created = os.stat(socket_path)
+
+    print(f"Serving model {scorer.service.model_version} on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            current = os.stat(socket_path)
+        except FileNotFoundError:
+            current = None
+        if current is not None and (current.st_dev, current.st_ino) == (created.st_dev, created.st_ino):
+            os.remove(socket_path)
+
+
+def connect_scorer(socket_path: str, model_path: str, vectorizer_path: str, artifact_dir: str = None):
+    """The daemon at ``socket_path`` if one is answering, otherwise a model loaded here"""
+    if socket_path:
+        try:
+            return DaemonScorer(socket_path)
+        except OSError as e:
+            print(f"Daemon not reachable at {socket_path} ({e}); loading the model locally", file=sys.stderr)
+    return LocalScorer(model_path, vectorizer_path, artifact_dir)
+
+
+def predict_stream(descriptions: Iterable[str], scorer, output, fmt: str = "tsv", top_k: int = 1,
+                   batch_size: int = DEFAULT_BATCH_SIZE, review_threshold: float = None) -> int:
+    """
+    Score descriptions batch by batch and write each batch as soon as it is ready
+
+    Returns:
+        Number of descriptions written
+    """
+    written = 0
+    for batch in iter_batches(descriptions, max(1, batch_size)):
+        output.write(format_results(batch, scorer.score(batch, top_k), fmt, review_threshold))
+        output.flush()
+        written += len(batch)
+    return written
 
 
 def predict_category(description: str, model_path: str = "models/classifier.pkl",
-                    vectorizer_path: str = "models/tfidf_vectorizer.pkl"):
+                     vectorizer_path: str = "models/tfidf_vectorizer.pkl", top_k: int = 1,
+                     review_threshold: float = None):
     """
     Predict category for a transaction description
 
@@ -16,30 +279,25 @@ def predict_category(description: str, model_path: str = "models/classifier.pkl"
         description: Transaction description
         model_path: Path to trained model
         vectorizer_path: Path to TF-IDF vectorizer
+        top_k: Number of candidate categories to print
+        review_threshold: Flag the prediction for review below this confidence
     """
     try:
-        # Load model and vectorizer
-        model = joblib.load(model_path)
-        vectorizer = joblib.load(vectorizer_path)
-
-        # Transform and predict
-        X = vectorizer.transform([description])
-        prediction = model.predict(X)[0]
-        probabilities = model.predict_proba(X)[0]
-        confidence = max(probabilities)
-
-        print(f"\nTransaction: {description}")
-        print(f"Predicted Category: {prediction}")
-        print(f"Confidence Score: {confidence:.2%}\n")
-
+        scorer = LocalScorer(model_path, vectorizer_path)
     except FileNotFoundError as e:
         print(f"Error: Model files not found. Please train the model first.\n{e}")
         sys.exit(1)
+    predict_stream([description], scorer, sys.stdout, "text", top_k, review_threshold=review_threshold)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Predict expense category from description")
-    parser.add_argument("description", type=str, help="Transaction description")
+    parser.add_argument(
+        "description",
+        type=str,
+        nargs="?",
+        help="Transaction description; omit to read descriptions from --input or stdin"
+    )
     parser.add_argument(
         "--model",
         type=str,
@@ -52,6 +310,94 @@ if __name__ == "__main__":
         default="models/tfidf_vectorizer.pkl",
         help="Path to TF-IDF vectorizer"
     )
+    parser.add_argument(
+        "--artifact-dir",
+        type=str,
+        default=None,
+        help="Memory-map an exported artifact instead of loading the pickles"
+    )
+    parser.add_argument(
+        "--input",
+        type=str,
+        default="-",
+        help="File with one description per line, or a CSV with --column ('-' for stdin)"
+    )
+    parser.add_argument(
+        "--column",
+        type=str,
+        default=None,
+        help="Read descriptions from this CSV column instead of one per line"
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help="Output format (default: text for one description, tsv for bulk input)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Descriptions scored and written per batch"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=1,
+        help="Number of candidate categories to show"
+    )
+    parser.add_argument(
+        "--review-threshold",
+        type=float,
+        default=None,
+        help="Flag predictions below this confidence as needing review"
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=os.getenv("PREDICT_SOCKET"),
+        help="Unix socket of a running daemon to use instead of loading the model (env PREDICT_SOCKET)"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a daemon on --socket, keeping the model loaded"
+    )
 
     args = parser.parse_args()
-    predict_category(args.description, args.model, args.vectorizer)
+
+    if args.serve:
+        if not args.socket:
+            parser.error("--serve needs --socket")
+        try:
+            serve(args.socket, args.model, args.vectorizer, args.artifact_dir)
+        except (ValueError, RuntimeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+
+    fmt = args.format or ("text" if args.description is not None else "tsv")
+    try:
+        scorer = connect_scorer(args.socket, args.model, args.vectorizer, args.artifact_dir)
+    except FileNotFoundError as e:
+        print(f"Error: Model files not found. Please train the model first.\n{e}")
+        sys.exit(1)
+
+    if args.description is not None:
+        descriptions = [args.description]
+        predict_stream(descriptions, scorer, sys.stdout, fmt, args.top_k, args.batch_size, args.review_threshold)
+    else:
+        stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8-sig")
+        try:
+            predict_stream(iter_descriptions(stream, args.column), scorer, sys.stdout, fmt,
+                           args.top_k, args.batch_size, args.review_threshold)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        except BrokenPipeError:
+            # Downstream closed early (e.g. `| head`)
+            sys.stderr.close()
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
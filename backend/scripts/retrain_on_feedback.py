@@ -0,0 +1,85 @@
+"""
+Apply user corrections to the current model without a full retrain
+"""
+import argparse
+import json
+import sys
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.categorization import CategorizationService
+from app.services.online import OnlineLearner, supports_incremental_updates
+
+
+def drift_alerts(api_url: str, timeout: float = 10.0) -> list:
+    """Drift alerts currently raised by a running API's ``/api/monitoring``"""
+    with urllib.request.urlopen(f"{api_url.rstrip('/')}/api/monitoring", timeout=timeout) as response:
+        return json.load(response)["alerts"]
+
+
+def retrain_on_feedback(corrections_path: str, model_path: str = "models/classifier.pkl",
+                        vectorizer_path: str = "models/tfidf_vectorizer.pkl", batch_size: int = 1000):
+    """
+    Update a hashing-vectorizer model in place from a corrections CSV
+
+    Args:
+        corrections_path: CSV with columns: description, correct_category
+        model_path: Path to trained model (overwritten with the update)
+        vectorizer_path: Path to the (stateless) vectorizer
+        batch_size: Corrections per partial_fit call
+    """
+    service = CategorizationService(model_path, vectorizer_path, inference_mode="sklearn")
+    if not supports_incremental_updates(service.active):
+        print("Error: the model does not support incremental updates.")
+        print("Train it with: python scripts/train_model.py --dataset <csv> --vectorizer hashing")
+        sys.exit(1)
+
+    df = pd.read_csv(corrections_path)
+    if 'description' not in df.columns or 'correct_category' not in df.columns:
+        raise ValueError("Corrections must have 'description' and 'correct_category' columns")
+
+    learner = OnlineLearner(service, batch_size=batch_size)
+    print(f"Applying {len(df)} corrections to model {service.model_version}...")
+    for start in range(0, len(df), batch_size):
+        chunk = df.iloc[start:start + batch_size]
+        learner.update(list(zip(chunk['description'], chunk['correct_category'])))
+
+    stats = learner.stats()
+    print(f"Applied:  {stats['applied_corrections']}")
+    print(f"Skipped:  {stats['skipped_corrections']} (unknown category)")
+    print(f"Updates:  {stats['updates']}")
+    print(f"New model version: {service.model_version}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally update the model from corrections")
+    parser.add_argument("--corrections", type=str, required=True, help="Path to corrections CSV file")
+    parser.add_argument("--model", type=str, default="models/classifier.pkl", help="Path to trained model")
+    parser.add_argument(
+        "--vectorizer",
+        type=str,
+        default="models/tfidf_vectorizer.pkl",
+        help="Path to vectorizer"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="Corrections per update")
+    parser.add_argument(
+        "--if-drift",
+        type=str,
+        default=None,
+        metavar="API_URL",
+        help="Only update when the API at this URL reports drift (e.g. http://localhost:5000)"
+    )
+
+    args = parser.parse_args()
+    if args.if_drift:
+        alerts = drift_alerts(args.if_drift)
+        if not alerts:
+            print("No drift detected; model left unchanged.")
+            sys.exit(0)
+        for alert in alerts:
+            print(f"Drift: {json.dumps(alert)}")
+    retrain_on_feedback(args.corrections, args.model, args.vectorizer, args.batch_size)
@@ -2,69 +2,92 @@
 Training script for the ML model
 """
 import pandas as pd
+import numpy as np
 import joblib
+import resource
+import scipy.sparse as sp
+import time
+from collections import Counter
+from joblib import Parallel, delayed
 from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix, classification_report
 import argparse
 import os
+import sys
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def train_model(dataset_path: str, output_dir: str = "models"):
-    """
-    Train the expense categorization model
+from app.services.artifacts import export_artifacts
+from app.services.categorization import calibrate_review_threshold
+from app.services.compiled import CompiledLinearModel
+from app.services.preprocessing import preprocess_many
 
-    Args:
-        dataset_path: Path to CSV file with columns: description, category
-        output_dir: Directory to save trained model and vectorizer
-    """
-    # Create output directory if it doesn't exist
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-    # Load dataset
-    print(f"Loading dataset from {dataset_path}...")
-    df = pd.read_csv(dataset_path)
+VECTORIZER_TYPES = ("tfidf", "hashing")
 
-    if 'description' not in df.columns or 'category' not in df.columns:
-        raise ValueError("Dataset must have 'description' and 'category' columns")
+# Fixed feature space for incrementally updated models
+HASHING_FEATURES = 2 ** 18
 
-    # Split data
-    X = df['description'].values
-    y = df['category'].values
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+def build_vectorizer(vectorizer_type: str = "tfidf", **params):
+    """
+    Create the feature extractor for a training run
 
-    print(f"Training set size: {len(X_train)}")
-    print(f"Test set size: {len(X_test)}")
-    print(f"Categories: {set(y)}\n")
+    "tfidf" learns a vocabulary and idf weights from the data. "hashing"
+    uses a stateless HashingVectorizer, whose feature space never changes,
+    so the model can later be updated with ``partial_fit`` from corrections.
+    ``params`` override the defaults (e.g. for hyperparameter search).
+    """
+    if vectorizer_type == "hashing":
+        vectorizer = HashingVectorizer(
+            n_features=HASHING_FEATURES,
+            stop_words='english',
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm='l2'
+        )
+    else:
+        vectorizer = TfidfVectorizer(
+            max_features=5000,
+            stop_words='english',
+            ngram_range=(1, 2),
+            min_df=2,
+            max_df=0.8
+        )
+    return vectorizer.set_params(**params)
 
-    # Feature extraction
-    print("Extracting TF-IDF features...")
-    vectorizer = TfidfVectorizer(
-        max_features=5000,
-        stop_words='english',
-        ngram_range=(1, 2),
-        min_df=2,
-        max_df=0.8
-    )
-    X_train_tfidf = vectorizer.fit_transform(X_train)
-    X_test_tfidf = vectorizer.transform(X_test)
 
-    # Train model
-    print("Training Logistic Regression model...")
-    model = LogisticRegression(max_iter=1000, random_state=42, multi_class='multinomial')
-    model.fit(X_train_tfidf, y_train)
+def build_classifier(vectorizer_type: str = "tfidf", **params):
+    """Create the classifier matching ``build_vectorizer(vectorizer_type)``"""
+    if vectorizer_type == "hashing":
+        model = SGDClassifier(loss='log_loss', alpha=1e-5, max_iter=50, tol=None, random_state=42)
+    else:
+        model = LogisticRegression(max_iter=1000, random_state=42, multi_class='multinomial')
+    return model.set_params(**params)
 
-    # Evaluate
+
+def evaluate_model(model, X_test, y_test, review_precision: float = 0.95) -> float:
+    """
+    Print accuracy, precision, recall, F1, confusion matrix and report
+
+    Also calibrates the confidence threshold below which predictions
+    should go to "needs review" so the rest reach ``review_precision``.
+
+    Returns:
+        The calibrated review threshold
+    """
     print("\n" + "="*50)
     print("MODEL EVALUATION")
     print("="*50)
 
-    y_pred = model.predict(X_test_tfidf)
+    # One scoring pass: labels are the argmax of the probabilities
+    probabilities = model.predict_proba(X_test)
+    best = probabilities.argmax(axis=1)
+    y_pred = model.classes_[best]
+    confidences = probabilities[np.arange(len(best)), best]
     accuracy = accuracy_score(y_test, y_pred)
     precision = precision_score(y_test, y_pred, average='weighted', zero_division=0)
     recall = recall_score(y_test, y_pred, average='weighted', zero_division=0)
@@ -81,7 +104,15 @@ def train_model(dataset_path: str, output_dir: str = "models"):
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred))
 
-    # Save model and vectorizer
+    threshold = calibrate_review_threshold(confidences, y_pred == np.asarray(y_test), review_precision)
+    review_share = float(np.mean(confidences < threshold))
+    print(f"Review threshold for {review_precision:.0%} precision: {threshold:.4f} "
+          f"({review_share:.1%} of test rows need review; set REVIEW_CONFIDENCE_THRESHOLD)")
+    return threshold
+
+
+def save_model(model, vectorizer, output_dir: str, vectorizer_type: str = "tfidf"):
+    """Save the model and vectorizer pickles and, for TF-IDF, the mmap artifact"""
     model_path = os.path.join(output_dir, "classifier.pkl")
     vectorizer_path = os.path.join(output_dir, "tfidf_vectorizer.pkl")
 
@@ -91,6 +122,241 @@ def train_model(dataset_path: str, output_dir: str = "models"):
     print(f"\nModel saved to {model_path}")
     print(f"Vectorizer saved to {vectorizer_path}")
 
+    # Export the memory-mappable artifact used for fast cold starts
+    if vectorizer_type == "tfidf":
+        artifact_dir = export_artifacts(
+            CompiledLinearModel.from_sklearn(vectorizer, model),
+            os.path.join(output_dir, "artifacts")
+        )
+        print(f"Artifact exported to {artifact_dir}")
+
+
+def _peak_memory_mb() -> float:
+    """Peak RSS of this process and its finished workers, in MB (Linux reports kB)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(usage, children) / 1024
+
+
+def _split_chunk(chunk: pd.DataFrame, chunk_index: int, test_size: float = 0.2):
+    """Deterministic per-chunk train/test split, identical on every pass"""
+    rng = np.random.default_rng(42 + chunk_index)
+    is_test = rng.random(len(chunk)) < test_size
+    return chunk[~is_test], chunk[is_test]
+
+
+def _chunk_statistics(vectorizer, chunk: pd.DataFrame, chunk_index: int):
+    """Document and term frequencies of a chunk's training rows"""
+    train, _ = _split_chunk(chunk, chunk_index)
+    analyzer = vectorizer.build_analyzer()
+    document_frequency = Counter()
+    term_frequency = Counter()
+    for description in train['description']:
+        terms = analyzer(description)
+        term_frequency.update(terms)
+        document_frequency.update(set(terms))
+    return document_frequency, term_frequency, len(train)
+
+
+def _vectorize(vectorizer, descriptions: pd.Series):
+    """Feature rows of ``descriptions``; an empty split gives an empty matrix of the right width"""
+    if len(descriptions) == 0:
+        return sp.csr_matrix((0, vectorizer.transform([""]).shape[1]))
+    return vectorizer.transform(descriptions)
+
+
+def _transform_chunk(vectorizer, chunk: pd.DataFrame, chunk_index: int):
+    train, test = _split_chunk(chunk, chunk_index)
+    return (
+        _vectorize(vectorizer, train['description']), train['category'].values,
+        _vectorize(vectorizer, test['description']), test['category'].values,
+    )
+
+
+def _read_chunks(dataset_path: str, chunksize: int):
+    for chunk in pd.read_csv(dataset_path, chunksize=chunksize):
+        if 'description' not in chunk.columns or 'category' not in chunk.columns:
+            raise ValueError("Dataset must have 'description' and 'category' columns")
+        chunk = chunk.dropna(subset=['description', 'category'])
+        yield chunk.assign(description=preprocess_many(chunk['description'].astype(str)))
+
+
+def _fit_tfidf_vocabulary(vectorizer, document_frequency: Counter, term_frequency: Counter, n_docs: int):
+    """
+    Apply min_df/max_df/max_features the way TfidfVectorizer.fit does
+
+    Returns a TfidfVectorizer with a fixed vocabulary and idf weights,
+    equivalent to fitting ``vectorizer`` on all training rows at once.
+    """
+    params = vectorizer.get_params()
+    max_df, min_df = params['max_df'], params['min_df']
+    max_doc_count = max_df if isinstance(max_df, int) else max_df * n_docs
+    min_doc_count = min_df if isinstance(min_df, int) else min_df * n_docs
+
+    terms = [
+        term for term, df in document_frequency.items()
+        if min_doc_count <= df <= max_doc_count
+    ]
+    if params['max_features'] is not None:
+        terms = sorted(terms, key=lambda term: (-term_frequency[term], term))[:params['max_features']]
+    terms.sort()
+    if not terms:
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+
+    df = np.array([document_frequency[term] for term in terms], dtype=np.float64)
+    if params['smooth_idf']:
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+    else:
+        idf = np.log(n_docs / df) + 1
+
+    params.update(vocabulary={term: index for index, term in enumerate(terms)}, max_df=1.0, min_df=1,
+                  max_features=None)
+    fitted = TfidfVectorizer(**params)
+    fitted.idf_ = idf
+    return fitted
+
+
+def train_model_streaming(dataset_path: str, output_dir: str = "models", vectorizer_type: str = "tfidf",
+                          jobs: int = 1, chunksize: int = 100_000, review_precision: float = 0.95):
+    """
+    Train from a CSV streamed in chunks, building features in parallel
+
+    The raw CSV is never held in memory. For TF-IDF, a first parallel pass
+    collects document frequencies per chunk and merges them into the
+    vocabulary and idf weights; a second parallel pass vectorizes each
+    chunk. Hashing features need only the second pass. The classifier is
+    trained with the saga solver (or SGD for hashing features), which
+    handles large sparse matrices well. The saved artifacts are the same
+    as ``train_model``'s.
+
+    Args:
+        dataset_path: Path to CSV file with columns: description, category
+        output_dir: Directory to save trained model and vectorizer
+        vectorizer_type: "tfidf" or "hashing"
+        jobs: Number of joblib worker processes (-1 for all cores)
+        chunksize: Rows per CSV chunk
+        review_precision: Target precision used to calibrate the review threshold
+    """
+    if vectorizer_type not in VECTORIZER_TYPES:
+        raise ValueError(f"Vectorizer type must be one of {VECTORIZER_TYPES}")
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    timings = {}
+    parallel = Parallel(n_jobs=jobs, pre_dispatch="2*n_jobs")
+    vectorizer = build_vectorizer(vectorizer_type)
+    print(f"Streaming {dataset_path} in chunks of {chunksize} rows with {jobs} job(s)...")
+
+    if vectorizer_type == "tfidf":
+        started = time.perf_counter()
+        statistics = parallel(
+            delayed(_chunk_statistics)(vectorizer, chunk, i)
+            for i, chunk in enumerate(_read_chunks(dataset_path, chunksize))
+        )
+        document_frequency, term_frequency, n_docs = Counter(), Counter(), 0
+        for chunk_df, chunk_tf, chunk_docs in statistics:
+            document_frequency.update(chunk_df)
+            term_frequency.update(chunk_tf)
+            n_docs += chunk_docs
+        del statistics
+        vectorizer = _fit_tfidf_vocabulary(vectorizer, document_frequency, term_frequency, n_docs)
+        del document_frequency, term_frequency
+        timings["vocabulary"] = time.perf_counter() - started
+        print(f"Vocabulary: {len(vectorizer.vocabulary_)} terms from {n_docs} training rows")
+
+    started = time.perf_counter()
+    parts = parallel(
+        delayed(_transform_chunk)(vectorizer, chunk, i)
+        for i, chunk in enumerate(_read_chunks(dataset_path, chunksize))
+    )
+    X_train = sp.vstack([part[0] for part in parts], format="csr")
+    y_train = np.concatenate([part[1] for part in parts])
+    X_test = sp.vstack([part[2] for part in parts], format="csr")
+    y_test = np.concatenate([part[3] for part in parts])
+    del parts
+    timings["vectorize"] = time.perf_counter() - started
+
+    print(f"Training set size: {X_train.shape[0]}")
+    print(f"Test set size: {X_test.shape[0]}")
+    print(f"Categories: {set(y_train)}\n")
+
+    started = time.perf_counter()
+    if vectorizer_type == "tfidf":
+        model = LogisticRegression(max_iter=1000, random_state=42, solver='saga', tol=1e-3)
+    else:
+        model = build_classifier(vectorizer_type)
+    print(f"Training {type(model).__name__} model...")
+    model.fit(X_train, y_train)
+    timings["train"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    evaluate_model(model, X_test, y_test, review_precision)
+    timings["evaluate"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    save_model(model, vectorizer, output_dir, vectorizer_type)
+    timings["save"] = time.perf_counter() - started
+
+    print("\nStage timings:")
+    for stage, seconds in timings.items():
+        print(f"  {stage:<11}{seconds:>9.2f}s")
+    print(f"Peak memory: {_peak_memory_mb():.1f} MB")
+    return timings
+
+
+def train_model(dataset_path: str, output_dir: str = "models", vectorizer_type: str = "tfidf",
+                review_precision: float = 0.95):
+    """
+    Train the expense categorization model
+
+    Args:
+        dataset_path: Path to CSV file with columns: description, category
+        output_dir: Directory to save trained model and vectorizer
+        vectorizer_type: "tfidf" (default) or "hashing" for a model that
+            supports incremental updates
+        review_precision: Target precision used to calibrate the review threshold
+    """
+    if vectorizer_type not in VECTORIZER_TYPES:
+        raise ValueError(f"Vectorizer type must be one of {VECTORIZER_TYPES}")
+
+    # Create output directory if it doesn't exist
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    # Load dataset
+    print(f"Loading dataset from {dataset_path}...")
+    df = pd.read_csv(dataset_path)
+
+    if 'description' not in df.columns or 'category' not in df.columns:
+        raise ValueError("Dataset must have 'description' and 'category' columns")
+
+    # Normalize descriptions exactly as the API does, then split
+    X = np.array(preprocess_many(df['description'].astype(str)), dtype=object)
+    y = df['category'].values
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    print(f"Training set size: {len(X_train)}")
+    print(f"Test set size: {len(X_test)}")
+    print(f"Categories: {set(y)}\n")
+
+    # Feature extraction
+    print(f"Extracting {'hashed' if vectorizer_type == 'hashing' else 'TF-IDF'} features...")
+    vectorizer = build_vectorizer(vectorizer_type)
+    X_train_tfidf = vectorizer.fit_transform(X_train)
+    X_test_tfidf = vectorizer.transform(X_test)
+
+    # Train model
+    model = build_classifier(vectorizer_type)
+    print(f"Training {type(model).__name__} model...")
+    model.fit(X_train_tfidf, y_train)
+
+    # Evaluate
+    evaluate_model(model, X_test_tfidf, y_test, review_precision)
+
+    # Save model and vectorizer
+    save_model(model, vectorizer, output_dir, vectorizer_type)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Train expense categorization model")
@@ -106,6 +372,36 @@ if __name__ == "__main__":
         default="models",
         help="Output directory for model and vectorizer"
     )
+    parser.add_argument(
+        "--vectorizer",
+        type=str,
+        choices=VECTORIZER_TYPES,
+        default="tfidf",
+        help="Feature extractor; 'hashing' enables incremental updates from corrections"
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the CSV in chunks of this many rows instead of loading it at once"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parallel feature-extraction workers for streaming mode (-1 for all cores)"
+    )
+
+    parser.add_argument(
+        "--review-precision",
+        type=float,
+        default=0.95,
+        help="Precision that auto-accepted predictions must reach when calibrating the review threshold"
+    )
 
     args = parser.parse_args()
-    train_model(args.dataset, args.output)
+    if args.chunksize or args.jobs != 1:
+        train_model_streaming(args.dataset, args.output, args.vectorizer, args.jobs, args.chunksize or 100_000,
+                              args.review_precision)
+    else:
+        train_model(args.dataset, args.output, args.vectorizer, args.review_precision)
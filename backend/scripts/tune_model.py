@@ -0,0 +1,259 @@
+"""
+Hyperparameter search trading categorization accuracy against latency
+
+Candidates are fitted on a training split and compared, by successive
+halving and on the Pareto front, on a separate validation split. The test
+split is only used to report the accuracy of the models on the final
+front, so the reported figures are not inflated by the selection.
+"""
+import argparse
+import itertools
+import json
+import math
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Memory, Parallel, delayed
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from train_model import build_classifier, build_vectorizer
+
+from app.services.preprocessing import preprocess_many
+
+
+DEFAULT_VECTORIZER_GRID = {
+    "max_features": [2000, 5000, 20000],
+    "ngram_range": [(1, 1), (1, 2)],
+    "min_df": [1, 2],
+    "sublinear_tf": [False, True],
+}
+
+DEFAULT_CLASSIFIER_GRID = {
+    "C": [0.3, 1.0, 3.0, 10.0],
+}
+
+
+def expand_grid(grid: dict) -> list:
+    """All combinations of a {param: [values]} grid, as a list of dicts"""
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def _fit_features(vectorizer_params: dict, X_train, X_val):
+    """Fit one vectorizer configuration; cached on disk by joblib.Memory"""
+    vectorizer = build_vectorizer("tfidf", **vectorizer_params)
+    return vectorizer, vectorizer.fit_transform(X_train), vectorizer.transform(X_val)
+
+
+def _scores(y_true, y_pred) -> dict:
+    return {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "f1": f1_score(y_true, y_pred, average='weighted', zero_division=0),
+    }
+
+
+def _fit_classifier(classifier_params: dict, X_train, y_train, X_val, y_val):
+    model = build_classifier("tfidf", **classifier_params)
+    started = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+    return model, dict(_scores(y_val, model.predict(X_val)), fit_seconds=fit_seconds)
+
+
+def score_on_test(front: list, X_test, y_test):
+    """Add ``test_accuracy`` and ``test_f1`` to the fitted candidates of the final front"""
+    for result in front:
+        scores = _scores(y_test, result["model_obj"].predict(result["vectorizer_obj"].transform(X_test)))
+        result["test_accuracy"], result["test_f1"] = scores["accuracy"], scores["f1"]
+
+
+def measure_latency(vectorizer, model, descriptions, repeats: int = 3) -> dict:
+    """
+    Per-row inference latency in microseconds
+
+    "single_us" is the median time to categorize one description the way
+    the API does (transform plus predict_proba); "batch_us" is the time per
+    row when all descriptions are scored in one call.
+    """
+    singles = []
+    for description in descriptions:
+        started = time.perf_counter()
+        model.predict_proba(vectorizer.transform([description]))
+        singles.append(time.perf_counter() - started)
+
+    batch = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model.predict_proba(vectorizer.transform(descriptions))
+        batch.append((time.perf_counter() - started) / len(descriptions))
+
+    return {
+        "single_us": float(np.median(singles)) * 1e6,
+        "batch_us": float(min(batch)) * 1e6,
+    }
+
+
+def pareto_front(results: list) -> list:
+    """Candidates not beaten on both accuracy (higher) and single-row latency (lower)"""
+    front = []
+    for candidate in sorted(results, key=lambda r: (r["single_us"], -r["accuracy"])):
+        if not front or candidate["accuracy"] > front[-1]["accuracy"]:
+            front.append(candidate)
+    return front
+
+
+def _evaluate(candidates, X_train, y_train, X_val, y_val, fit_features, jobs):
+    """Fit candidates and score them on the validation split, fitting each vectorizer configuration once"""
+    results = []
+    by_vectorizer = {}
+    for candidate in candidates:
+        key = json.dumps(candidate["vectorizer"], sort_keys=True)
+        by_vectorizer.setdefault(key, []).append(candidate)
+
+    for group in by_vectorizer.values():
+        vectorizer, Xtr, Xval = fit_features(group[0]["vectorizer"], X_train, X_val)
+        fitted = Parallel(n_jobs=jobs)(
+            delayed(_fit_classifier)(candidate["classifier"], Xtr, y_train, Xval, y_val)
+            for candidate in group
+        )
+        for candidate, (model, scores) in zip(group, fitted):
+            results.append(dict(candidate, vectorizer_obj=vectorizer, model_obj=model, **scores))
+    return results
+
+
+def load_grid(path: str = None) -> tuple:
+    """
+    Vectorizer and classifier grids, optionally overridden from a JSON file
+
+    The file holds ``{"vectorizer": {...}, "classifier": {...}}``; list
+    values for ``ngram_range`` are converted to tuples.
+    """
+    vectorizer_grid, classifier_grid = dict(DEFAULT_VECTORIZER_GRID), dict(DEFAULT_CLASSIFIER_GRID)
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        vectorizer_grid.update(overrides.get("vectorizer", {}))
+        classifier_grid.update(overrides.get("classifier", {}))
+    if "ngram_range" in vectorizer_grid:
+        vectorizer_grid["ngram_range"] = [tuple(value) for value in vectorizer_grid["ngram_range"]]
+    return vectorizer_grid, classifier_grid
+
+
+def tune(dataset_path: str, search: str = "grid", jobs: int = 1, cache_dir: str = ".tune_cache",
+         min_accuracy: float = 0.0, latency_rows: int = 200, factor: int = 3, output: str = None,
+         grid_path: str = None):
+    """
+    Search vectorizer and classifier settings and print a Pareto table
+
+    Args:
+        dataset_path: Path to CSV file with columns: description, category
+        search: "grid" (every candidate on all data) or "halving"
+            (successive halving over training-set size)
+        jobs: Parallel classifier fits per vectorizer configuration
+        cache_dir: joblib.Memory directory for fitted vectorizer stages
+        min_accuracy: Validation accuracy bar for picking the recommended model
+        latency_rows: Validation descriptions used to measure latency
+        factor: Halving factor (candidates kept per round = 1/factor)
+        output: Optional path for the full results as JSON
+        grid_path: Optional JSON file overriding the default grids
+    """
+    df = pd.read_csv(dataset_path)
+    X = np.array(preprocess_many(df['description'].astype(str)), dtype=object)
+    y = df['category'].values
+    # 60/20/20 train/validation/test; selection never sees the test split
+    X_rest, X_test, y_rest, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_rest, y_rest, test_size=0.25, random_state=42, stratify=y_rest
+    )
+
+    fit_features = Memory(cache_dir, verbose=0).cache(_fit_features)
+    vectorizer_grid, classifier_grid = load_grid(grid_path)
+    candidates = [
+        {"vectorizer": vectorizer_params, "classifier": classifier_params}
+        for vectorizer_params in expand_grid(vectorizer_grid)
+        for classifier_params in expand_grid(classifier_grid)
+    ]
+    print(f"Evaluating {len(candidates)} candidates with {search} search...")
+
+    started = time.perf_counter()
+    if search == "halving":
+        rounds = max(1, math.ceil(math.log(len(candidates), factor)))
+        for round_index in range(rounds + 1):
+            n_samples = min(len(X_train), max(len(X_train) // factor ** (rounds - round_index), 50))
+            results = _evaluate(
+                candidates, X_train[:n_samples], y_train[:n_samples], X_val, y_val, fit_features, jobs
+            )
+            print(f"  round {round_index}: {len(candidates)} candidates on {n_samples} rows")
+            if n_samples == len(X_train) or len(candidates) == 1:
+                break
+            results.sort(key=lambda r: -r["accuracy"])
+            candidates = [
+                {"vectorizer": r["vectorizer"], "classifier": r["classifier"]}
+                for r in results[:max(1, math.ceil(len(results) / factor))]
+            ]
+    else:
+        results = _evaluate(candidates, X_train, y_train, X_val, y_val, fit_features, jobs)
+    search_seconds = time.perf_counter() - started
+
+    # Latency is measured serially so candidates do not compete for cores
+    sample = list(X_val[:latency_rows])
+    for result in results:
+        result.update(measure_latency(result["vectorizer_obj"], result["model_obj"], sample))
+        result["size_bytes"] = len(pickle.dumps((result["vectorizer_obj"], result["model_obj"])))
+
+    front = pareto_front(results)
+    score_on_test(front, X_test, y_test)
+    for result in results:
+        del result["vectorizer_obj"], result["model_obj"]
+
+    print(f"\nSearch took {search_seconds:.1f}s. Pareto front (validation accuracy vs single-row latency),"
+          f" with held-out test scores:\n")
+    print(f"{'val acc':>9}{'test acc':>10}{'test f1':>9}{'single us':>11}{'batch us':>10}{'size KB':>9}  params")
+    for result in front:
+        params = dict(result["vectorizer"], **result["classifier"])
+        print(
+            f"{result['accuracy']:>9.4f}{result['test_accuracy']:>10.4f}{result['test_f1']:>9.4f}"
+            f"{result['single_us']:>11.1f}{result['batch_us']:>10.2f}{result['size_bytes'] / 1024:>9.1f}  {params}"
+        )
+
+    eligible = [r for r in front if r["accuracy"] >= min_accuracy]
+    if eligible:
+        best = eligible[0]
+        print(f"\nFastest model with validation accuracy >= {min_accuracy}: "
+              f"{dict(best['vectorizer'], **best['classifier'])} (test accuracy {best['test_accuracy']:.4f})")
+    else:
+        print(f"\nNo candidate reached accuracy {min_accuracy}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({"results": results, "pareto": front}, f, indent=2, default=list)
+        print(f"Results written to {output}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the categorizer for accuracy vs latency")
+    parser.add_argument("--dataset", type=str, required=True, help="Path to training dataset CSV file")
+    parser.add_argument("--search", type=str, choices=("grid", "halving"), default="grid",
+                        help="Search strategy")
+    parser.add_argument("--jobs", type=int, default=1, help="Parallel fits (-1 for all cores)")
+    parser.add_argument("--cache-dir", type=str, default=".tune_cache",
+                        help="Cache directory for fitted vectorizers")
+    parser.add_argument("--min-accuracy", type=float, default=0.0,
+                        help="Validation accuracy bar for the recommended model")
+    parser.add_argument("--latency-rows", type=int, default=200, help="Rows used to measure latency")
+    parser.add_argument("--grid", type=str, default=None, help="JSON file overriding the search grid")
+    parser.add_argument("--output", type=str, default=None, help="Write all results to this JSON file")
+
+    args = parser.parse_args()
+    tune(args.dataset, args.search, args.jobs, args.cache_dir, args.min_accuracy,
+         args.latency_rows, output=args.output, grid_path=args.grid)
@@ -12,5 +12,6 @@ def calculate_confusion_matrix(y_true, y_pred):
     return matrix
 
 def handle_ambiguous_description(description):
-    # Placeholder for handling ambiguous transaction descriptions
-    return description.strip()  # Example: just stripping whitespace for now
\ No newline at end of file
+    # Reduce a raw bank description to its merchant words, as training and serving do
+    from ..preprocessing.processor import preprocess
+    return preprocess(description)
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+Shared fixtures for tests that need a small trained categorization service
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from app.services.categorization import CategorizationService, LoadedModel
+
+
+TRAINING_DATA = [
+    ("Starbucks Coffee", "Food"),
+    ("Whole Foods Market", "Food"),
+    ("Pizza Hut", "Food"),
+    ("Uber Ride", "Transport"),
+    ("Lyft Ride", "Transport"),
+    ("Shell Gas Station", "Transport"),
+    ("Electric Bill", "Bills"),
+    ("Water Bill", "Bills"),
+    ("Internet Bill", "Bills"),
+]
+
+
+def build_service(training_data=TRAINING_DATA, version: str = "test", **kwargs) -> CategorizationService:
+    """
+    A service with a TF-IDF + logistic regression model trained on ``training_data``
+
+    Args:
+        training_data: (description, category) pairs
+        version: Version of the activated model
+        **kwargs: Passed to CategorizationService
+    """
+    descriptions, categories = zip(*training_data)
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression(max_iter=1000)
+    model.fit(vectorizer.fit_transform(descriptions), categories)
+
+    service = CategorizationService(model_path="missing.pkl", vectorizer_path="missing.pkl", **kwargs)
+    service.activate(LoadedModel(version, model=model, vectorizer=vectorizer))
+    return service
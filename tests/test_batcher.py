@@ -0,0 +1,47 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.batcher import MicroBatcher
+
+
+class RecordingExecutor:
+
+    def __init__(self):
+        self.batches = []
+
+    async def batch_predict(self, descriptions, wait=False):
+        self.batches.append(list(descriptions))
+        return [(description.upper(), 1.0) for description in descriptions]
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def test_concurrent_requests_are_coalesced(self):
+        executor = RecordingExecutor()
+        batcher = MicroBatcher(executor, max_batch_size=4, max_wait_ms=20)
+
+        async def scenario():
+            return await asyncio.gather(*(batcher.predict(f"d{i}") for i in range(10)))
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results, [(f"D{i}", 1.0) for i in range(10)])
+        self.assertEqual([len(batch) for batch in executor.batches], [4, 4, 2])
+
+        stats = batcher.stats()
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual(stats["items"], 10)
+        self.assertEqual(stats["batch_size_counts"]["4"], 2)
+
+    def test_lone_request_flushes_after_max_wait(self):
+        executor = RecordingExecutor()
+        batcher = MicroBatcher(executor, max_batch_size=64, max_wait_ms=1)
+        self.assertEqual(asyncio.run(batcher.predict("solo")), ("SOLO", 1.0))
+        self.assertEqual(executor.batches, [["solo"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
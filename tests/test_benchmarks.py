@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from benchmarks.compare import compare
+from benchmarks.synthetic import CATEGORIES, generate_transactions, write_dataset
+
+
+class TestSyntheticGenerator(unittest.TestCase):
+
+    def test_same_seed_same_rows(self):
+        self.assertEqual(list(generate_transactions(200, seed=7)), list(generate_transactions(200, seed=7)))
+        self.assertNotEqual(list(generate_transactions(200, seed=7)), list(generate_transactions(200, seed=8)))
+
+    def test_rows_have_known_categories(self):
+        rows = list(generate_transactions(500))
+        self.assertEqual(len(rows), 500)
+        self.assertTrue(all(category in CATEGORIES for _, category in rows))
+        self.assertTrue(all(description.strip() for description, _ in rows))
+
+    def test_write_dataset(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_dataset(os.path.join(tmp, "synthetic.csv"), 100)
+            with open(path) as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[0], "description,category")
+        self.assertEqual(len(lines), 101)
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_regressions_respect_metric_direction(self):
+        baseline = {"meta": {"rows": 10}, "predict": {"median_s": 1.0}, "batch": {"rows_per_second": 100.0}}
+        candidate = {"meta": {"rows": 10}, "predict": {"median_s": 1.5}, "batch": {"rows_per_second": 150.0}}
+        rows = {path: (change, regressed) for path, _, _, change, regressed in compare(baseline, candidate)}
+
+        self.assertTrue(rows["predict.median_s"][1])
+        self.assertAlmostEqual(rows["predict.median_s"][0], -0.5)
+        self.assertFalse(rows["batch.rows_per_second"][1])
+        self.assertNotIn("meta.rows", rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
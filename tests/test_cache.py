@@ -0,0 +1,37 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.cache import PredictionCache
+
+
+class TestPredictionCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = PredictionCache(max_size=2)
+        cache.put("a", ("Food", 0.9))
+        cache.put("b", ("Bills", 0.8))
+        cache.get("a")
+        cache.put("c", ("Transport", 0.7))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ("Food", 0.9))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = PredictionCache(max_size=10, ttl_seconds=0.01)
+        cache.put("a", ("Food", 0.9))
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+
+    def test_disabled_cache(self):
+        cache = PredictionCache(max_size=0)
+        cache.put("a", ("Food", 0.9))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+
+from app.services.categorization import CategorizationService, LoadedModel, calibrate_review_threshold, top_k
+from tests.helpers import build_service
+
+
+class TestCategorizationService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = build_service(batch_chunk_size=2)
+
+    def test_batch_matches_single_predictions(self):
+        descriptions = ["Starbucks", "Uber trip", "Electric company bill", "Lyft", "Pizza"]
+        batch = self.service.batch_predict(descriptions)
+        self.assertEqual(len(batch), len(descriptions))
+        for description, (category, confidence) in zip(descriptions, batch):
+            expected_category, expected_confidence = self.service.predict(description)
+            self.assertEqual(category, expected_category)
+            self.assertAlmostEqual(confidence, expected_confidence, places=10)
+
+    def test_bad_row_is_isolated(self):
+        batch = self.service.batch_predict(["Uber Ride", None, "Water Bill"])
+        self.assertEqual(batch[0][0], "Transport")
+        self.assertEqual(batch[1], ("Other", 0.0))
+        self.assertEqual(batch[2][0], "Bills")
+
+    def test_repeated_descriptions_hit_cache(self):
+        first = self.service.predict("Uber Ride")
+        self.assertEqual(self.service.predict("  uber   RIDE "), first)
+        self.assertEqual(self.service.batch_predict(["UBER RIDE"]), [first])
+        self.assertEqual(self.service.cache.hits, 2)
+
+    def test_cache_is_keyed_on_model_version(self):
+        self.service.predict("Uber Ride")
+        active = self.service.active
+        self.service.cache.put(self.service.cache_key("Lyft Ride"), ("Food", 1.0))
+        self.service.activate(LoadedModel("retrained", model=active.model, vectorizer=active.vectorizer))
+        self.service.predict("Uber Ride")
+        self.assertEqual(self.service.cache.hits, 0)
+        self.assertEqual(self.service.predict("Lyft Ride")[0], "Transport")
+
+    def test_unloaded_service_returns_other(self):
+        service = CategorizationService(model_path="missing.pkl", vectorizer_path="missing.pkl")
+        self.assertEqual(service.batch_predict(["a", "b"]), [("Other", 0.0), ("Other", 0.0)])
+
+    def test_top_k_is_ranked_and_consistent_with_predict(self):
+        ranked = self.service.predict_top_k("Uber trip", k=3)
+        self.assertEqual(len(ranked), 3)
+        self.assertEqual([c for c, _ in ranked][0], self.service.predict("Uber trip")[0])
+        probabilities = [p for _, p in ranked]
+        self.assertEqual(probabilities, sorted(probabilities, reverse=True))
+        self.assertAlmostEqual(sum(probabilities), 1.0, places=6)
+
+    def test_batch_top_k_matches_single(self):
+        descriptions = ["Starbucks", "Uber trip", None, "Water Bill"]
+        batch = self.service.batch_predict_top_k(descriptions, k=2)
+        self.assertEqual(batch[2], [("Other", 0.0)])
+        for description, ranked in zip(descriptions, batch):
+            if description is None:
+                continue
+            single = self.service.predict_top_k(description, k=2)
+            self.assertEqual([c for c, _ in ranked], [c for c, _ in single])
+            for (_, p), (_, q) in zip(ranked, single):
+                self.assertAlmostEqual(p, q, places=10)
+
+    def test_near_duplicates_are_scored_once(self):
+        descriptions = ["UBER *TRIP QXZKT", "Uber Trip ABCDE", "Trip uber", "Water Bill 0412", "WATER BILL"]
+        ranked, report = self.service.batch_predict_report(descriptions, k=2)
+
+        self.assertEqual(report["rows"], 5)
+        self.assertEqual(report["scored"], 5)
+        self.assertEqual(report["groups"], 2)
+        self.assertAlmostEqual(report["dedup_ratio"], 2.5)
+        self.assertEqual(ranked[0], ranked[1])
+        self.assertEqual(ranked[0], ranked[2])
+        self.assertEqual(ranked[3], ranked[4])
+
+        # Members are cached under their own text, so a repeat is answered without the model
+        self.assertEqual(self.service.batch_predict_report(descriptions)[1]["answered"], 5)
+
+        # Grouping is lossless: every row matches its own prediction
+        for description, candidates in zip(descriptions, ranked):
+            single = self.service.predict_top_k(description, k=2)
+            self.assertEqual([c for c, _ in candidates], [c for c, _ in single])
+            for (_, p), (_, q) in zip(candidates, single):
+                self.assertAlmostEqual(p, q, places=10)
+
+    def test_batch_arrays_match_batch_predict(self):
+        descriptions = ["Starbucks", "Uber trip", None, "Water Bill", "UBER TRIP QXZKT"]
+        labels, indices, confidences, version = self.service.batch_predict_arrays(descriptions)
+
+        self.assertEqual(version, "test")
+        self.assertEqual(indices.dtype, np.int32)
+        self.assertEqual(len(indices), len(descriptions))
+        expected = self.service.batch_predict(descriptions)
+        for i, (category, confidence) in enumerate(expected):
+            self.assertEqual(labels[indices[i]], category)
+            self.assertAlmostEqual(confidences[i], confidence, places=10)
+
+    def test_needs_review(self):
+        service = build_service(review_threshold=0.6)
+        self.assertTrue(service.needs_review(0.5))
+        self.assertFalse(service.needs_review(0.7))
+        self.assertFalse(service.needs_review(0.5, threshold=0.4))
+
+
+class TestScoringHelpers(unittest.TestCase):
+
+    def test_top_k(self):
+        classes = np.array(["a", "b", "c", "d"], dtype=object)
+        probabilities = np.array([[0.1, 0.4, 0.2, 0.3], [0.7, 0.15, 0.1, 0.05]])
+        self.assertEqual(top_k(classes, probabilities, 2), [[("b", 0.4), ("d", 0.3)], [("a", 0.7), ("b", 0.15)]])
+        self.assertEqual(len(top_k(classes, probabilities, 10)[0]), 4)
+
+    def test_calibrate_review_threshold(self):
+        confidences = [0.95, 0.9, 0.8, 0.7, 0.6, 0.5]
+        correct = [True, True, True, False, True, False]
+        self.assertEqual(calibrate_review_threshold(confidences, correct, 1.0), 0.8)
+        self.assertEqual(calibrate_review_threshold(confidences, correct, 0.8), 0.6)
+        self.assertEqual(calibrate_review_threshold([0.9], [False], 0.9), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
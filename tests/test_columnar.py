@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet
+
+from app.services.columnar import categorize_file, detect_columnar_format, find_description_column
+from tests.helpers import build_service
+
+
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.service = build_service()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.table = pa.table({
+            "Memo": ["UBER *TRIP 8H3K2", "Water Bill 04/12", None, "Starbucks #1234"],
+            "amount": [12.5, 40.0, 3.0, 4.75],
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_detect_format_and_column(self):
+        self.assertEqual(detect_columnar_format("history.PARQUET"), "parquet")
+        self.assertEqual(detect_columnar_format("history.feather"), "arrow")
+        self.assertIsNone(detect_columnar_format("history.csv"))
+        self.assertEqual(find_description_column(["date", "Memo", "amount"]), "Memo")
+        with self.assertRaises(ValueError):
+            find_description_column(["date", "amount"])
+
+    def test_parquet_roundtrip_appends_prediction_columns(self):
+        pa.parquet.write_table(self.table, self.path("in.parquet"))
+        stats = categorize_file(self.service, self.path("in.parquet"), self.path("out.parquet"), batch_rows=3)
+
+        self.assertEqual(stats["rows"], 4)
+        self.assertEqual(stats["batches"], 2)
+        self.assertEqual(stats["column"], "Memo")
+        result = pa.parquet.read_table(self.path("out.parquet"))
+        self.assertEqual(result.column_names, ["Memo", "amount", "predicted_category", "confidence", "model_version"])
+        self.assertEqual(result.column("amount").to_pylist(), [12.5, 40.0, 3.0, 4.75])
+        self.assertEqual(result.column("model_version").to_pylist(), ["test"] * 4)
+
+        expected = self.service.batch_predict(self.table.column("Memo").to_pylist())
+        self.assertEqual(result.column("predicted_category").to_pylist(), [c for c, _ in expected])
+        for got, (_, confidence) in zip(result.column("confidence").to_pylist(), expected):
+            self.assertAlmostEqual(got, confidence, places=5)
+
+    def test_arrow_stream_to_arrow_file(self):
+        with pa.ipc.new_stream(self.path("in.arrow"), self.table.schema) as writer:
+            writer.write_table(self.table, max_chunksize=2)
+        stats = categorize_file(self.service, self.path("in.arrow"), self.path("out.arrow"))
+
+        self.assertEqual(stats["batches"], 2)
+        with pa.memory_map(self.path("out.arrow")) as source:
+            result = pa.ipc.open_file(source).read_all()
+        self.assertEqual(result.num_rows, 4)
+        self.assertEqual(result.column("predicted_category").to_pylist()[2], "Other")
+
+        # Categorizing an output again replaces the prediction columns
+        categorize_file(self.service, self.path("out.arrow"), self.path("again.parquet"))
+        again = pa.parquet.read_table(self.path("again.parquet"))
+        self.assertEqual(again.column_names, result.column_names)
+
+    def test_missing_column(self):
+        pa.parquet.write_table(self.table, self.path("in.parquet"))
+        with self.assertRaises(ValueError):
+            categorize_file(self.service, self.path("in.parquet"), self.path("out.parquet"), column="description")
+
+
+if __name__ == "__main__":
+    unittest.main()
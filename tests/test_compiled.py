@@ -0,0 +1,110 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+from app.services.artifacts import export_artifacts, load_artifacts
+from app.services.compiled import CompiledLinearModel
+
+
+DESCRIPTIONS = [
+    "Starbucks Coffee", "Whole Foods Market", "Pizza Hut delivery", "Starbucks latte",
+    "Uber Ride", "Lyft Ride downtown", "Shell Gas Station", "Uber Eats",
+    "Electric Bill", "Water Bill payment", "Internet Bill", "Electric company",
+    "Amazon Purchase", "Target store", "Amazon Prime", "Best Buy electronics",
+]
+CATEGORIES = ["Food"] * 4 + ["Transport"] * 4 + ["Bills"] * 4 + ["Shopping"] * 4
+
+QUERIES = [
+    "Starbucks", "UBER RIDE 8H3K2", "electric bill for october", "Café Amazon",
+    "unknown merchant", "", "bill bill bill", "Lyft ride to the airport",
+]
+
+
+def assert_parity(testcase, vectorizer, model, descriptions, categories):
+    X = vectorizer.fit_transform(descriptions)
+    model.fit(X, categories)
+    compiled = CompiledLinearModel.from_sklearn(vectorizer, model)
+
+    expected = model.predict_proba(vectorizer.transform(QUERIES))
+    np.testing.assert_allclose(compiled.predict_proba(QUERIES), expected, rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(
+        compiled.transform(QUERIES).toarray(), vectorizer.transform(QUERIES).toarray(), rtol=1e-12
+    )
+
+    labels = model.predict(vectorizer.transform(QUERIES))
+    for query, label, row in zip(QUERIES, labels, expected):
+        category, confidence = compiled.predict_one(query)
+        testcase.assertEqual(category, label)
+        testcase.assertAlmostEqual(confidence, row.max(), places=12)
+
+
+class TestCompiledLinearModel(unittest.TestCase):
+
+    def test_parity_with_training_configuration(self):
+        vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), max_df=0.8)
+        model = LogisticRegression(max_iter=1000, random_state=42)
+        assert_parity(self, vectorizer, model, DESCRIPTIONS, CATEGORIES)
+
+    def test_parity_with_ovr_and_sublinear_tf(self):
+        vectorizer = TfidfVectorizer(sublinear_tf=True, norm='l1', strip_accents='unicode')
+        model = SGDClassifier(loss='log_loss', random_state=42)
+        assert_parity(self, vectorizer, model, DESCRIPTIONS, CATEGORIES)
+
+    def test_parity_with_binary_liblinear(self):
+        vectorizer = TfidfVectorizer()
+        model = LogisticRegression(max_iter=1000, solver='liblinear')
+        categories = ["Bills" if category == "Bills" else "Other" for category in CATEGORIES]
+        assert_parity(self, vectorizer, model, DESCRIPTIONS, categories)
+
+    def test_parity_with_binary_classes(self):
+        vectorizer = TfidfVectorizer(ngram_range=(1, 3))
+        model = LogisticRegression(max_iter=1000)
+        categories = ["Food" if category == "Food" else "Other" for category in CATEGORIES]
+        assert_parity(self, vectorizer, model, DESCRIPTIONS, categories)
+
+    def test_rejects_unsupported_analyzer(self):
+        vectorizer = TfidfVectorizer(analyzer='char_wb')
+        model = LogisticRegression(max_iter=1000)
+        model.fit(vectorizer.fit_transform(DESCRIPTIONS), CATEGORIES)
+        with self.assertRaises(ValueError):
+            CompiledLinearModel.from_sklearn(vectorizer, model)
+
+    def test_rejects_models_with_other_probabilities(self):
+        vectorizer = TfidfVectorizer()
+        X = vectorizer.fit_transform(DESCRIPTIONS)
+        for model in (SGDClassifier(loss='modified_huber', random_state=42), SGDClassifier(random_state=42)):
+            model.fit(X, CATEGORIES)
+            with self.assertRaises(ValueError):
+                CompiledLinearModel.from_sklearn(vectorizer, model)
+
+
+class TestModelArtifacts(unittest.TestCase):
+
+    def test_export_and_mmap_load_round_trip(self):
+        vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2))
+        model = LogisticRegression(max_iter=1000)
+        model.fit(vectorizer.fit_transform(DESCRIPTIONS), CATEGORIES)
+        compiled = CompiledLinearModel.from_sklearn(vectorizer, model)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            version_dir = export_artifacts(compiled, tmp)
+            self.assertEqual(export_artifacts(compiled, tmp), version_dir)
+
+            loaded, manifest = load_artifacts(tmp, mmap=True)
+            self.assertEqual(manifest["model_version"], version_dir.name)
+            self.assertIsInstance(loaded.coef_t, np.memmap)
+            np.testing.assert_array_equal(loaded.predict_proba(QUERIES), compiled.predict_proba(QUERIES))
+            self.assertEqual(list(loaded.classes_), list(model.classes_))
+            del loaded
+
+
+if __name__ == '__main__':
+    unittest.main()
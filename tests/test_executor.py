@@ -0,0 +1,60 @@
+import asyncio
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.executor import ExecutorSaturated, InferenceExecutor
+
+
+class BlockingService:
+    """Service whose predict blocks until released"""
+
+    model_path = vectorizer_path = None
+    batch_chunk_size = 1
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def predict(self, description):
+        self.release.wait(5)
+        return "Food", 0.9
+
+
+class TestInferenceExecutor(unittest.TestCase):
+
+    def test_rejects_when_saturated(self):
+        service = BlockingService()
+        executor = InferenceExecutor(service, workers=1, queue_size=1, mode="thread")
+
+        async def scenario():
+            first = asyncio.ensure_future(executor.predict("a"))
+            second = asyncio.ensure_future(executor.predict("b"))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(ExecutorSaturated):
+                await executor.predict("c")
+            self.assertEqual(executor.stats()["rejected"], 1)
+            service.release.set()
+            return await asyncio.gather(first, second)
+
+        try:
+            results = asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+        self.assertEqual(results, [("Food", 0.9), ("Food", 0.9)])
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            InferenceExecutor(BlockingService(), mode="fiber")
+
+    def test_process_mode_refuses_merchant_index(self):
+        service = BlockingService()
+        service.merchant_index = object()
+        with self.assertRaises(ValueError):
+            InferenceExecutor(service, mode="process")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import io
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.importer import ImportPipeline, detect_format
+
+
+class FakeUpload:
+    """Minimal stand-in for UploadFile that serves small blocks"""
+
+    def __init__(self, data: bytes):
+        self._buffer = io.BytesIO(data)
+
+    async def read(self, size=-1):
+        return self._buffer.read(min(size, 7) if size and size > 0 else size)
+
+
+class FakeService:
+
+    def __init__(self):
+        self.calls = []
+
+    def batch_predict(self, descriptions):
+        self.calls.append(len(descriptions))
+        return [("Food", 0.9) if "coffee" in d.lower() else ("Other", 0.2) for d in descriptions]
+
+
+class TestImportPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.service = FakeService()
+        self.pipeline = ImportPipeline(self.service, chunk_rows=2)
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("statement.CSV"), "csv")
+        self.assertEqual(detect_format("statement.qfx"), "ofx")
+        self.assertIsNone(detect_format("statement.pdf"))
+
+    def test_csv_import_in_chunks(self):
+        data = (
+            'Date,Description,Amount\n'
+            '10/01,Starbucks Coffee,-4.50\n'
+            '10/02,"Uber, ride\nto airport",-23.00\n'
+            '10/03,Blue Bottle Coffee,"-1,200.00"\n'
+        ).encode()
+        stats = asyncio.run(self.pipeline.run(FakeUpload(data), "csv"))
+        self.assertEqual(stats["processed"], 3)
+        self.assertEqual(stats["categorized"], 2)
+        self.assertEqual(stats["uncategorized"], 1)
+        self.assertEqual(self.service.calls, [2, 1])
+
+    def test_csv_without_description_column(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(self.pipeline.run(FakeUpload(b"a,b\n1,2\n"), "csv"))
+
+    def test_ofx_import(self):
+        data = (
+            b"OFXHEADER:100\n<OFX><BANKTRANLIST>"
+            b"<STMTTRN><TRNAMT>-4.50<NAME>STARBUCKS COFFEE</STMTTRN>"
+            b"<STMTTRN><TRNAMT>-12.00<NAME>UBER<MEMO>TRIP</STMTTRN>"
+            b"</BANKTRANLIST></OFX>"
+        )
+
+        async def collect():
+            rows = []
+            async for row in self.pipeline.iter_ofx_rows(FakeUpload(data)):
+                rows.append(row)
+            return rows
+
+        rows = asyncio.run(collect())
+        self.assertEqual([row["description"] for row in rows], ["STARBUCKS COFFEE", "UBER TRIP"])
+        self.assertEqual(rows[0]["amount"], -4.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
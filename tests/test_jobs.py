@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.importer import ImportPipeline
+from app.services.jobs import JobLimitExceeded, JobQueue, JobRunner, job_status, write_batch_input
+
+
+class FakeService:
+
+    def __init__(self):
+        self.rows = 0
+
+    def batch_predict(self, descriptions):
+        self.rows += len(descriptions)
+        return [("Food", 0.9) if "coffee" in d.lower() else ("Other", 0.2) for d in descriptions]
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(
+            os.path.join(self.tmp.name, "jobs.db"), os.path.join(self.tmp.name, "spool"),
+            max_running_per_user=1, max_queued_per_user=2, lease_seconds=30
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def submit(self, descriptions, user_id=None):
+        paths = self.queue.new_job_paths("csv")
+        write_batch_input(paths["input_path"], descriptions)
+        return self.queue.submit(paths["id"], "batch", "csv", paths["input_path"], paths["result_path"], user_id)
+
+    def run_job(self, job, service, should_stop=None):
+        runner = JobRunner(self.queue, ImportPipeline(service, chunk_rows=2), should_stop=should_stop)
+        return asyncio.run(runner.run(job))
+
+    def test_claim_respects_per_user_limit(self):
+        first = self.submit(["a"], user_id=1)
+        self.submit(["b"], user_id=1)
+        other = self.submit(["c"], user_id=2)
+
+        self.assertEqual(self.queue.claim("w1")["id"], first["id"])
+        self.assertEqual(self.queue.claim("w2")["id"], other["id"])
+        self.assertIsNone(self.queue.claim("w3"))
+
+    def test_submit_limit(self):
+        self.submit(["a"], user_id=1)
+        self.submit(["b"], user_id=1)
+        with self.assertRaises(JobLimitExceeded):
+            self.submit(["c"], user_id=1)
+
+    def test_cancel_queued(self):
+        job = self.submit(["a"])
+        self.assertEqual(self.queue.cancel(job["id"])["status"], "cancelled")
+        self.assertIsNone(self.queue.claim("w1"))
+
+    def test_run_to_completion(self):
+        job = self.submit(["Coffee Shop", "Gas", "Coffee Bar", "Rent", "Books"])
+        self.assertEqual(self.run_job(self.queue.claim("w1"), FakeService()), "succeeded")
+
+        status = job_status(self.queue.get(job["id"]))
+        self.assertEqual(status["status"], "succeeded")
+        self.assertEqual((status["processed"], status["categorized"], status["uncategorized"]), (5, 2, 3))
+        self.assertEqual(status["progress"], 1.0)
+        with open(job["result_path"]) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row["description"] for row in rows], ["Coffee Shop", "Gas", "Coffee Bar", "Rent", "Books"])
+
+    def test_resume_after_interruption(self):
+        descriptions = [f"Coffee {i}" for i in range(7)]
+        job = self.submit(descriptions)
+
+        first = FakeService()
+        self.assertEqual(self.run_job(self.queue.claim("w1"), first, should_stop=lambda: True), "queued")
+        self.assertEqual(first.rows, 2)
+
+        # Simulate a crash mid-chunk: garbage past the checkpoint is discarded
+        with open(job["result_path"], "a") as f:
+            f.write('{"partial": ')
+
+        second = FakeService()
+        self.assertEqual(self.run_job(self.queue.claim("w2"), second), "succeeded")
+        self.assertEqual(second.rows, 5)
+        with open(job["result_path"]) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row["description"] for row in rows], descriptions)
+
+    def test_stale_jobs_are_requeued(self):
+        job = self.submit(["a"])
+        self.queue.claim("w1")
+        with sqlite3.connect(self.queue.path) as conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = 0 WHERE id = ?", (job["id"],))
+        self.assertEqual(self.queue.requeue_stale(), 1)
+        self.assertEqual(self.queue.claim("w2")["attempts"], 2)
+
+    def test_cancel_running_stops_at_checkpoint(self):
+        job = self.submit([f"Coffee {i}" for i in range(6)])
+        claimed = self.queue.claim("w1")
+        self.queue.cancel(job["id"])
+        self.assertEqual(self.run_job(claimed, FakeService()), "cancelled")
+        self.assertEqual(self.queue.get(job["id"])["processed"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
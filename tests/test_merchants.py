@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.merchants import AliasMatcher, MerchantIndex
+from app.services.preprocessing import preprocess
+
+
+class TestAliasMatcher(unittest.TestCase):
+
+    def test_longest_leading_alias_wins(self):
+        matcher = AliasMatcher({
+            ("uber", "trip"): "Transport",
+            ("uber", "eats"): "Food",
+            ("whole", "foods"): "Food",
+            ("a", "b"): "AB",
+            ("a", "b", "c"): "ABC",
+        })
+        self.assertEqual(matcher.match("uber trip sf".split()), "Transport")
+        self.assertEqual(matcher.match("uber eats order".split()), "Food")
+        self.assertEqual(matcher.match("whole foods mkt".split()), "Food")
+        self.assertEqual(matcher.match("a b c".split()), "ABC")
+        self.assertEqual(matcher.match("a b d".split()), "AB")
+        # Aliases only match at the start of a description
+        self.assertIsNone(matcher.match("sq uber eats order".split()))
+        self.assertIsNone(matcher.match("uber".split()))
+        self.assertIsNone(AliasMatcher({}).match(["anything"]))
+
+
+class TestMerchantIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = MerchantIndex(min_support=3, min_purity=0.9, rebuild_every=50)
+        self.index.add_many(
+            [(f"POS {i} STARBUCKS RESERVE #{1000 + i} SEATTLE WA", "Food") for i in range(5)]
+            + [("Amazon Purchase", "Shopping"), ("Amazon Web Services", "Work Supplies"), ("Amazon Books", "Shopping")]
+            + [("Electric Bill", "Bills")] * 3
+            + [("Water Bill", "Bills")]
+        )
+
+    def lookup(self, description):
+        return self.index.lookup(preprocess(description))
+
+    def test_exact_and_alias_hits(self):
+        self.assertEqual(self.lookup("Electric Bill"), ("Bills", 1.0))
+        self.assertEqual(self.lookup("SQ *STARBUCKS RESERVE 10/02 CARD 1234"), ("Food", 1.0))
+        self.assertEqual(self.index.stats()["exact_hits"], 1)
+        self.assertEqual(self.index.stats()["alias_hits"], 1)
+
+    def test_ambiguous_merchant_falls_through(self):
+        self.assertIsNone(self.lookup("Amazon Marketplace"))
+        self.assertIsNone(self.lookup("Unknown Merchant"))
+
+    def test_alias_inside_another_description_does_not_match(self):
+        self.index.add_many([("The Home Depot #123", "Shopping")] * 3)
+        self.assertEqual(self.lookup("THE HOME DEPOT #456"), ("Shopping", 1.0))
+        self.assertIsNone(self.lookup("pay the electric bill"))
+
+    def test_leading_word_alone_is_not_an_alias(self):
+        self.index.add_many([("Uber Trip", "Transport")] * 3)
+        self.assertEqual(self.lookup("UBER TRIP 10/02 SF"), ("Transport", 1.0))
+        self.assertIsNone(self.lookup("uber eats order"))
+
+    def test_single_sighting_is_not_an_exact_key(self):
+        self.assertIsNone(self.lookup("Water Bill"))
+
+    def test_corrections_need_support_before_they_apply(self):
+        self.index.rebuild_every = 3
+        self.index.add_correction("Blue Bottle #12", "Food")
+        self.assertIsNone(self.lookup("BLUE BOTTLE #99"))
+
+        self.index.add_correction("Blue Bottle Oakland", "Food")
+        self.index.add_correction("Blue Bottle SF", "Food")
+        self.assertEqual(self.lookup("blue bottle new york"), ("Food", 1.0))
+        self.assertEqual(self.index.stats()["corrections"], 3)
+
+    def test_hit_ratio(self):
+        self.lookup("Electric Bill")
+        self.lookup("Unknown Merchant")
+        self.assertAlmostEqual(self.index.hit_ratio, 0.5)
+
+    def test_load_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "train.csv")
+            with open(path, "w") as f:
+                f.write("description,category\n" + "Netflix Subscription,Entertainment\n" * 3)
+            self.assertEqual(self.index.load_csv(path), 3)
+            self.assertEqual(self.index.load_csv(os.path.join(tmp, "missing.csv")), 0)
+        self.assertEqual(self.lookup("NETFLIX SUBSCRIPTION"), ("Entertainment", 1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.metrics import REQUESTS, MetricsMiddleware, MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_counter_render(self):
+        registry = MetricsRegistry(enabled=True)
+        counter = registry.counter("test_requests_total", "Requests", ("status",))
+        counter.inc(status=200)
+        counter.inc(2, status=200)
+        counter.inc(status=500)
+
+        text = registry.render()
+        self.assertIn("# TYPE test_requests_total counter", text)
+        self.assertIn('test_requests_total{status="200"} 3', text)
+        self.assertIn('test_requests_total{status="500"} 1', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry(enabled=True)
+        histogram = registry.histogram("test_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        text = registry.render()
+        self.assertIn('test_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{le="1"} 3', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn("test_seconds_count 4", text)
+        self.assertIn("test_seconds_sum 6.05", text)
+
+    def test_gauge_function(self):
+        registry = MetricsRegistry(enabled=True)
+        values = [3]
+        registry.gauge("test_pending", "Pending").labels().set_function(lambda: values[0])
+        self.assertIn("test_pending 3", registry.render())
+        values[0] = 7
+        self.assertIn("test_pending 7", registry.render())
+
+    def test_disabled_registry_drops_observations(self):
+        registry = MetricsRegistry(enabled=False)
+        histogram = registry.histogram("test_seconds", "Latency")
+        histogram.observe(0.2)
+        self.assertEqual(histogram.labels().count, 0)
+
+    def test_duplicate_name_rejected(self):
+        registry = MetricsRegistry(enabled=True)
+        registry.counter("test_total", "Total")
+        with self.assertRaises(ValueError):
+            registry.counter("test_total", "Total")
+
+
+class TestMetricsMiddleware(unittest.TestCase):
+
+    def test_counts_requests_by_route_template(self):
+        class Route:
+            path = "/api/items/{item_id}"
+
+        async def app(scope, receive, send):
+            scope["route"] = Route()
+            self.assertIn("received_at", scope["state"])
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        middleware = MetricsMiddleware(app)
+        for item_id in (1, 2):
+            scope = {"type": "http", "method": "GET", "path": f"/api/items/{item_id}"}
+            asyncio.run(middleware(scope, None, send))
+
+        child = REQUESTS.labels(endpoint="/api/items/{item_id}", method="GET", status=404)
+        self.assertEqual(child.value, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.monitoring import ConfidenceHistogram, ConfusionCounter, ModelMonitor, RollingRate
+
+
+class TestConfusionCounter(unittest.TestCase):
+
+    def test_precision_recall_and_growth(self):
+        counter = ConfusionCounter(capacity=2)
+        pairs = [("Food", "Food"), ("Food", "Transport"), ("Transport", "Transport"), ("Bills", "Food")]
+        for actual, predicted in pairs:
+            counter.add(actual, predicted)
+
+        self.assertEqual(counter.labels, ["Food", "Transport", "Bills"])
+        self.assertEqual(counter.to_dict()["matrix"], [[1, 1, 0], [0, 1, 0], [1, 0, 0]])
+        self.assertAlmostEqual(counter.accuracy(), 0.5)
+        per_category = counter.per_category()
+        self.assertEqual(per_category["Food"], {"precision": 0.5, "recall": 0.5, "support": 2})
+        self.assertEqual(per_category["Transport"], {"precision": 0.5, "recall": 1.0, "support": 1})
+        self.assertEqual(per_category["Bills"], {"precision": 0.0, "recall": 0.0, "support": 1})
+
+
+class TestWindows(unittest.TestCase):
+
+    def test_rolling_rate_forgets_old_outcomes(self):
+        rate = RollingRate(3)
+        for outcome in (True, True, True, False, False):
+            rate.add(outcome)
+        self.assertTrue(rate.full)
+        self.assertAlmostEqual(rate.rate, 1 / 3)
+
+    def test_histogram_slides(self):
+        histogram = ConfidenceHistogram(window=2, bins=4)
+        histogram.add_many([0.1, 0.9, 1.0])
+        self.assertEqual(histogram.counts.tolist(), [0, 0, 0, 2])
+        self.assertAlmostEqual(histogram.mean, 0.875)
+
+
+class TestModelMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.monitor = ModelMonitor(
+            correction_window=10, prediction_window=100, accuracy_drop=0.1, psi_threshold=0.2, bins=10
+        )
+        self.monitor.reset("v1")
+
+    def test_accuracy_drop_raises_alert(self):
+        for _ in range(10):
+            self.monitor.record_correction("Food", "Food")
+        self.assertEqual(self.monitor.reference_accuracy, 1.0)
+        self.assertFalse(self.monitor.drift_detected)
+
+        for _ in range(3):
+            self.monitor.record_correction("Food", "Transport")
+        alerts = self.monitor.alerts()
+        self.assertEqual([alert["kind"] for alert in alerts], ["accuracy"])
+        self.assertAlmostEqual(alerts[0]["current"], 0.7)
+
+        self.monitor.record_correction(None, "Food")
+        self.assertEqual(self.monitor.confusion.total, 13)
+
+    def test_confidence_shift_raises_alert(self):
+        self.monitor.record_predictions([0.95] * 100)
+        self.assertFalse(self.monitor.drift_detected)
+        self.monitor.record_predictions([0.95] * 50)
+        self.assertFalse(self.monitor.drift_detected)
+
+        self.monitor.record_predictions([0.45] * 60)
+        alerts = self.monitor.alerts()
+        self.assertEqual([alert["kind"] for alert in alerts], ["confidence"])
+        self.assertLess(alerts[0]["current_mean"], alerts[0]["reference_mean"])
+
+    def test_reset_starts_new_reference(self):
+        self.monitor.record_predictions([0.95] * 100)
+        self.monitor.record_predictions([0.45] * 100)
+        self.assertTrue(self.monitor.drift_detected)
+
+        self.monitor.reset("v2")
+        stats = self.monitor.stats(include_matrix=True)
+        self.assertEqual(stats["model_version"], "v2")
+        self.assertFalse(stats["drift_detected"])
+        self.assertIsNone(stats["confidence_psi"])
+        self.assertEqual(stats["per_category"], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
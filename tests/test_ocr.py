@@ -0,0 +1,126 @@
+import asyncio
+import io
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from PIL import Image
+
+from app.services import ocr
+from app.services.ocr import (
+    OCREngineUnavailable, ReceiptPipeline, StubEngine, build_engine, decode_image, extract_receipt_fields,
+    process_receipt
+)
+
+
+RECEIPT = """
+WELCOME
+Whole Foods Market
+123 Main St
+Tel 555-0100
+Bananas            1.99
+Coffee            12.50
+Subtotal          14.49
+Tax                1.16
+TOTAL             15.65
+Cash              20.00
+Change             4.35
+"""
+
+
+class FakeExecutor:
+    """Categorizes on the description alone, so the tests need no model"""
+
+    async def predict(self, description, wait=False):
+        return ("Food" if "foods" in description.lower() else "Other"), 0.9
+
+    async def batch_predict(self, descriptions, wait=False):
+        return [await self.predict(description) for description in descriptions]
+
+
+class TestExtraction(unittest.TestCase):
+
+    def test_merchant_and_total(self):
+        merchant, amount = extract_receipt_fields(RECEIPT)
+        self.assertEqual(merchant, "Whole Foods Market")
+        self.assertEqual(amount, 15.65)
+
+    def test_amount_due_with_thousands(self):
+        _, amount = extract_receipt_fields("Hotel Palace\nRoom 1,204.00\nAmount Due: $1,284.30\n")
+        self.assertEqual(amount, 1284.30)
+
+    def test_largest_figure_without_total_line(self):
+        merchant, amount = extract_receipt_fields("Corner Deli\n3.50\n7.25\n")
+        self.assertEqual(merchant, "Corner Deli")
+        self.assertEqual(amount, 7.25)
+
+    def test_nothing_found(self):
+        self.assertEqual(extract_receipt_fields(""), (None, None))
+
+    def test_process_receipt_times_stages(self):
+        result = process_receipt(RECEIPT.encode(), StubEngine())
+        self.assertEqual(result["merchant"], "Whole Foods Market")
+        self.assertEqual(set(result["timings"]), {"decode", "ocr", "extract"})
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            build_engine("vision")
+
+
+class TestDecodeImage(unittest.TestCase):
+
+    def test_decompression_bomb_is_a_value_error(self):
+        buffer = io.BytesIO()
+        Image.new("L", (64, 64), 255).save(buffer, format="PNG")
+        self.assertEqual(decode_image(buffer.getvalue(), max_side=32).size, (32, 32))
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 100):
+            with self.assertRaises(ValueError):
+                decode_image(buffer.getvalue())
+
+
+def _crash_worker(data, max_side):
+    os._exit(1)
+
+
+class TestReceiptPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.pipeline = ReceiptPipeline(FakeExecutor(), engine="stub", workers=1, queue_size=2)
+
+    def tearDown(self):
+        self.pipeline.shutdown()
+
+    def test_process(self):
+        result = asyncio.run(self.pipeline.process(RECEIPT.encode()))
+        self.assertEqual(result["merchant"], "Whole Foods Market")
+        self.assertEqual(result["amount"], 15.65)
+        self.assertEqual(result["category"], "Food")
+        self.assertEqual(set(result["timings_ms"]), {"decode", "ocr", "extract", "categorize"})
+
+    def test_process_many(self):
+        images = [RECEIPT.encode(), b"Gas Station\nTotal 40.00\n", b""]
+        results = asyncio.run(self.pipeline.process_many(images))
+        self.assertEqual([r["category"] for r in results], ["Food", "Other", "Other"])
+        self.assertEqual(results[1]["amount"], 40.0)
+        self.assertEqual(self.pipeline.stats()["processed"], 3)
+
+    def test_broken_pool_is_replaced(self):
+        with mock.patch.object(ocr, "_process_in_worker", _crash_worker):
+            with self.assertRaises(OCREngineUnavailable):
+                asyncio.run(self.pipeline.process(RECEIPT.encode()))
+        self.assertIsNone(self.pipeline._pool)
+
+        result = asyncio.run(self.pipeline.process(RECEIPT.encode()))
+        self.assertEqual(result["merchant"], "Whole Foods Market")
+
+    def test_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            ReceiptPipeline(FakeExecutor(), engine="vision")
+
+
+if __name__ == "__main__":
+    unittest.main()
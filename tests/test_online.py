@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import joblib
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+from app.services.categorization import CategorizationService
+from app.services.online import OnlineLearner, supports_incremental_updates
+
+
+DESCRIPTIONS = ["Starbucks Coffee", "Pizza Hut", "Uber Ride", "Lyft Ride", "Electric Bill", "Water Bill"]
+CATEGORIES = ["Food", "Food", "Transport", "Transport", "Bills", "Bills"]
+
+
+class TestOnlineLearner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.tmp.name, "classifier.pkl")
+        self.vectorizer_path = os.path.join(self.tmp.name, "tfidf_vectorizer.pkl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_service(self, vectorizer, model):
+        model.fit(vectorizer.fit_transform(DESCRIPTIONS), CATEGORIES)
+        joblib.dump(model, self.model_path)
+        joblib.dump(vectorizer, self.vectorizer_path)
+        return CategorizationService(self.model_path, self.vectorizer_path, inference_mode="sklearn")
+
+    def test_corrections_publish_new_version(self):
+        service = self.make_service(
+            HashingVectorizer(n_features=2 ** 10, alternate_sign=False),
+            SGDClassifier(loss="log_loss", random_state=42)
+        )
+        learner = OnlineLearner(service, batch_size=3)
+        old_version = service.model_version
+
+        self.assertIsNone(learner.add("Blue Bottle", "Food"))
+        self.assertIsNone(learner.add("Blue Bottle", "Food"))
+        loaded = learner.add("Parking Meter", "Unknown Category")
+
+        self.assertIsNotNone(loaded)
+        self.assertIs(service.active, loaded)
+        self.assertNotEqual(service.model_version, old_version)
+        self.assertEqual(learner.stats()["applied_corrections"], 2)
+        self.assertEqual(learner.stats()["skipped_corrections"], 1)
+        # The published pickle reloads to the same version
+        reloaded = CategorizationService(self.model_path, self.vectorizer_path, inference_mode="sklearn")
+        self.assertEqual(reloaded.model_version, service.model_version)
+
+    def test_concurrent_updates_build_on_each_other(self):
+        service = self.make_service(
+            HashingVectorizer(n_features=2 ** 10, alternate_sign=False),
+            SGDClassifier(loss="log_loss", random_state=42)
+        )
+        learner = OnlineLearner(service)
+        samples_seen = service.active.model.t_
+        partial_fit = SGDClassifier.partial_fit
+
+        def slow_partial_fit(model, *args, **kwargs):
+            time.sleep(0.05)
+            return partial_fit(model, *args, **kwargs)
+
+        with mock.patch.object(SGDClassifier, "partial_fit", slow_partial_fit):
+            threads = [
+                threading.Thread(target=learner.update, args=([(description, "Food")],))
+                for description in ("Blue Bottle", "Peet's Coffee")
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(learner.updates, 2)
+        # Both corrections reached the published model, not just the last one
+        self.assertEqual(service.active.model.t_ - samples_seen, 2)
+
+    def test_tfidf_models_are_not_incremental(self):
+        service = self.make_service(TfidfVectorizer(), LogisticRegression(max_iter=1000))
+        self.assertFalse(supports_incremental_updates(service.active))
+        with self.assertRaises(ValueError):
+            OnlineLearner(service).update([("Blue Bottle", "Food")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+
+from app.services.merchants import MerchantIndex
+from app.services.overlays import UserOverlay, UserOverlayStore
+from tests.helpers import build_service
+
+
+class TestUserOverlay(unittest.TestCase):
+
+    def test_learn_sets_override_and_bounded_biases(self):
+        overlay = UserOverlay(step=1.0, max_weight=2.0)
+        for _ in range(5):
+            overlay.learn("starbucks coffee", "Client Meetings", "Food")
+
+        self.assertEqual(overlay.override("starbucks coffee"), "Client Meetings")
+        self.assertEqual(overlay.bias["coffee"]["Client Meetings"], 2.0)
+        self.assertEqual(overlay.bias["coffee"]["Food"], -2.0)
+        self.assertTrue(overlay.touches("blue bottle coffee"))
+        self.assertFalse(overlay.touches("uber ride"))
+
+    def test_learn_replaces_dicts_instead_of_mutating(self):
+        overlay = UserOverlay()
+        overlay.learn("starbucks coffee", "Food")
+        exact, categories = overlay.exact, overlay.categories
+        overlay.learn_many([("Uber Trip", "Transport", None), ("Office Depot", "Work Supplies", "Shopping")])
+
+        self.assertEqual(exact, {"starbucks coffee": "Food"})
+        self.assertEqual(list(categories), ["Food"])
+        self.assertEqual(list(overlay.categories), ["Food", "Transport", "Work Supplies"])
+        self.assertEqual(overlay.corrections, 3)
+
+    def test_rank_adds_custom_categories(self):
+        overlay = UserOverlay(step=4.0, max_weight=8.0)
+        overlay.learn("starbucks coffee", "Client Meetings", "Food")
+
+        classes = np.array(["Food", "Transport"], dtype=object)
+        probabilities = np.array([[0.9, 0.1], [0.2, 0.8]])
+        ranked = overlay.rank(["blue bottle coffee", "uber ride"], classes, probabilities, 3)
+
+        self.assertEqual(ranked[0][0][0], "Client Meetings")
+        self.assertEqual(ranked[1][0][0], "Transport")
+        for row in ranked:
+            self.assertEqual(len(row), 3)
+            self.assertAlmostEqual(sum(probability for _, probability in row), 1.0, places=6)
+
+
+class TestOverlayScoring(unittest.TestCase):
+
+    def setUp(self):
+        self.service = build_service()
+
+    def test_empty_overlay_matches_global_model(self):
+        descriptions = ["Starbucks", "Uber trip", "Water Bill"]
+        expected = self.service.batch_predict_top_k(descriptions, 2)
+        self.assertEqual(self.service.batch_predict_overlay(descriptions, UserOverlay(), 2), expected)
+
+    def test_overlay_applies_only_to_its_user(self):
+        overlay = UserOverlay(step=4.0)
+        overlay.learn_many([("Starbucks Coffee", "Client Meetings", "Food")])
+
+        results = self.service.batch_predict_overlay(["Starbucks Coffee #12", "Coffee Bean", "Uber Ride"], overlay)
+        self.assertEqual(results[0], [("Client Meetings", 1.0)])
+        self.assertEqual(results[1][0][0], "Client Meetings")
+        self.assertEqual(results[2][0][0], "Transport")
+
+        # The shared cache and other users are unaffected
+        self.assertEqual(self.service.predict("Starbucks Coffee")[0], "Food")
+
+    def test_overlay_biases_rows_the_merchant_index_knows(self):
+        self.service.merchant_index = MerchantIndex(min_support=1)
+        self.service.merchant_index.add_many([("Coffee Bean", "Food")] * 3)
+        overlay = UserOverlay(step=4.0)
+        overlay.learn_many([("Starbucks Coffee", "Client Meetings", "Food")])
+
+        self.assertEqual(self.service.batch_predict(["Coffee Bean"]), [("Food", 1.0)])
+        self.assertEqual(self.service.batch_predict_overlay(["Coffee Bean"], overlay)[0][0][0], "Client Meetings")
+
+    def test_failed_chunk_is_retried_row_by_row(self):
+        overlay = UserOverlay(step=4.0)
+        overlay.learn_many([("Starbucks Coffee", "Client Meetings", "Food")])
+        predict_proba = self.service.active.predict_proba
+
+        def failing(texts):
+            if any("boom" in text for text in texts):
+                raise ValueError("bad row")
+            return predict_proba(texts)
+
+        with mock.patch.object(self.service.active, "predict_proba", side_effect=failing):
+            results = self.service.batch_predict_overlay(["Coffee Bean", "coffee boom"], overlay)
+        self.assertEqual(results[0][0][0], "Client Meetings")
+        self.assertEqual(results[1], [("Other", 0.0)])
+
+
+class TestUserOverlayStore(unittest.TestCase):
+
+    def test_loads_once_and_evicts_least_recently_used(self):
+        loads = []
+
+        async def loader(user_id):
+            loads.append(user_id)
+            return [(f"merchant {user_id}", "Custom", "Other")]
+
+        async def scenario():
+            store = UserOverlayStore(loader, max_bytes=UserOverlay().nbytes)
+            first, second = await asyncio.gather(store.get(1), store.get(1))
+            self.assertIs(first, second)
+            self.assertEqual(loads, [1])
+
+            store.max_bytes = first.nbytes * 2
+            await store.get(2)
+            await store.get(1)
+            await store.get(3)
+            return store
+
+        store = asyncio.run(scenario())
+        self.assertEqual(loads, [1, 2, 3])
+        self.assertEqual(list(store._overlays), [1, 3])
+        self.assertEqual(store.evictions, 1)
+        self.assertLessEqual(store.bytes, store.max_bytes)
+
+    def test_record_updates_cached_overlay_only(self):
+        async def loader(user_id):
+            return []
+
+        async def scenario():
+            store = UserOverlayStore(loader)
+            overlay = await store.get(1)
+            store.record(1, "Starbucks Coffee", "Client Meetings", "Food")
+            store.record(2, "Uber Ride", "Commute", "Transport")
+            return store, overlay
+
+        store, overlay = asyncio.run(scenario())
+        self.assertEqual(overlay.override("starbucks coffee"), "Client Meetings")
+        self.assertNotIn(2, store._overlays)
+        self.assertEqual(store.bytes, overlay.nbytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+import asyncio
+import sys
+from datetime import datetime
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from sqlalchemy import func, select, text
+
+from app.models.database import Correction, MonthlyCategoryTotal, Transaction, User
+from app.models.session import Database, async_database_url
+from app.services.persistence import (
+    TransactionStore, UnknownUserError, decode_cursor, month_key, parse_transaction_date
+)
+
+
+class TestTransactionStore(unittest.TestCase):
+
+    def test_async_database_url(self):
+        self.assertEqual(
+            async_database_url("postgresql://u:p@localhost/db"), "postgresql+asyncpg://u:p@localhost/db"
+        )
+        self.assertEqual(async_database_url("sqlite:///./x.db"), "sqlite+aiosqlite:///./x.db")
+
+    def test_bulk_insert_and_correction(self):
+        async def scenario():
+            database = Database("sqlite+aiosqlite:///:memory:")
+            await database.create_tables()
+            store = TransactionStore(database, batch_size=2)
+
+            rows = [
+                {"description": "Starbucks Coffee", "amount": -4.5, "category": "Food", "confidence": 0.9},
+                {"description": "Uber Ride", "amount": -12.0, "category": "Transport", "confidence": 0.8},
+                {"description": "Amazon", "amount": -30.0, "category": "Shopping", "confidence": 0.4},
+            ]
+            self.assertEqual(await store.insert_transactions(rows, user_id=None), 3)
+
+            transaction = await store.record_correction("Work Supplies", transaction_id=3)
+            self.assertEqual(transaction.description, "Amazon")
+
+            async with database.session() as session:
+                count = (await session.execute(select(func.count(Transaction.id)))).scalar_one()
+                corrected = (await session.execute(
+                    select(Transaction).where(Transaction.id == 3)
+                )).scalar_one()
+                correction = (await session.execute(select(Correction))).scalar_one()
+            await database.dispose()
+            return count, corrected, correction
+
+        count, corrected, correction = asyncio.run(scenario())
+        self.assertEqual(count, 3)
+        self.assertTrue(corrected.is_corrected)
+        self.assertEqual(corrected.actual_category, "Work Supplies")
+        self.assertEqual(correction.predicted_category, "Shopping")
+
+    def test_writes_for_unknown_users_are_rejected(self):
+        async def scenario():
+            database = Database("sqlite+aiosqlite:///:memory:")
+            await database.create_tables()
+            store = TransactionStore(database)
+            rows = [{"description": "Coffee", "amount": -4.0, "category": "Food", "confidence": 0.9}]
+            with self.assertRaises(UnknownUserError):
+                await store.insert_transactions(rows, user_id=7)
+            with self.assertRaises(UnknownUserError):
+                await store.record_correction("Travel", user_id=8)
+            with self.assertRaises(UnknownUserError):
+                await store.check_user(7)
+
+            async with database.session() as session:
+                session.add(User(id=7, email="user7@example.com"))
+            await store.check_user(7)
+            inserted = await store.insert_transactions(rows, user_id=7)
+            await database.dispose()
+            return inserted
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+
+    def test_auto_create_users(self):
+        async def scenario():
+            database = Database("sqlite+aiosqlite:///:memory:")
+            await database.create_tables()
+            store = TransactionStore(database, auto_create_users=True)
+            rows = [{"description": "Coffee", "amount": -4.0, "category": "Food", "confidence": 0.9}]
+            await store.insert_transactions(rows, user_id=7)
+            await store.insert_transactions(rows, user_id=7)
+            await store.record_correction("Travel", user_id=8)
+
+            async with database.session() as session:
+                foreign_keys = (await session.execute(text("PRAGMA foreign_keys"))).scalar_one()
+                users = (await session.execute(select(User.id).order_by(User.id))).scalars().all()
+            await database.dispose()
+            return foreign_keys, users
+
+        foreign_keys, users = asyncio.run(scenario())
+        self.assertEqual(foreign_keys, 1)
+        self.assertEqual(users, [7, 8])
+
+    def test_user_corrections(self):
+        async def scenario():
+            database = Database("sqlite+aiosqlite:///:memory:")
+            await database.create_tables()
+            store = TransactionStore(database, auto_create_users=True)
+
+            rows = [
+                {"description": "Starbucks Coffee", "amount": -4.5, "category": "Food", "confidence": 0.9},
+                {"description": "Uber Ride", "amount": -12.0, "category": "Transport", "confidence": 0.8},
+            ]
+            await store.insert_transactions(rows, user_id=7)
+            await store.insert_transactions(rows, user_id=8)
+            await store.record_correction("Client Meetings", transaction_id=1)
+            await store.record_correction("Commute", transaction_id=4)
+            await store.record_correction("Travel", user_id=7)
+            await store.record_correction("Coffee Runs", user_id=7, description="Blue Bottle")
+
+            corrections = await store.user_corrections(7)
+            await database.dispose()
+            return corrections
+
+        self.assertEqual(asyncio.run(scenario()), [
+            ("Starbucks Coffee", "Client Meetings", "Food"),
+            ("Blue Bottle", "Coffee Runs", None),
+        ])
+
+    def test_keyset_pages_and_filters(self):
+        async def scenario():
+            database = Database("sqlite+aiosqlite:///:memory:")
+            await database.create_tables()
+            store = TransactionStore(database, auto_create_users=True)
+            rows = [
+                {"description": f"Coffee {i}", "amount": -2.0, "category": "Food", "confidence": 0.3 if i % 2 else 0.9}
+                for i in range(5)
+            ]
+            await store.insert_transactions(rows, user_id=1)
+            await store.insert_transactions(rows[:1], user_id=2)
+            await store.record_correction("Shopping", transaction_id=1)
+
+            pages, cursor = [], None
+            while True:
+                page, cursor = await store.list_transactions(user_id=1, limit=2, cursor=cursor)
+                pages.append([t.id for t in page])
+                if cursor is None:
+                    break
+            review, _ = await store.list_transactions(user_id=1, needs_review=True, review_threshold=0.5)
+            shopping, _ = await store.list_transactions(user_id=1, category="Shopping")
+            food, _ = await store.list_transactions(user_id=1, category="Food")
+            await database.dispose()
+            return pages, review, shopping, food
+
+        pages, review, shopping, food = asyncio.run(scenario())
+        self.assertEqual(pages, [[5, 4], [3, 2], [1]])
+        self.assertEqual([t.id for t in review], [4, 2])
+        self.assertEqual([t.id for t in shopping], [1])
+        self.assertEqual([t.id for t in food], [5, 4, 3, 2])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_monthly_totals_follow_inserts_and_corrections(self):
+        async def scenario():
+            database = Database("sqlite+aiosqlite:///:memory:")
+            await database.create_tables()
+            store = TransactionStore(database, auto_create_users=True)
+            await store.insert_transactions([
+                {"description": "Coffee", "amount": -4.0, "category": "Food", "confidence": 0.9},
+                {"description": "Lunch", "amount": -10.0, "category": "Food", "confidence": 0.9},
+                {"description": "Amazon", "amount": -30.0, "category": "Shopping", "confidence": 0.4},
+            ], user_id=7)
+            await store.insert_transactions([
+                {"description": "Dinner", "amount": -20.0, "category": "Food", "confidence": 0.9},
+            ], user_id=7)
+            await store.record_correction("Work Supplies", transaction_id=3)
+            incremental = await store.monthly_totals(user_id=7)
+
+            async with database.session() as session:
+                await session.execute(MonthlyCategoryTotal.__table__.delete())
+            await store.backfill_monthly_totals()
+            rebuilt = await store.monthly_totals(user_id=7)
+            await database.dispose()
+            return incremental, rebuilt
+
+        incremental, rebuilt = asyncio.run(scenario())
+        month = month_key(datetime.utcnow())
+        self.assertEqual(incremental, [
+            {"month": month, "category": "Food", "total_amount": -34.0, "transaction_count": 3},
+            {"month": month, "category": "Work Supplies", "total_amount": -30.0, "transaction_count": 1},
+        ])
+        self.assertEqual(rebuilt, incremental)
+
+
+    def test_statement_dates_drive_months_and_filters(self):
+        async def scenario():
+            database = Database("sqlite+aiosqlite:///:memory:")
+            await database.create_tables()
+            store = TransactionStore(database, auto_create_users=True)
+            await store.insert_transactions([
+                {"description": "Rent", "amount": -900.0, "category": "Bills", "confidence": 0.9,
+                 "date": "2026-01-31"},
+                {"description": "Coffee", "amount": -4.0, "category": "Food", "confidence": 0.9,
+                 "date": "20260203120000[-5:EST]"},
+                {"description": "Lunch", "amount": -10.0, "category": "Food", "confidence": 0.9,
+                 "date": "02/14/2026"},
+                {"description": "Dinner", "amount": -20.0, "category": "Food", "confidence": 0.9,
+                 "date": "someday"},
+            ], user_id=7)
+            totals = await store.monthly_totals(user_id=7, end_month="2026-02")
+            february, _ = await store.list_transactions(
+                user_id=7, start=datetime(2026, 2, 1), end=datetime(2026, 3, 1)
+            )
+            async with database.session() as session:
+                await session.execute(MonthlyCategoryTotal.__table__.delete())
+            await store.backfill_monthly_totals()
+            rebuilt = await store.monthly_totals(user_id=7, end_month="2026-02")
+            undated = await store.monthly_totals(user_id=7, start_month=month_key(datetime.utcnow()))
+            await database.dispose()
+            return totals, february, rebuilt, undated
+
+        totals, february, rebuilt, undated = asyncio.run(scenario())
+        self.assertEqual(totals, [
+            {"month": "2026-01", "category": "Bills", "total_amount": -900.0, "transaction_count": 1},
+            {"month": "2026-02", "category": "Food", "total_amount": -14.0, "transaction_count": 2},
+        ])
+        self.assertEqual([t.description for t in february], ["Lunch", "Coffee"])
+        self.assertEqual(february[1].created_at, datetime(2026, 2, 3, 12, 0))
+        self.assertEqual(rebuilt, totals)
+        self.assertEqual([total["total_amount"] for total in undated], [-20.0])
+
+    def test_parse_transaction_date(self):
+        self.assertEqual(parse_transaction_date("2026-03-05T10:00:00+02:00"), datetime(2026, 3, 5, 8, 0))
+        self.assertEqual(parse_transaction_date("20260305"), datetime(2026, 3, 5))
+        self.assertEqual(parse_transaction_date("03/05/26"), datetime(2026, 3, 5))
+        self.assertIsNone(parse_transaction_date(""))
+        self.assertIsNone(parse_transaction_date("99999999"))
+
+    def test_job_chunks_are_inserted_once(self):
+        async def scenario():
+            database = Database("sqlite+aiosqlite:///:memory:")
+            await database.create_tables()
+            store = TransactionStore(database, auto_create_users=True)
+            chunk = [
+                {"description": "Coffee", "amount": -4.0, "category": "Food", "confidence": 0.9},
+                {"description": "Lunch", "amount": -10.0, "category": "Food", "confidence": 0.9},
+            ]
+            first = await store.insert_transactions(chunk, user_id=7, job_id="job1", first_row=0)
+            # A resumed job persists the chunk again, plus the rows after it
+            again = await store.insert_transactions(
+                chunk + [{"description": "Dinner", "amount": -20.0, "category": "Food", "confidence": 0.9}],
+                user_id=7, job_id="job1", first_row=0,
+            )
+            other_job = await store.insert_transactions(chunk, user_id=7, job_id="job2", first_row=0)
+            totals = await store.monthly_totals(user_id=7)
+            await database.dispose()
+            return first, again, other_job, totals
+
+        first, again, other_job, totals = asyncio.run(scenario())
+        self.assertEqual((first, again, other_job), (2, 1, 2))
+        self.assertEqual(totals, [{
+            "month": month_key(datetime.utcnow()), "category": "Food", "total_amount": -48.0, "transaction_count": 5,
+        }])
+
+if __name__ == '__main__':
+    unittest.main()
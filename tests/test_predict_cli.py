@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend" / "scripts"))
+
+from predict import (
+    DaemonScorer, _DaemonHandler, _DaemonServer, format_results, iter_descriptions, predict_stream,
+    remove_stale_socket
+)
+
+
+class FakeScorer:
+
+    def __init__(self):
+        self.batches = []
+
+    def refresh(self):
+        pass
+
+    def score(self, descriptions, top_k):
+        self.batches.append(len(descriptions))
+        ranked = [("Food", 0.8), ("Shopping", 0.15), ("Other", 0.05)]
+        return [ranked[:top_k] if "coffee" in d.lower() else [("Other", 0.3)] for d in descriptions]
+
+
+class TestPredictCli(unittest.TestCase):
+
+    def test_iter_descriptions_lines_and_csv(self):
+        self.assertEqual(list(iter_descriptions(io.StringIO("Coffee\n\nGas\r\n"))), ["Coffee", "Gas"])
+        csv_input = io.StringIO('date,memo\n2024-01-01,"Coffee, large"\n2024-01-02,Gas\n')
+        self.assertEqual(list(iter_descriptions(csv_input, "memo")), ["Coffee, large", "Gas"])
+        with self.assertRaises(ValueError):
+            list(iter_descriptions(io.StringIO("a,b\n1,2\n"), "memo"))
+
+    def test_formats(self):
+        ranked = [[("Food", 0.8), ("Shopping", 0.15)]]
+        self.assertEqual(format_results(["Coffee\tshop"], ranked, "tsv"), "Coffee shop\tFood\t0.8000\tShopping\t0.1500\n")
+        record = json.loads(format_results(["Coffee"], ranked, "jsonl", review_threshold=0.9))
+        self.assertEqual(record["alternatives"], [{"category": "Shopping", "confidence": 0.15}])
+        self.assertTrue(record["needs_review"])
+
+    def test_stream_writes_in_batches(self):
+        scorer = FakeScorer()
+        output = io.StringIO()
+        written = predict_stream([f"Coffee {i}" for i in range(5)], scorer, output, "tsv", batch_size=2)
+        self.assertEqual(written, 5)
+        self.assertEqual(scorer.batches, [2, 2, 1])
+        self.assertEqual(len(output.getvalue().splitlines()), 5)
+
+    def test_daemon_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "predict.sock")
+            server = _DaemonServer(path, _DaemonHandler)
+            server.scorer = FakeScorer()
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                client = DaemonScorer(path)
+                self.assertEqual(client.score(["Coffee", "Gas"], 2), [[("Food", 0.8), ("Shopping", 0.15)], [("Other", 0.3)]])
+                self.assertEqual(client.score(["Coffee"], 1), [[("Food", 0.8)]])
+                client.close()
+            finally:
+                server.shutdown()
+                server.server_close()
+
+    def test_only_stale_sockets_are_removed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "predict.sock")
+            with open(path, "w") as f:
+                f.write("not a socket")
+            with self.assertRaises(ValueError):
+                remove_stale_socket(path)
+            self.assertTrue(os.path.exists(path))
+            os.remove(path)
+
+            server = _DaemonServer(path, _DaemonHandler)
+            with self.assertRaises(RuntimeError):
+                remove_stale_socket(path)
+            self.assertTrue(os.path.exists(path))
+
+            # A socket nobody listens on any more is left over from a dead daemon
+            server.server_close()
+            remove_stale_socket(path)
+            self.assertFalse(os.path.exists(path))
+            remove_stale_socket(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
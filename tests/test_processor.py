@@ -22,5 +22,27 @@ class TestProcessor(unittest.TestCase):
         self.assertEqual(tfidf_matrix.shape[0], len(documents))
         self.assertGreater(tfidf_matrix.shape[1], 0)
 
+    def test_preprocess_strips_bank_noise(self):
+        cases = {
+            "POS 4821 STARBUCKS #1234 SEATTLE WA 10/02": "starbucks seattle wa",
+            "SQ *BLUE BOTTLE COFFEE 10/14 CARD 4821": "blue bottle coffee",
+            "DEBIT CARD PURCHASE XXXX1234 WHOLE FOODS MKT 10245 AUSTIN TX": "whole foods mkt austin tx",
+            "AT&T BILL PAYMENT 2024-10-02": "at&t bill payment",
+            "Netflix Subscription": "netflix subscription",
+        }
+        for raw, expected in cases.items():
+            self.assertEqual(self.processor.preprocess(raw), expected)
+
+    def test_preprocess_keeps_text_when_nothing_survives(self):
+        self.assertEqual(self.processor.preprocess("  #1234   10/02 "), "#1234 10/02")
+
+    def test_preprocess_many_matches_preprocess(self):
+        texts = [
+            "POS 4821 STARBUCKS #1234", "", "Uber *Trip 8005928996", "multi\nline", "Café Élan 12",
+            "#1234 10/02", 42,
+        ] * 400
+        self.assertEqual(self.processor.preprocess_many(texts), [self.processor.preprocess(t) for t in texts])
+        self.assertEqual(self.processor.preprocess_many([]), [])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import joblib
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from app.services.categorization import CategorizationService
+from app.services.registry import ModelRegistry
+
+
+def write_model(directory, descriptions, categories):
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression(max_iter=1000)
+    model.fit(vectorizer.fit_transform(descriptions), categories)
+    joblib.dump(model, os.path.join(directory, "classifier.pkl"))
+    joblib.dump(vectorizer, os.path.join(directory, "tfidf_vectorizer.pkl"))
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.tmp.name, "classifier.pkl")
+        self.vectorizer_path = os.path.join(self.tmp.name, "tfidf_vectorizer.pkl")
+        write_model(self.tmp.name, ["Starbucks Coffee", "Uber Ride"], ["Food", "Transport"])
+        self.service = CategorizationService(self.model_path, self.vectorizer_path)
+        self.registry = ModelRegistry(self.service, poll_interval=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reload_swaps_in_new_version(self):
+        old = self.service.active
+        write_model(self.tmp.name, ["Starbucks Coffee", "Uber Ride", "Electric Bill"],
+                    ["Food", "Transport", "Bills"])
+
+        loaded = self.registry.reload()
+        self.assertIs(self.service.active, loaded)
+        self.assertNotEqual(loaded.version, old.version)
+        self.assertEqual(self.service.predict("Electric Bill")[0], "Bills")
+        # A request holding the old version still scores against it
+        self.assertEqual(list(old.classes_), ["Food", "Transport"])
+        self.assertEqual(self.registry.stats()["reloads"], 1)
+
+    def test_failed_reload_keeps_current_model(self):
+        old = self.service.active
+        Path(self.model_path).write_bytes(b"not a pickle")
+
+        with self.assertRaises(Exception):
+            self.registry.reload()
+        self.assertIs(self.service.active, old)
+        self.assertEqual(self.registry.stats()["failures"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
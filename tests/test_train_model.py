@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend" / "scripts"))
+
+from train_model import (
+    _fit_tfidf_vocabulary, _split_chunk, _transform_chunk, build_vectorizer, train_model_streaming
+)
+
+
+DESCRIPTIONS = [
+    "Starbucks Coffee", "Starbucks Coffee downtown", "Whole Foods Market", "Whole Foods",
+    "Uber Ride", "Uber Ride airport", "Lyft Ride", "Shell Gas Station",
+    "Electric Bill", "Water Bill", "Electric Bill payment", "Internet Bill payment",
+]
+CATEGORIES = ["Food"] * 4 + ["Transport"] * 4 + ["Bills"] * 4
+
+
+class TestStreamingTraining(unittest.TestCase):
+
+    def test_merged_statistics_match_in_memory_fit(self):
+        vectorizer = build_vectorizer("tfidf")
+        analyzer = vectorizer.build_analyzer()
+        document_frequency, term_frequency = Counter(), Counter()
+        for description in DESCRIPTIONS:
+            terms = analyzer(description)
+            term_frequency.update(terms)
+            document_frequency.update(set(terms))
+
+        streamed = _fit_tfidf_vocabulary(vectorizer, document_frequency, term_frequency, len(DESCRIPTIONS))
+        expected = build_vectorizer("tfidf").fit(DESCRIPTIONS)
+
+        self.assertEqual(streamed.vocabulary_, expected.vocabulary_)
+        np.testing.assert_allclose(streamed.idf_, expected.idf_)
+        np.testing.assert_allclose(
+            streamed.transform(DESCRIPTIONS).toarray(), expected.transform(DESCRIPTIONS).toarray()
+        )
+
+    def test_chunk_without_test_rows(self):
+        vectorizer = build_vectorizer("tfidf").fit(DESCRIPTIONS)
+        chunk = pd.DataFrame({"description": DESCRIPTIONS[:1], "category": CATEGORIES[:1]})
+        chunk_index = next(i for i in range(100) if len(_split_chunk(chunk, i)[1]) == 0)
+
+        X_train, y_train, X_test, y_test = _transform_chunk(vectorizer, chunk, chunk_index)
+        self.assertEqual(X_train.shape, (1, len(vectorizer.vocabulary_)))
+        self.assertEqual(X_test.shape, (0, len(vectorizer.vocabulary_)))
+        self.assertEqual(len(y_test), 0)
+
+    def test_streaming_training_writes_service_artifacts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = os.path.join(tmp, "transactions.csv")
+            pd.DataFrame({
+                "description": DESCRIPTIONS * 5,
+                "category": CATEGORIES * 5,
+            }).to_csv(dataset, index=False)
+
+            timings = train_model_streaming(dataset, tmp, "tfidf", jobs=2, chunksize=16)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "classifier.pkl")))
+            self.assertTrue(os.path.exists(os.path.join(tmp, "artifacts", "LATEST")))
+            self.assertIn("vectorize", timings)
+
+
+if __name__ == '__main__':
+    unittest.main()
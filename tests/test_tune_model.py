@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend" / "scripts"))
+
+from tune_model import expand_grid, load_grid, pareto_front, score_on_test, tune
+
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "backend" / "data" / "sample_transactions.csv"
+
+
+class TestTuneModel(unittest.TestCase):
+
+    def test_expand_grid(self):
+        combinations = expand_grid({"C": [1.0, 10.0], "min_df": [1, 2, 3]})
+        self.assertEqual(len(combinations), 6)
+        self.assertIn({"C": 10.0, "min_df": 2}, combinations)
+
+    def test_pareto_front_drops_dominated_candidates(self):
+        results = [
+            {"name": "fast", "accuracy": 0.80, "single_us": 50.0},
+            {"name": "slow_worse", "accuracy": 0.79, "single_us": 90.0},
+            {"name": "slow_better", "accuracy": 0.90, "single_us": 120.0},
+            {"name": "fast_worse", "accuracy": 0.70, "single_us": 60.0},
+        ]
+        front = pareto_front(results)
+        self.assertEqual([r["name"] for r in front], ["fast", "slow_better"])
+
+    def test_score_on_test_keeps_validation_scores(self):
+        class Identity:
+            def transform(self, X):
+                return X
+
+        class Echo:
+            def predict(self, X):
+                return list(X)
+
+        front = [{"accuracy": 1.0, "vectorizer_obj": Identity(), "model_obj": Echo()}]
+        score_on_test(front, ["Food", "Bills"], ["Food", "Transport"])
+        self.assertEqual(front[0]["accuracy"], 1.0)
+        self.assertEqual(front[0]["test_accuracy"], 0.5)
+        self.assertIn("test_f1", front[0])
+
+    def test_load_grid_overrides(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "grid.json")
+            with open(path, "w") as f:
+                json.dump({"vectorizer": {"ngram_range": [[1, 3]]}, "classifier": {"C": [5.0]}}, f)
+            vectorizer_grid, classifier_grid = load_grid(path)
+
+        self.assertEqual(vectorizer_grid["ngram_range"], [(1, 3)])
+        self.assertEqual(classifier_grid, {"C": [5.0]})
+        self.assertIn("max_features", vectorizer_grid)
+
+    def test_tune_on_sample_data(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grid_path = os.path.join(tmp, "grid.json")
+            with open(grid_path, "w") as f:
+                json.dump({"vectorizer": {"max_features": [500], "min_df": [1]}, "classifier": {"C": [1.0, 10.0]}}, f)
+            output = os.path.join(tmp, "results.json")
+            with redirect_stdout(StringIO()):
+                results = tune(str(SAMPLE_CSV), search="halving", cache_dir=os.path.join(tmp, "cache"),
+                               latency_rows=5, factor=2, output=output, grid_path=grid_path)
+            with open(output) as f:
+                written = json.load(f)
+
+        self.assertTrue(results)
+        self.assertEqual(len(written["results"]), len(results))
+        self.assertTrue(written["pareto"])
+        for result in written["pareto"]:
+            self.assertIn("test_accuracy", result)
+            self.assertGreater(result["single_us"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()